@@ -4,14 +4,20 @@ Author: Kaleb Maulding
 Date: 2/12/2023
 Version: 3.10
 """
-#used to go to a random location
+#used to go to a random location, from a generator seeded for each game
 import random
-#used to print date and time
-import datetime
+#used to write output to the console and to intern names
+import sys
+#used for the read-only empty containers shared by locations
+from types import MappingProxyType
+#used to pack game snapshots
+import struct
+from array import array
+#used to keep the discovered locations in order and the most recently used views
+from bisect import insort
+from collections import OrderedDict
 #used to stagger print statements
-from time import sleep
-#used to import color
-from colorama import Fore
+from pacing import BlockingPacer
 
 class Item:
     """Represents objects the player may encounter during the game.
@@ -26,8 +32,12 @@ class Item:
         creates the amount of calories an item has.
     _weight: int
         creates the amount of weight an item has.
+    _id: int
+        the items position in its world, set by WorldTemplate.add_item.
     """
 
+    __slots__ = ('_name', '_description', '_calories', '_weight', '_id')
+
     def __init__(self, name, description, calories, weight):
         """
         parameters:
@@ -41,10 +51,11 @@ class Item:
         weight:
             weight of the item
         """
-        self._name = name
-        self._description = description
+        self._name = sys.intern(name)
+        self._description = sys.intern(description)
         self._calories = calories
         self._weight = weight
+        self._id = None
 
     def get_name(self):
         """gets and returns an items name
@@ -66,7 +77,7 @@ class Item:
         """
         if name == '':
             raise ValueError('Name cannot be blank.')
-        self._name = name
+        self._name = sys.intern(name)
 
     def get_description(self):
         """gets and returns an instance of _description
@@ -98,7 +109,7 @@ class Item:
         """
         if description == '':
             raise ValueError('Description cannot be blank.')
-        self._description = description
+        self._description = sys.intern(description)
 
     def get_calories(self):
         """gets and returns an instance of _calories
@@ -179,13 +190,18 @@ class NPC:
         keeps track of which message a npc is saying.
     _message_list: []
         list of messages a npc has.
+    _id: int
+        the npcs position in its world, set by WorldTemplate.add_npc.
     """
 
+    __slots__ = ('_name', '_description', '_message_number', '_message_list', '_id')
+
     def __init__(self, name, description):
-        self._name = name
-        self._description = description
+        self._name = sys.intern(name)
+        self._description = sys.intern(description)
         self._message_number = 0
-        self._message_list = []
+        self._message_list = ()
+        self._id = None
 
     def get_name(self):
         """gets and returns the npcs name
@@ -212,7 +228,7 @@ class NPC:
         """
         if name == '':
             raise ValueError('Name cannot be blank.')
-        self._name = name
+        self._name = sys.intern(name)
 
     def get_description(self):
         """gets and returns the description of a npc
@@ -239,7 +255,7 @@ class NPC:
         """
         if description == '':
             raise ValueError('Description cannot be blank.')
-        self._description = description
+        self._description = sys.intern(description)
 
     def get_message_number(self):
         """returns the current message(indicated by message number)
@@ -293,6 +309,35 @@ class NPC:
         """
         return self._name
 
+
+def unindex(index: dict, objects: list, obj) -> None:
+    """removes an item or npc from a name index after it was removed from its list.
+    If the list still holds something else with the same name, the name points to
+    that instead.
+
+    parameters:
+    ----------
+    index: dict:
+        name to item or npc
+    objects: list:
+        the list obj was removed from
+    obj:
+        the item or npc that was removed
+    """
+    if index.get(obj._name) == obj:
+        del index[obj._name]
+        for other in objects:
+            if other._name == obj._name:
+                index[other._name] = other
+                break
+
+
+#shared by every location that has nothing in a container yet, never changed
+EMPTY_LIST = ()
+EMPTY_DICT = MappingProxyType({})
+
+
+# noinspection PyProtectedMember
 class Location:
     """Represents places the player may encounter during the game.
 
@@ -310,8 +355,20 @@ class Location:
         creates a list of all npcs in the location.
     _item_list: []
         creates a list of all items in the location.
+    _npc_index: dict
+        npc name to npc, for every npc in _npc_list.
+    _item_index: dict
+        item name to item, for every item in _item_list.
+    _id: int
+        the locations position in its world, set by WorldTemplate.add_location.
+
+    Most locations have no npcs and few items, so the containers start out as
+    shared, read-only empty ones and each is only created when something is added.
     """
 
+    __slots__ = ('_name', '_description', '_visited', '_neighbors', '_npc_list',
+                 '_item_list', '_npc_index', '_item_index', '_id')
+
     def __init__(self, name, description):
         """
         parameters:
@@ -321,12 +378,15 @@ class Location:
         description:
             the locations description
         """
-        self._name = name
-        self._description = description
+        self._name = sys.intern(name)
+        self._description = sys.intern(description)
         self._visited = False
-        self._neighbors = {}
-        self._npc_list = []
-        self._item_list = []
+        self._neighbors = EMPTY_DICT
+        self._npc_list = EMPTY_LIST
+        self._item_list = EMPTY_LIST
+        self._npc_index = EMPTY_DICT
+        self._item_index = EMPTY_DICT
+        self._id = None
 
     def get_name(self):
         """gets and returns the locations name
@@ -353,7 +413,7 @@ class Location:
         """
         if name == '':
             raise ValueError('Name cannot be blank.')
-        self._name = name
+        self._name = sys.intern(name)
 
     def get_description(self):
         """gets and returns the description of a location
@@ -380,7 +440,7 @@ class Location:
         """
         if description == '':
             raise ValueError('Description cannot be blank.')
-        self._description = description
+        self._description = sys.intern(description)
 
     def get_locations(self):
         """gets and returns a locations list of npcs
@@ -415,6 +475,8 @@ class Location:
             raise ValueError('Direction cannot be blank.')
         if direction in self._neighbors:
             raise KeyError('Location already exists in the dictionary.')
+        if self._neighbors is EMPTY_DICT:
+            self._neighbors = {}
         self._neighbors[direction] = location
 
     def add_npc(self, npc: NPC):
@@ -425,7 +487,11 @@ class Location:
          npc: NPC:
             the npc in the game
         """
+        if self._npc_list is EMPTY_LIST:
+            self._npc_list = []
+            self._npc_index = {}
         self._npc_list.append(npc)
+        self._npc_index.setdefault(npc._name, npc)
 
     def del_npc(self, npc: NPC):
         """deletes a npc from a locations list
@@ -436,6 +502,7 @@ class Location:
             the npc in the game
         """
         self._npc_list.remove(npc)
+        unindex(self._npc_index, self._npc_list, npc)
 
     def get_npcs(self) -> list[NPC]:
         """return the list of npcs
@@ -447,6 +514,21 @@ class Location:
         """
         return self._npc_list
 
+    def get_npc(self, name: str):
+        """returns the npc with the given name, or None if there is no such npc here
+
+        parameters:
+        ----------
+        name: str:
+            the name of the npc
+
+        returns:
+        -------
+        npc:
+            the npc, or None
+        """
+        return self._npc_index.get(name)
+
     def item_list(self, item: Item):
         """adds an item to the locations npc list
 
@@ -455,7 +537,22 @@ class Location:
         item: Item:
             the item in the game
         """
+        if self._item_list is EMPTY_LIST:
+            self._item_list = []
+            self._item_index = {}
         self._item_list.append(item)
+        self._item_index.setdefault(item._name, item)
+
+    def del_item(self, item: Item):
+        """deletes an item from the locations item list
+
+        parameters:
+        ----------
+        item: Item:
+            the item in the game
+        """
+        self._item_list.remove(item)
+        unindex(self._item_index, self._item_list, item)
 
     def get_items(self) -> list[Item]:
         """returns the items in the locations npc list
@@ -467,6 +564,21 @@ class Location:
         """
         return self._item_list
 
+    def get_item(self, name: str):
+        """returns the item with the given name, or None if there is no such item here
+
+        parameters:
+        ----------
+        name: str:
+            the name of the item
+
+        returns:
+        -------
+        item:
+            the item, or None
+        """
+        return self._item_index.get(name)
+
     def set_visited(self) -> None:
         """When a location is visited, the variable is changed to True
         """
@@ -493,532 +605,1982 @@ class Location:
         return f"{self._name} - {self._description}"
 
 
-# noinspection PyProtectedMember
-class Game:
-    """The game takes place in a world of connected locations. The purpose of the game is to collect
-    edible items and then bring them to the elf in the woods behind campus. The elf needs
-    500 calories of edible food before it will save GVSU. Each item can have 0 or more calories.
-    If a player gives the elf something inedible, the elf will be displeased and
-    will teleport the player to a random location in the world.
-    The player can only carry 30 pounds at a time, so multiple trips to the elf may be needed. Once
-    the elf has enough calories, it will save campus and the game will end.
+class Inventory:
+    """Represents the items a player is carrying. The total weight and calories
+    are kept up to date as items come and go, so nothing has to be added up again.
+    Int and float values are added up apart, the floats exactly as whole numbers
+    of 2 ** -_shift, which every float is for a large enough _shift. The totals
+    are then what adding up the carried items would give: an int while no
+    carried item has a float, and never off by what was given away.
 
     Attributes
     ----------
-    _create_world():
-        creates the world
-    _commands: dict
-        creates a dictionary that holds the games commands.
-        is set equal to the return call from setup_commands.
-    _Item_list: lst
-        creates a list of all the items the player is holding.
+    _items: dict
+        the items being carried, in the order they were picked up. Used as an
+        ordered set, every value is None.
+    _names: dict
+        item name to the carried items with that name.
     _weight: int
-        creates a variable that keeps track of the current weight
-        the player is holding.
-    _Location_list: lst
-        creates a list of the locations that exist in the game.
-    _current_location: str
-        keeps track of which location the player is in. is set
-        to a random location with random_location.
-    _cals_needed: int
-        keeps track of how many calories are needed to beat the game.
-    _game_progress: bool
-        keeps track of whether the game is continuing or ending.
+        the total of the int weights of the carried items.
+    _float_weight: int
+        the total of the float weights of the carried items, in 2 ** -_shift.
+    _float_weights: int
+        how many carried items have a float weight.
+    _calories: int
+        the total of the int calories of the carried items.
+    _float_calories: int
+        the total of the float calories of the carried items, in 2 ** -_shift.
+    _float_calorie_items: int
+        how many carried items have float calories.
+    _shift: int
+        how many binary places the float totals are kept to, the most any
+        float carried so far has needed.
     """
 
     def __init__(self):
-        self._commands = self.setup_commands()
-        self._Item_list = []
-        self._weight = int(0)
-        self._Location_list = []
-        self.create_world()
-        self._current_location = self.random_location()
-        self._cals_needed = int(500)
-        self._game_progress = True
+        self._items = {}
+        self._names = {}
+        self._weight = 0
+        self._float_weight = 0
+        self._float_weights = 0
+        self._calories = 0
+        self._float_calories = 0
+        self._float_calorie_items = 0
+        self._shift = 0
+
+    def add(self, item: Item) -> None:
+        """adds an item to the inventory
 
-    def create_world(self) -> None:
-        """creates all the Locations, Items, and NPCs in the game.
-        """
-        #Creating all locations in the game
-        limgrave = Location('Limgrave', 'Limgrave is a lush, expansive section of the '
-                            'Tenebrae Demesne. Golden trees and tall grass and bushes' + '\n'
-                            'provide plenty of sustenance for the local wildlife, '
-                            'that features boars, sheep, goat and rodents in' + '\n'
-                            'addition to flying creatures such as eagles and owls. '
-                            'More sinister and aggressive wildlife also exists,' + '\n'
-                            'and those venturing forth should be '
-                            'prepared to combat them.' + '\n')
-        weeping_penninsula = Location('Weeping Penninsula', 'The peninsula, to Limgraves '
-                                      'south, is named for its '
-                                      'unceasing rainfall, redolent of lament.' + '\n')
-        liurnia = Location('Liurnia', 'With its shallow waters and vast wetlands, '
-                           'the region of Liurnia is beset with the '
-                           'gradual sinking of most of its landmass.' + '\n'
-                           'With its forests perpetually blanketed in fog, '
-                           'eerie sounds of bells can''be heard in '
-                           'the distance.' + '\n')
-        caelid = Location('Caelid', 'Caelid, known as the locale of the last '
-                          'battle between General Radahn and Malenia, Blade' + '\n'
-                          'of Miquella, is a vast land consummately marred '
-                          'by scarlet rot.' + '\n')
-        dragonbarrow = Location('Dragonbarrow', 'The dragons that escaped the scarlet rot '
-                                'made nest of the plateau to Caelids north. '
-                                'Thus it was named "Dragonbarrow," '
-                                'and none dare to enter.' + '\n')
-        atlus_plateau = Location('Atlus Plateau', 'Atlus Plateau, a large area filled with '
-                                 'tall golden trees, '
-                                 'lush golden grass, and many useful materials.' + '\n')
-        mt_gelmir = Location('Mt. Gelmir', 'Mt. Gelmir is a volcanic region west '
-                             'of the Altus Plateau, ruled over by the '
-                             'enigmatic Volcano Manor and their lord, Praetor Rykard.' + '\n'
-                             'This region has been'
-                             'ravaged, and is home to many grotesque creatures.' + '\n')
-        leyndell = Location('Leyndell', 'The Capital City, located at the foot '
-                            'of the Erdtree. Despite being partially '
-                            'destroyed by the dragon Gransax, it still' + '\n'
-                            'holds strong to this day. It houses '
-                            'many strong foes, along with the mysterious '
-                            'Veiled Monarch, Morgott.' + '\n')
-        mountaintops_of_the_giants = Location('Mountaintops of the Giants',
-                                              'The fabled domain of the Giants, now in ruins. '
-                                              'Devastated after their war against '
-                                              'the Erdtree, their corpses lay frozen at the peak, '
-                                              'with only the Fire Monks residing close by.' + '\n')
-
-        #Adding locations into the _Location_list
-        self._Location_list.append(limgrave)
-        self._Location_list.append(weeping_penninsula)
-        self._Location_list.append(liurnia)
-        self._Location_list.append(caelid)
-        self._Location_list.append(dragonbarrow)
-        self._Location_list.append(atlus_plateau)
-        self._Location_list.append(mt_gelmir)
-        self._Location_list.append(leyndell)
-        self._Location_list.append(mountaintops_of_the_giants)
-
-        #Adding the neighboring locations for each location
-        #Limgrave
-        limgrave.add_location('north', liurnia)
-        limgrave.add_location('east', caelid)
-        limgrave.add_location('south', weeping_penninsula)
-        #Caelid
-        caelid.add_location('north', dragonbarrow)
-        caelid.add_location('west', limgrave)
-        #Liurnia
-        liurnia.add_location('north', atlus_plateau)
-        liurnia.add_location('south', limgrave)
-        #Weeping Penninsula
-        weeping_penninsula.add_location('north', limgrave)
-        #Dragonbarrow
-        dragonbarrow.add_location('south', caelid)
-        #Atlus Plateau
-        atlus_plateau.add_location('north', mt_gelmir)
-        atlus_plateau.add_location('east', leyndell)
-        atlus_plateau.add_location('south', liurnia)
-        #Leyndell
-        leyndell.add_location('east', mountaintops_of_the_giants)
-        leyndell.add_location('west', atlus_plateau)
-        #Mt. Gelmir
-        mt_gelmir.add_location('south', atlus_plateau)
-        #Mountaintops of the Giants
-        mountaintops_of_the_giants.add_location('west', leyndell)
-
-        #Creating items
-        boiled_prawn = Item('Boiled Prawn', 'It looks a little green...', calories=62.5, weight=4)
-        boiled_crab = Item('Boiled Crab', 'Better than Red Lobster!', calories=62.5, weight=4)
-        white_cured_meat = Item('White Cured Meat', 'Mm-mmmm... meat!', calories=62.5, weight=3)
-        cooked_meat = Item('Cooked Meat', 'Its a little too rare for me...',
-                           calories=62.5, weight=4)
-        flask_of_crimson_tears = Item('Flask of Crimson Tears', 'It glows... and tastes good!',
-                                      calories=62.5 ,weight=6)
-        flask_of_cerulean_tears = Item('Flask of Cerulean Tears', 'The first one was way better.',
-                                       calories=62.5, weight=6)
-        broken_sword = Item('Broken Sword', 'Belonged to the knights of Miquella... '
-                                            'I wonder where they are...',
-                            calories=0, weight=6)
-        damaged_armor = Item('Damaged Armor', 'This armor belonged to one of Miquellas soldiers '
-                                              'as well ...I wonder if ill need it...',
-                             calories=0, weight=15)
-        boiled_fish = Item('Boiled Fish', 'Did anybody even season this thing?',
-                           calories=62.5, weight=4)
-        silver_pickled_foul_foot = Item('Silver Pickled Foul Foot', 'W-who would even EAT this?',
-                                        calories=62.5, weight=2)
-        oil_pot = Item('Oil Pot', 'If only I had a match...',
-                       calories=0,weight=7)
-        dark_elf_sword = Item('Dark Elf Sword', 'I wonder if there is another way to '
-                                                'save the land...',
-                              calories=0, weight=30)
-
-        #Adding items to respected locations
-        limgrave.item_list(boiled_prawn)
-        limgrave.item_list(boiled_crab)
-        weeping_penninsula.item_list(white_cured_meat)
-        liurnia.item_list(cooked_meat)
-        caelid.item_list(flask_of_cerulean_tears)
-        caelid.item_list(flask_of_crimson_tears)
-        dragonbarrow.item_list(broken_sword)
-        dragonbarrow.item_list(damaged_armor)
-        atlus_plateau.item_list(boiled_fish)
-        atlus_plateau.item_list(dark_elf_sword)
-        mt_gelmir.item_list(silver_pickled_foul_foot)
-        leyndell.item_list(oil_pot)
-
-        #Creating npcs and setting their message list
-        merchant_kale = NPC('Merchant Kale', 'A lonely merchant')
-        merchant_kale.npc_message_list(['You are a Tarnished, I can see it. And I can also see... '
-                                        'that youre not after my throat.' + '\n'
-                                        'Then why not purchase '
-                                        'a little something? I am Kale, Purveyor of fine goods.',
-                                        'What is it? Still going to purchase something?',
-                                        'Good-bye, for now.'])
-        witch_hunter_jerren = NPC('Witch Hunter Jerren', 'Known as Catellan Jerren, '
-                                  'a harold at the Radahn Festival.' + '\n'
-                                  'It is said that Jerren helped the tarnished one defeat Radahn.')
-        witch_hunter_jerren.npc_message_list(['Oh, Tarnished, are you? How did you slip inside, '
-                                              'with the gate closed?' + '\n'
-                                              'Hmph. No matter. If you can fell '
-                                              'one of them, you are a champion, in my book. '
-                                              'I am Jerren. Foolish old warrior, and witness.' + '\n'
-                                              'Incidentally, do you like a good '
-                                              'festival, from time to time? Well, '
-                                              'its true, this fortress houses only the' + '\n'
-                                              'vanquished. But when the stars align, '
-                                              'we celebrate. A war festival honoring the '
-                                              'last battle and death of General Radahn, '
-                                              'the mightiest demigod of the Shattering,' + '\n'
-                                              'and bearer of a Great Rune.',
-                                              'Well, you are not much fun, are '
-                                              'you, chum? No matter.' + '\n'
-                                              'One day you will see. That true '
-                                              'warriors bask in glory at the festival.',
-                                              'Go on, now. This old geezer has not '
-                                              'any use for you just yet.'])
-        miriel = NPC('Miriel', 'The Church of Vows steward, a huge silver turtle wearing a mitre.')
-        miriel.npc_message_list(
-            ['Youre Tarnished, arent you? I Welcome you,'
-             'to the Church of Vows. I am Miriel, steward of' + '\n'
-             'this sacred chamber. My apologies, '
-             'for the unseemly state of affairs. '
-             'Do you know the origin of this place?',
-             'Is there something else?', 'Bye now, '
-             'come again.'])
-        blaidd = NPC('Blaidd', 'Half man, half wolf, and trusted '
-                     'companion and guardian of Ranni the Witch.')
-        blaidd.npc_message_list(
-            ['Ahh, long time, friend. Blaidd, if you’ve forgotten. '
-             'Glad to have you in the service of mistress Ranni',
-             'Do you need any assistance?', 'Thats enough '
-             'chit-chat for now. Its time we parted ways.'])
-        alexander_warrior_jar = NPC('Alexander Warrior Jar',
-                                    'Know as Iron Fist Alexander, a large living'
-                                    'jar who set out from' + '\n'
-                                    'his home one day ins search'
-                                    'of adventure, seeking to become'
-                                    'a mighty warrior.')
-        alexander_warrior_jar.npc_message_list(
-            ['Oh my stars Im so happy to see you! I am Alexander, '
-             'also known as the Iron Fist.',
-             'I left my home in search of adventure, '
-             'and it has brought me to you! Please, traveler,' + '\n'
-             'duel me! Let us fight until the sun sets!',
-             'Hmmm.. thats what I thought. Well, '
-             'you know where to find me when you are '
-             'looking for a good fight!'])
-        elf = NPC('Elf', 'The proclaimed Elf Lord of the Mountains, '
-                         'yet to be touched by the Scarlet Rot.' + '\n'
-                         'Legend has it, if he is fed enough goods, '
-                         'the Lands Between might be saved from the darkness.')
-        elf.npc_message_list(['Mmmmmm...hungry...',
-                              'Hmph....*stomach gurgles*',
-                              'Feed...me...'])
-
-        #Adding npcs to their respected locations
-        limgrave.add_npc(merchant_kale)
-        weeping_penninsula.add_npc(witch_hunter_jerren)
-        liurnia.add_npc(miriel)
-        caelid.add_npc(blaidd)
-        mt_gelmir.add_npc(alexander_warrior_jar)
-        mountaintops_of_the_giants.add_npc(elf)
+        parameters:
+        ----------
+        item: Item:
+            the item picked up
+        """
+        self._items[item] = None
+        self._names.setdefault(item._name, []).append(item)
+        self._count(item, 1)
 
-    def setup_commands(self) -> dict[str, callable]:
-        """creates a new dictionary for commands.
+    def remove(self, item: Item) -> None:
+        """removes an item from the inventory, raises a KeyError if it is not there
+
+        parameters:
+        ----------
+        item: Item:
+            the item dropped
+
+        error:
+        -----
+        KeyError:
+            the item is not in the inventory
+        """
+        del self._items[item]
+        same_name = self._names[item._name]
+        same_name.remove(item)
+        if not same_name:
+            del self._names[item._name]
+        self._count(item, -1)
+
+    def _count(self, item: Item, sign: int) -> None:
+        """adds an items weight and calories to the totals, or takes them away
+
+        parameters:
+        ----------
+        item: Item:
+            the item picked up or dropped
+        sign: int:
+            1 to add the item, -1 to take it away
+        """
+        weight = item._weight
+        if isinstance(weight, float):
+            #_units may rescale the float totals, so it runs before they are read
+            units = self._units(weight)
+            self._float_weight += sign * units
+            self._float_weights += sign
+        else:
+            self._weight += sign * weight
+        calories = item._calories
+        if isinstance(calories, float):
+            units = self._units(calories)
+            self._float_calories += sign * units
+            self._float_calorie_items += sign
+        else:
+            self._calories += sign * calories
+
+    def _units(self, value: float) -> int:
+        """returns a float as a whole number of 2 ** -_shift, first keeping the
+        float totals to more binary places if the float needs them
+
+        parameters:
+        ----------
+        value: float:
+            a weight or calories
 
         returns:
         -------
-        commands:
-            a dictionary containing a str(direction) and a callable(location)
+        int:
+            value times 2 ** _shift
         """
-        commands = {'talk': self.talk,
-                    'help': self.show_help,
-                    'meet': self.meet,
-                    'take': self.take,
-                    'give': self.give,
-                    'go': self.go,
-                    'items': self.show_items,
-                    'look': self.look,
-                    'quit': self.quit,
-                    'teleport': self.teleport,
-                    'inspect': self.inspect,
-                    'fight': self.fight}
-        return commands
+        numerator, denominator = value.as_integer_ratio()
+        places = denominator.bit_length() - 1
+        if places > self._shift:
+            self._float_weight <<= places - self._shift
+            self._float_calories <<= places - self._shift
+            self._shift = places
+        return numerator << (self._shift - places)
 
-    def random_location(self) -> Location:
-        """selects a random location from the locations list and
-        returns that location.
+    def get(self, name: str):
+        """returns a carried item with the given name, or None if there is none
+
+        parameters:
+        ----------
+        name: str:
+            the name of the item
 
         returns:
         -------
-        a random location chosen from the list of gae locations
+        item:
+            the item, or None
         """
-        return random.choice(self._Location_list)
-
-    def play(self) -> None:
-        """Core game loop. Prints beginning message, then calls method to list commands.
-        Then checks if elf has been fed enough or not fed enough.
-        """
-        print(Fore.GREEN + 'Welcome to the Lands Between, '
-              'a vast domain ruled by Queen Marika the Eternal.' + '\n'
-              'In order to successfully save the land, you, '
-              'the player, has to scavenge '
-              'food from around the world to feed the elf.' + '\n'
-              'After the elf has ingested 500 calories '
-              'worth of food, he will lift the curse '
-              'that was placed upon this domain, saving all '
-              'who reside within it.' + '\n')
-        self.show_help()
-
-        while self._game_progress:
-            if self._cals_needed <= 0:
-                print()
-                print(Fore.GREEN + 'The elf was fed 500 calories. '
-                      'The Lands Between '
-                      'have finally been saved. '
-                      'Thank you, kind traveler.')
-                self._game_progress = False
-                break
+        same_name = self._names.get(name)
+        return same_name[0] if same_name else None
 
-            if 'Dark Elf Sword' in [item._name for item in self._Item_list]:
-                if self._current_location._name == 'Mountaintops of the Giants':
-                    print()
-                    print(Fore.YELLOW + 'You approach the Elf while he sits '
-                          'on his throne. Everything was a lie. '
-                          'Feeding the him would only'
-                          'destroy the Lands Between, not save it. ' + '\n'
-                          'You slowly draw your sword from its holster, '
-                          'black flames emerging'
-                          'from the blade.' + '\n')
-                    print()
-                    sleep(2)
-                    print(Fore.CYAN + 'Elf:', Fore.RED + 'Ahhhh... so you have '
-                          'finally figured me out. This land was always doomed.' + '\n'
-                          'I only brought the Scarlet Rot upon its inhabitants '
-                          'to save them from the worlds wrath.' + '\n')
-                    print()
-                    sleep(2)
-                    print(Fore.YELLOW + 'You let out a horrifying roar as you'
-                          'rush towards the throne, sword in hand. '
-                          'The Elf tries to move,'
-                          'but your sword reaches him first. The '
-                          'moment the blade cuts through his neck, '
-                          'the swords black flames seem to become enraged.' + '\n'
-                          'You follow through, and his head is gone. '
-                          'The flames engulf his body, slowing turning it'
-                          'into a dark pile of ash. The Elf is dead.')
-                    print()
-                    sleep(2)
-                    print(Fore.YELLOW + 'You have done it, traveler. '
-                          'The Lands Between are finally saved.')
-                    self._game_progress = False
-                    quit()
+    def has(self, name: str) -> bool:
+        """checks if an item with the given name is being carried
 
-            print()
-            user_response = input(Fore.RED + 'Input command here: ')
-            print()
-            tokens = user_response.split()
-            if tokens:
-                command = tokens[0]
-                del(tokens[0])
-                target = ' '.join(tokens)
-
-                if command in self._commands:
-                    self._commands[command](target)
-                else:
-                    print(Fore.RED + 'Please choose a valid command.')
-            else:
-                print(Fore.RED + 'Please enter a command.')
+        parameters:
+        ----------
+        name: str:
+            the name of the item
 
-        if self._cals_needed > 0:
-            print(Fore.RED + 'The elf has not been fed enough. For the sake of the land,'
-                             'find more food.')
+        returns:
+        -------
+        bool:
+            True if the item is being carried
+        """
+        return name in self._names
 
-        quit()
+    def get_items(self):
+        """returns the carried items in the order they were picked up
 
-    def show_help(self, target=None):
-        """prints a help message along with all commands from dictionary.
+        returns:
+        -------
+        self._items:
+            the items, as the keys of a dictionary
         """
-        now = datetime.datetime.now()
-        print(Fore.YELLOW + 'Current time:', now.strftime(Fore.YELLOW + "%Y-%m-%d %H:%M:%S"))
-        print(Fore.YELLOW + 'List of available commands:', ', '.join(self._commands.keys()))
+        return self._items.keys()
 
-    def inspect(self, target):
-        """if the target item is in your inventory,
-        it prints out its name,
-        description, weight, and calories.
-        prints a statement if the item is not in your inventory.
+    def get_weight(self):
+        """gets and returns the total weight being carried
 
-        parameters:
-        ----------
-        target:
-            the item you wish to look at
+        returns:
+        -------
+        weight:
+            an int, or the nearest float if a carried item has a float weight
         """
-        item = None
-        for i in self._Item_list:
-            if i._name == target:
-                item = i
-                break
-        if item:
-            print(Fore.CYAN + f'{item._name}: {Fore.YELLOW + item._description}')
-            print(Fore.CYAN + f'Item weight: {Fore.YELLOW + str(item._weight)}')
-            print(Fore.CYAN + f'Item calories: {Fore.YELLOW + str(item._calories)}')
-        else:
-            print(f'{Fore.YELLOW + target}', Fore.RED + 'not in inventory.')
+        if self._float_weights:
+            return ((self._weight << self._shift) + self._float_weight) / (1 << self._shift)
+        return self._weight
 
-    def fight(self, target):
-        """if the target is in the location,
-        you can fight them. If you have the Dark Elf Sword,
-        you can kill npcs and finish the game by killing the elf
+    def get_calories(self):
+        """gets and returns the total calories being carried
 
-        parameters:
-        ----------
-        target:
-            the target npc
+        returns:
+        -------
+        calories:
+            an int, or the nearest float if a carried item has float calories
         """
-        loc_npc = None
-        for npc in self._current_location.get_npcs():
-            if npc._name == target:
-                loc_npc = npc
-                break
-        if loc_npc and 'Dark Elf Sword' in [item._name for item in self._Item_list]:
-            print(f'{Fore.BLUE + target}', '' + Fore.RED + 'I challenge you to a fight '
-                                                           'to the death.')
-            print()
-            sleep(2)
-            print(f'{Fore.BLUE + target}:', Fore.MAGENTA + 'You dare wish to fight me? '
-                                                           'I will kill you!')
-            print()
-            sleep(2)
-            print(f'{Fore.BLUE + target}', Fore.RED + 'has been slain.')
-            self._current_location.del_npc(loc_npc)
-            return
+        if self._float_calorie_items:
+            return ((self._calories << self._shift) + self._float_calories) / (1 << self._shift)
+        return self._calories
 
-        if loc_npc and 'Dark Elf Sword' not in [item._name for item in self._Item_list]:
-            print(f'{Fore.BLUE + target}', '' + Fore.RED + 'I challenge you to a '
-                                                           'fight to the death.')
-            print()
-            sleep(2)
-            print(f'{Fore.BLUE + target}:', Fore.MAGENTA + '*Pulls a small knife out of'
-                  'their boot*...never bring only your fists to a knife fight.')
-            print()
-            sleep(2)
-            print(f'{Fore.BLUE + target}', Fore.RED + 'has killed you in battle. '
-                  'You were sent to a random location.')
-            self._current_location = self.random_location()
-        else:
-            print(f'{Fore.BLUE + target}', Fore.RED + 'is not in this location.')
+    def __len__(self):
+        """returns how many items are being carried
 
-    def teleport(self, target):
-        """if a location has been discovered, the player can teleport to said
-        location from any other discovered location
+        returns:
+        -------
+        int:
+            the number of items
+        """
+        return len(self._items)
 
-        parameters:
-        ----------
-        target:
-            the location we are trying to teleport to
+    def __iter__(self):
+        """iterates over the carried items in the order they were picked up
+
+        returns:
+        -------
+        iterator:
+            the items
         """
-        target_location = None
-        for loc in self._Location_list:
-            if loc._name == target:
-                target_location = loc
-                break
-        if target_location:
-            if target_location == self._current_location:
-                print(Fore.RED + 'You are already in this location.')
-            elif target in [loc._name for loc in self._Location_list]:
-                if target_location._visited is True:
-                    self._current_location._neighbors['teleport'] = target_location
-                    self._current_location = target_location
-                    print(Fore.GREEN + f'You have teleported to '
-                          f'{Fore.YELLOW + target_location._name}')
-            else:
-                print(Fore.RED + 'this location has not been discovered.')
-        else:
-            print(Fore.RED + 'That is not a valid location to teleport to.')
+        return iter(self._items)
 
-    def talk(self, target) -> None:
-        """checks if NPC is in the room, if so it calls the NPC's get_message.
+
+class WorldTemplate:
+    """Represents the parts of a world that never change during a game: the
+    locations and how they connect, the items and where they start, and the
+    npcs and what they say. A template is built once and shared by every game
+    played in it; each game keeps its own changes in a WorldState.
+
+    Attributes
+    ----------
+    _Location_list: lst
+        every location in the world, in the order they were added.
+    _Item_list: lst
+        every item in the world, in the order they were added.
+    _NPC_list: lst
+        every npc in the world, in the order they were added.
+    _location_index: dict
+        location name to location.
+    _graph: WorldGraph
+        the compiled graph of the locations, built by get_graph once the world is complete.
+    _item_owners: array
+        item id to the id of the location it starts in, built by get_item_owners.
+    _item_names: dict
+        item name to every item with that name, built by get_items_named.
+    _parser: CommandParser
+        parses the input of every game in the world, built by get_parser.
+    """
+
+    def __init__(self):
+        self._Location_list = []
+        self._Item_list = []
+        self._NPC_list = []
+        self._location_index = {}
+        self._graph = None
+        self._item_owners = None
+        self._item_names = None
+        self._parser = None
+
+    def add_location(self, location: Location) -> Location:
+        """adds a location to the world and gives it an id
 
         parameters:
         ----------
-        target:
-            the npc we are trying to talk to
+        location: Location:
+            the location being added
+
+        returns:
+        -------
+        location:
+            the location that was added
         """
-        loc_npc = None
-        for npc in self._current_location.get_npcs():
-            if npc._name == target:
-                loc_npc = npc
-                break
-        if loc_npc:
-            message = loc_npc.get_message_number()
-            print(f'{Fore.BLUE + target}: {Fore.MAGENTA + message}')
-        else:
-            print(f'{Fore.BLUE + target}', Fore.RED + 'is not in this location.')
+        location._id = len(self._Location_list)
+        self._Location_list.append(location)
+        self._location_index.setdefault(location._name, location)
+        self._graph = None
+        self._parser = None
+        return location
 
-    def meet(self, target) -> None:
-        """checks if NPC is in the room, if so asks for NPC description.
+    def add_item(self, location: Location, item: Item) -> Item:
+        """adds an item to the world, starting in the given location
 
         parameters:
         ----------
-        target:
-            the npc we are trying to meet
+        location: Location:
+            where the item starts the game
+        item: Item:
+            the item being added
+
+        returns:
+        -------
+        item:
+            the item that was added
         """
-        meet_npc = None
-        for npc in self._current_location.get_npcs():
-            if npc._name == target:
-                meet_npc = npc
-                break
-        if meet_npc:
-            description = meet_npc.get_description()
-            print(f'{Fore.BLUE + target}: {Fore.MAGENTA + description}')
-        else:
-            print(f'{Fore.BLUE + target}', Fore.RED + 'is not in this location.')
+        item._id = len(self._Item_list)
+        self._Item_list.append(item)
+        location.item_list(item)
+        self._item_owners = None
+        self._item_names = None
+        self._parser = None
+        return item
 
-    def take(self, target) -> None:
-        """if target is in the room, removes it from the rooms inventory and adds
-        it to the users inventory, along with the weight.
+    def add_npc(self, location: Location, npc: NPC) -> NPC:
+        """adds a npc to the world, starting in the given location
+
+        parameters:
+        ----------
+        location: Location:
+            where the npc starts the game
+        npc: NPC:
+            the npc being added
+
+        returns:
+        -------
+        npc:
+            the npc that was added
+        """
+        npc._id = len(self._NPC_list)
+        self._NPC_list.append(npc)
+        location.add_npc(npc)
+        self._parser = None
+        return npc
+
+    def get_locations(self) -> list[Location]:
+        """returns every location in the world
+
+        returns:
+        -------
+        self._Location_list:
+            an instance of _Location_list
+        """
+        return self._Location_list
+
+    def get_location(self, name: str):
+        """returns the location with the given name, or None if there is no such location
+
+        parameters:
+        ----------
+        name: str:
+            the name of the location
+
+        returns:
+        -------
+        location:
+            the location, or None
+        """
+        return self._location_index.get(name)
+
+    def get_graph(self):
+        """returns the compiled graph of the worlds locations, compiling it the
+        first time it is needed. Neighbors added after that are not part of it.
+
+        returns:
+        -------
+        self._graph:
+            the WorldGraph of this world
+        """
+        if self._graph is None:
+            from worldgraph import WorldGraph
+            self._graph = WorldGraph(self)
+        return self._graph
+
+    def get_parser(self, commands):
+        """returns the parser shared by every game in the world, creating it
+        the first time it is needed
+
+        parameters:
+        ----------
+        commands:
+            the names of the games commands
+
+        returns:
+        -------
+        self._parser:
+            the CommandParser of this world
+        """
+        if self._parser is None:
+            from parser import CommandParser
+            self._parser = CommandParser(self, commands)
+        return self._parser
+
+    def get_name_maps(self) -> dict:
+        """returns, for the items, npcs, locations and directions of the world,
+        every name folded with str.casefold mapped to the name as the world spells it
+
+        returns:
+        -------
+        maps:
+            'items', 'npcs', 'locations' and 'directions' to their mapping
+        """
+        directions = {}
+        for location in self._Location_list:
+            for direction in location._neighbors:
+                directions[direction.casefold()] = direction
+        return {'items': {item._name.casefold(): item._name for item in self._Item_list},
+                'npcs': {npc._name.casefold(): npc._name for npc in self._NPC_list},
+                'locations': {location._name.casefold(): location._name for location in self._Location_list},
+                'directions': directions}
+
+    def get_item_owners(self) -> array:
+        """returns the id of the location every item starts in, indexed by item id.
+        Built once and shared by every game; it must not be changed.
+
+        returns:
+        -------
+        self._item_owners:
+            an instance of _item_owners
+        """
+        if self._item_owners is None:
+            owners = array('i', bytes(4 * len(self._Item_list)))
+            for location in self._Location_list:
+                for item in location._item_list:
+                    owners[item._id] = location._id
+            self._item_owners = owners
+        return self._item_owners
+
+    def get_items_named(self, name: str) -> tuple[Item, ...]:
+        """returns every item with the given name, in the order they were added
+
+        parameters:
+        ----------
+        name: str:
+            the name of the items
+
+        returns:
+        -------
+        items:
+            the items, empty if there are none
+        """
+        if self._item_names is None:
+            names = {}
+            for item in self._Item_list:
+                names.setdefault(item._name, []).append(item)
+            self._item_names = {name: tuple(items) for name, items in names.items()}
+        return self._item_names.get(name, ())
+
+    def get_items(self) -> list[Item]:
+        """returns every item in the world
+
+        returns:
+        -------
+        self._Item_list:
+            an instance of _Item_list
+        """
+        return self._Item_list
+
+    def get_npcs(self) -> list[NPC]:
+        """returns every npc in the world
+
+        returns:
+        -------
+        self._NPC_list:
+            an instance of _NPC_list
+        """
+        return self._NPC_list
+
+
+#how many look views a game keeps
+VIEW_CACHE_SIZE = 128
+
+
+# noinspection PyProtectedMember
+class WorldState:
+    """Represents one games changes to a WorldTemplate. Nothing is copied
+    when a game starts; a locations items, npcs or neighbors are copied from the
+    template the first time the game changes them, and every other location keeps
+    reading the template.
+
+    Attributes
+    ----------
+    _world: WorldTemplate
+        the world this state belongs to.
+    _visited: set
+        the ids of the locations the player has been to, so a game costs
+        nothing for the locations it never reaches.
+    _items: dict
+        location id to the locations items, for locations whose items changed.
+    _item_indexes: dict
+        location id to the locations item name index, for the same locations as _items.
+    _npcs: dict
+        location id to the locations npcs, for locations whose npcs changed.
+    _npc_indexes: dict
+        location id to the locations npc name index, for the same locations as _npcs.
+    _neighbors: dict
+        location id to the locations neighbors, for locations whose neighbors changed.
+    _message_numbers: dict
+        npc id to the next message that npc will say, for npcs that have spoken.
+    _discovered: list
+        the ids of the visited locations, in order.
+    _views: OrderedDict
+        location id to the output look last made for the location, most recently used last.
+    """
+
+    def __init__(self, world: WorldTemplate):
+        """
+        parameters:
+        ----------
+        world: WorldTemplate:
+            the world this state belongs to
+        """
+        self._world = world
+        self._visited = set()
+        self._discovered = []
+        self._views = OrderedDict()
+        self._items = {}
+        self._item_indexes = {}
+        self._npcs = {}
+        self._npc_indexes = {}
+        self._neighbors = {}
+        self._message_numbers = {}
+
+    def get_world(self) -> WorldTemplate:
+        """gets and returns the world this state belongs to
+
+        returns:
+        -------
+        self._world:
+            an instance of _world
+        """
+        return self._world
+
+    def get_items(self, location: Location) -> list[Item]:
+        """returns the items currently in a location. The list must not be changed,
+        use add_item and remove_item instead.
+
+        parameters:
+        ----------
+        location: Location:
+            the location to look in
+
+        returns:
+        -------
+        items:
+            the items in the location
+        """
+        return self._items.get(location._id, location._item_list)
+
+    def get_item(self, location: Location, name: str):
+        """returns the item with the given name in a location, or None if it is not there
+
+        parameters:
+        ----------
+        location: Location:
+            the location to look in
+        name: str:
+            the name of the item
+
+        returns:
+        -------
+        item:
+            the item, or None
+        """
+        return self._item_indexes.get(location._id, location._item_index).get(name)
+
+    def add_item(self, location: Location, item: Item) -> None:
+        """puts an item in a location
+
+        parameters:
+        ----------
+        location: Location:
+            the location the item is put in
+        item: Item:
+            the item
+        """
+        items, index = self._own_items(location)
+        items.append(item)
+        index.setdefault(item._name, item)
+        self._views.pop(location._id, None)
+
+    def remove_item(self, location: Location, item: Item) -> None:
+        """takes an item out of a location
+
+        parameters:
+        ----------
+        location: Location:
+            the location the item is taken from
+        item: Item:
+            the item
+        """
+        items, index = self._own_items(location)
+        items.remove(item)
+        unindex(index, items, item)
+        self._views.pop(location._id, None)
+
+    def get_npcs(self, location: Location) -> list[NPC]:
+        """returns the npcs currently in a location. The list must not be changed,
+        use remove_npc instead.
+
+        parameters:
+        ----------
+        location: Location:
+            the location to look in
+
+        returns:
+        -------
+        npcs:
+            the npcs in the location
+        """
+        return self._npcs.get(location._id, location._npc_list)
+
+    def get_npc(self, location: Location, name: str):
+        """returns the npc with the given name in a location, or None if it is not there
+
+        parameters:
+        ----------
+        location: Location:
+            the location to look in
+        name: str:
+            the name of the npc
+
+        returns:
+        -------
+        npc:
+            the npc, or None
+        """
+        return self._npc_indexes.get(location._id, location._npc_index).get(name)
+
+    def remove_npc(self, location: Location, npc: NPC) -> None:
+        """removes a npc from a location
+
+        parameters:
+        ----------
+        location: Location:
+            the location the npc is in
+        npc: NPC:
+            the npc
+        """
+        if location._id not in self._npcs:
+            self._npcs[location._id] = list(location._npc_list)
+            self._npc_indexes[location._id] = dict(location._npc_index)
+        npcs = self._npcs[location._id]
+        npcs.remove(npc)
+        unindex(self._npc_indexes[location._id], npcs, npc)
+        self._views.pop(location._id, None)
+
+    def get_neighbors(self, location: Location) -> dict[str, Location]:
+        """returns the directions the player can travel from a location. The
+        dictionary must not be changed, use set_neighbor instead.
+
+        parameters:
+        ----------
+        location: Location:
+            the location being left
+
+        returns:
+        -------
+        neighbors:
+            a dictionary of direction to location
+        """
+        return self._neighbors.get(location._id, location._neighbors)
+
+    def set_neighbor(self, location: Location, direction: str, neighbor: Location) -> None:
+        """adds or replaces the location reached by going in a direction
+
+        parameters:
+        ----------
+        location: Location:
+            the location being left
+        direction: str:
+            the direction traveled
+        neighbor: Location:
+            the location reached
+        """
+        if location._id not in self._neighbors:
+            self._neighbors[location._id] = dict(location._neighbors)
+        self._neighbors[location._id][direction] = neighbor
+        self._views.pop(location._id, None)
+
+    def get_visited(self, location: Location) -> bool:
+        """checks if the player has been to a location
+
+        parameters:
+        ----------
+        location: Location:
+            the location
+
+        returns:
+        -------
+        bool:
+            True once the location has been visited
+        """
+        return location._id in self._visited
+
+    def set_visited(self, location: Location) -> None:
+        """marks a location as visited. The first time, the views of the
+        locations leading to it are dropped, since they now show its name.
+
+        parameters:
+        ----------
+        location: Location:
+            the location
+        """
+        loc_id = location._id
+        if loc_id in self._visited:
+            return
+        self._visited.add(loc_id)
+        insort(self._discovered, loc_id)
+        views = self._views
+        if views:
+            for source in self._world.get_graph().get_sources(loc_id):
+                views.pop(source, None)
+            for source, neighbors in self._neighbors.items():
+                if location in neighbors.values():
+                    views.pop(source, None)
+
+    def get_discovered(self) -> list[int]:
+        """returns the ids of the visited locations, in the order of the
+        worlds locations. The list must not be changed, use set_visited instead.
+
+        returns:
+        -------
+        ids:
+            the location ids
+        """
+        return self._discovered
+
+    def get_view(self, location: Location):
+        """returns what look last showed of a location, or None if something
+        it shows has changed since
+
+        parameters:
+        ----------
+        location: Location:
+            the location
+
+        returns:
+        -------
+        view:
+            the list of OutputEvents, which must not be changed, or None
+        """
+        view = self._views.get(location._id)
+        if view is not None:
+            self._views.move_to_end(location._id)
+        return view
+
+    def set_view(self, location: Location, view: list) -> None:
+        """keeps what look showed of a location until something it shows
+        changes, dropping the least recently used view once VIEW_CACHE_SIZE are kept
+
+        parameters:
+        ----------
+        location: Location:
+            the location
+        view: list:
+            the OutputEvents look made
+        """
+        self._views[location._id] = view
+        if len(self._views) > VIEW_CACHE_SIZE:
+            self._views.popitem(last=False)
+
+    def next_message(self, npc: NPC) -> str:
+        """returns the npcs current message and moves on to its next one,
+        the same way NPC.get_message_number does
+
+        parameters:
+        ----------
+        npc: NPC:
+            the npc talking
+
+        returns:
+        -------
+        message:
+            what the npc says
+        """
+        number = self._message_numbers.get(npc._id, npc._message_number)
+        self._message_numbers[npc._id] = (number + 1) % len(npc._message_list)
+        return npc._message_list[number]
+
+    def dump(self, ints: array, directions: list) -> None:
+        """appends this states changes to the template to a snapshot, as location,
+        item and npc ids. Directions are stored as positions in the directions list,
+        which is added to as new ones are found.
+
+        parameters:
+        ----------
+        ints: array:
+            the snapshots unsigned integers
+        directions: list:
+            the direction names used by the snapshot
+        """
+        ints.append(len(self._discovered))
+        ints.extend(self._discovered)
+
+        for overlay in (self._changed_items(), self._npcs):
+            ints.append(len(overlay))
+            for loc_id, objects in overlay.items():
+                ints.append(loc_id)
+                ints.append(len(objects))
+                ints.extend([obj._id for obj in objects])
+
+        direction_ids = {direction: number for number, direction in enumerate(directions)}
+        ints.append(len(self._neighbors))
+        for loc_id, neighbors in self._neighbors.items():
+            ints.append(loc_id)
+            ints.append(len(neighbors))
+            for direction, neighbor in neighbors.items():
+                if direction not in direction_ids:
+                    direction_ids[direction] = len(directions)
+                    directions.append(direction)
+                ints.append(direction_ids[direction])
+                ints.append(neighbor._id)
+
+        ints.append(len(self._message_numbers))
+        for npc_id, number in self._message_numbers.items():
+            ints.append(npc_id)
+            ints.append(number)
+
+    def load(self, ints: array, position: int, directions: list) -> int:
+        """replaces this states changes with the ones stored in a snapshot
+        by dump
+
+        parameters:
+        ----------
+        ints: array:
+            the snapshots unsigned integers
+        position: int:
+            where this states part of the snapshot starts
+        directions: list:
+            the direction names used by the snapshot
+
+        returns:
+        -------
+        position:
+            where the next part of the snapshot starts
+        """
+        locations = self._world._Location_list
+        count = ints[position]
+        self._visited = set(ints[position + 1:position + 1 + count])
+        self._discovered = sorted(self._visited)
+        self._views = OrderedDict()
+        position += 1 + count
+
+        overlays = []
+        for every in (self._world._Item_list, self._world._NPC_list):
+            lists = {}
+            indexes = {}
+            count = ints[position]
+            position += 1
+            for _ in range(count):
+                loc_id = ints[position]
+                length = ints[position + 1]
+                objects = [every[obj_id] for obj_id in ints[position + 2:position + 2 + length]]
+                index = {}
+                for obj in objects:
+                    index.setdefault(obj._name, obj)
+                lists[loc_id] = objects
+                indexes[loc_id] = index
+                position += 2 + length
+            overlays.append((lists, indexes))
+        (self._items, self._item_indexes), (self._npcs, self._npc_indexes) = overlays
+
+        self._neighbors = {}
+        count = ints[position]
+        position += 1
+        for _ in range(count):
+            loc_id = ints[position]
+            length = ints[position + 1]
+            position += 2
+            neighbors = {}
+            for _ in range(length):
+                neighbors[directions[ints[position]]] = locations[ints[position + 1]]
+                position += 2
+            self._neighbors[loc_id] = neighbors
+
+        self._message_numbers = {}
+        count = ints[position]
+        position += 1
+        for _ in range(count):
+            self._message_numbers[ints[position]] = ints[position + 1]
+            position += 2
+        return position
+
+    def _changed_items(self) -> dict[int, list[Item]]:
+        """returns the items of every location whose items this game has changed
+
+        returns:
+        -------
+        items:
+            location id to the items in the location
+        """
+        return self._items
+
+    def _own_items(self, location: Location) -> tuple[list[Item], dict[str, Item]]:
+        """returns this games own copy of a locations items and their name index,
+        copying them from the template the first time
+
+        parameters:
+        ----------
+        location: Location:
+            the location
+
+        returns:
+        -------
+        items, index:
+            the list of items and the name index, both of which may be changed
+        """
+        items = self._items.get(location._id)
+        if items is None:
+            items = self._items[location._id] = list(location._item_list)
+            self._item_indexes[location._id] = dict(location._item_index)
+        return items, self._item_indexes[location._id]
+
+
+#the owner of an item the player is holding
+HELD = -1
+
+
+# noinspection PyProtectedMember
+class BitsetWorldState(WorldState):
+    """Represents one games changes to a WorldTemplate, keeping track of items
+    by id instead of in lists. A location whose items have changed keeps them as a
+    bitset of item ids, together with one bitset per item name in it, and every item
+    that has moved has its new owner, the id of the location it is in or HELD.
+    Taking and giving an item, and finding an item by name, are then a dict lookup
+    and a couple of bit operations instead of a list.remove, and where an item is
+    can be looked up directly. The items themselves and their starting owners stay
+    in the WorldTemplate, shared by every game, so starting a game copies nothing.
+
+    Items in a changed location are listed in the order of their ids rather than
+    in the order they were put there.
+
+    The bitsets are indexed by the items ids in the whole world, so a bitset takes
+    about one byte for every eight items up to the largest id in it. A changed
+    location holding an item added late to a world of a million items costs
+    around 125 kB per bitset, and more for every name in it.
+
+    Attributes
+    ----------
+    _owners: dict
+        item id to the id of the location the item is in, or HELD, for items that
+        have moved since the game started.
+    _masks: dict
+        location id to a bitset of the ids of the items in it, for locations whose items changed.
+    _name_masks: dict
+        location id to a dict of item name to the bitset of the ids of the items
+        with that name in it, for the same locations as _masks.
+    """
+
+    def __init__(self, world: WorldTemplate):
+        """
+        parameters:
+        ----------
+        world: WorldTemplate:
+            the world this state belongs to
+        """
+        super().__init__(world)
+        self._owners = {}
+        self._masks = {}
+        self._name_masks = {}
+
+    def get_items(self, location: Location) -> list[Item]:
+        """returns the items currently in a location. The list must not be changed,
+        use add_item and remove_item instead.
+
+        parameters:
+        ----------
+        location: Location:
+            the location to look in
+
+        returns:
+        -------
+        items:
+            the items in the location
+        """
+        mask = self._masks.get(location._id)
+        if mask is None:
+            return location._item_list
+        every = self._world._Item_list
+        items = []
+        while mask:
+            low = mask & -mask
+            items.append(every[low.bit_length() - 1])
+            mask ^= low
+        return items
+
+    def get_item(self, location: Location, name: str):
+        """returns the item with the given name in a location, or None if it is not there
+
+        parameters:
+        ----------
+        location: Location:
+            the location to look in
+        name: str:
+            the name of the item
+
+        returns:
+        -------
+        item:
+            the item, or None
+        """
+        names = self._name_masks.get(location._id)
+        if names is None:
+            return location._item_index.get(name)
+        mask = names.get(name)
+        if not mask:
+            return None
+        return self._world._Item_list[(mask & -mask).bit_length() - 1]
+
+    def add_item(self, location: Location, item: Item) -> None:
+        """puts an item in a location
+
+        parameters:
+        ----------
+        location: Location:
+            the location the item is put in
+        item: Item:
+            the item
+        """
+        bit = 1 << item._id
+        self._masks[location._id] = self._own_mask(location) | bit
+        names = self._name_masks[location._id]
+        names[item._name] = names.get(item._name, 0) | bit
+        self._owners[item._id] = location._id
+        self._views.pop(location._id, None)
+
+    def remove_item(self, location: Location, item: Item) -> None:
+        """takes an item out of a location and gives it to the player
+
+        parameters:
+        ----------
+        location: Location:
+            the location the item is taken from
+        item: Item:
+            the item
+        """
+        bit = 1 << item._id
+        self._masks[location._id] = self._own_mask(location) & ~bit
+        names = self._name_masks[location._id]
+        mask = names[item._name] & ~bit
+        if mask:
+            names[item._name] = mask
+        else:
+            del names[item._name]
+        self._owners[item._id] = HELD
+        self._views.pop(location._id, None)
+
+    def locate(self, item: Item):
+        """returns where an item is
+
+        parameters:
+        ----------
+        item: Item:
+            the item
+
+        returns:
+        -------
+        location:
+            the location the item is in, or None if the player is holding it
+        """
+        owner = self._owners.get(item._id)
+        if owner is None:
+            owner = self._world.get_item_owners()[item._id]
+        return None if owner == HELD else self._world._Location_list[owner]
+
+    def load(self, ints: array, position: int, directions: list) -> int:
+        """replaces this states changes with the ones stored in a snapshot
+        by dump. Snapshots from a WorldState load the same way.
+
+        parameters:
+        ----------
+        ints: array:
+            the snapshots unsigned integers
+        position: int:
+            where this states part of the snapshot starts
+        directions: list:
+            the direction names used by the snapshot
+
+        returns:
+        -------
+        position:
+            where the next part of the snapshot starts
+        """
+        position = super().load(ints, position, directions)
+        locations = self._world._Location_list
+        owners = self._owners = {}
+        #items that started in a changed location and are in no location now are held
+        for loc_id in self._items:
+            for item in locations[loc_id]._item_list:
+                owners[item._id] = HELD
+        masks = self._masks = {}
+        name_masks = self._name_masks = {}
+        for loc_id, items in self._items.items():
+            mask = 0
+            names = {}
+            for item in items:
+                bit = 1 << item._id
+                mask |= bit
+                names[item._name] = names.get(item._name, 0) | bit
+                owners[item._id] = loc_id
+            masks[loc_id] = mask
+            name_masks[loc_id] = names
+        self._items = {}
+        self._item_indexes = {}
+        return position
+
+    def _changed_items(self) -> dict[int, list[Item]]:
+        """returns the items of every location whose items this game has changed
+
+        returns:
+        -------
+        items:
+            location id to the items in the location
+        """
+        locations = self._world._Location_list
+        return {loc_id: self.get_items(locations[loc_id]) for loc_id in self._masks}
+
+    def _own_mask(self, location: Location) -> int:
+        """returns the bitset of a locations items, building it and the
+        bitsets of its item names from the template the first time
+
+        parameters:
+        ----------
+        location: Location:
+            the location
+
+        returns:
+        -------
+        mask:
+            the bitset of the ids of the items in the location
+        """
+        mask = self._masks.get(location._id)
+        if mask is None:
+            mask = 0
+            names = {}
+            for item in location._item_list:
+                bit = 1 << item._id
+                mask |= bit
+                names[item._name] = names.get(item._name, 0) | bit
+            self._name_masks[location._id] = names
+        return mask
+
+
+class Spans(tuple):
+    """Represents a line of output as (color, text) pairs. A color of None means
+    the text keeps whatever color came before it. Spans are built by adding text
+    to a Color, and more text or colors can be added to the end.
+    """
+
+    __slots__ = ()
+
+    def __add__(self, other):
+        """adds text, a color, or more spans to the end of the line
+
+        parameters:
+        ----------
+        other:
+            a str, Color or Spans
+
+        returns:
+        -------
+        spans:
+            the longer line
+        """
+        if isinstance(other, Color):
+            return Spans(tuple.__add__(self, ((other._name, ''),)))
+        if isinstance(other, Spans):
+            return Spans(tuple.__add__(self, other))
+        color, text = self[-1]
+        return Spans(self[:-1] + ((color, text + other),))
+
+    def __radd__(self, other):
+        """adds uncolored text to the start of the line
+
+        parameters:
+        ----------
+        other: str:
+            the text
+
+        returns:
+        -------
+        spans:
+            the longer line
+        """
+        return Spans(((None, other),) + tuple(self))
+
+    def get_text(self) -> str:
+        """returns the text of the line without any colors
+
+        returns:
+        -------
+        str:
+            the text
+        """
+        return ''.join(text for color, text in self)
+
+
+class Color:
+    """Represents a color output can be shown in. Only the colors name is kept,
+    a renderer decides what it looks like, so games never touch terminal codes.
+
+    Attributes
+    ----------
+    _name: str
+        the name of the color, such as 'red'.
+    """
+
+    __slots__ = ('_name',)
+
+    def __init__(self, name):
+        self._name = name
+
+    def get_name(self):
+        """gets and returns the colors name
+
+        returns:
+        -------
+        self._name:
+            an instance of _name
+        """
+        return self._name
+
+    def __add__(self, other):
+        """starts a line of output in this color
+
+        parameters:
+        ----------
+        other:
+            a str or Spans
+
+        returns:
+        -------
+        spans:
+            the line
+        """
+        return Spans(((self._name, ''),)) + other
+
+    def __radd__(self, other):
+        """adds this color after some uncolored text
+
+        parameters:
+        ----------
+        other: str:
+            the text
+
+        returns:
+        -------
+        spans:
+            the line
+        """
+        return Spans(((None, other), (self._name, '')))
+
+
+Color.GREEN = Color('green')
+Color.RED = Color('red')
+Color.YELLOW = Color('yellow')
+Color.CYAN = Color('cyan')
+Color.BLUE = Color('blue')
+Color.MAGENTA = Color('magenta')
+
+
+class OutputEvent:
+    """Represents one piece of output produced by a game command.
+
+    Attributes
+    ----------
+    _kind: str
+        what kind of event this is, either 'text' or 'pause'.
+    _spans: Spans
+        the line shown to the player.
+    _delay: int
+        how many seconds a 'pause' event should last.
+    """
+
+    __slots__ = ('_kind', '_spans', '_delay')
+
+    def __init__(self, kind, spans=Spans(), delay=0):
+        """
+        parameters:
+        ----------
+        kind:
+            either 'text' or 'pause'
+        spans:
+            the line shown to the player
+        delay:
+            how many seconds a pause should last
+        """
+        self._kind = kind
+        self._spans = spans
+        self._delay = delay
+
+    def get_kind(self):
+        """gets and returns the kind of event
+
+        returns:
+        -------
+        self._kind:
+            an instance of _kind
+        """
+        return self._kind
+
+    def get_spans(self):
+        """gets and returns the events line
+
+        returns:
+        -------
+        self._spans:
+            an instance of _spans
+        """
+        return self._spans
+
+    def get_text(self):
+        """returns the events text without colors
+
+        returns:
+        -------
+        str:
+            the text
+        """
+        return self._spans.get_text()
+
+    def get_delay(self):
+        """gets and returns how long a pause lasts
+
+        returns:
+        -------
+        self._delay:
+            an instance of _delay
+        """
+        return self._delay
+
+    def __str__(self):
+        """returns the text of the event without colors
+
+        returns:
+        -------
+        str:
+            the text
+        """
+        return self._spans.get_text()
+
+
+#snapshot header: magic, version, flags, location, item and npc counts,
+#calories needed, the number of integers and name bytes that follow, and the
+#seed of the games random choices and how many it has made
+SNAPSHOT_HEADER = struct.Struct('<4sBBxxIIIdIIQI')
+SNAPSHOT_MAGIC = b'GVZs'
+SNAPSHOT_VERSION = 2
+SNAPSHOT_IN_PROGRESS = 1
+SNAPSHOT_FLOAT_CALORIES = 2
+#the largest seed a snapshot header has room for
+MAX_SEED = 2 ** 64 - 1
+
+
+# noinspection PyProtectedMember
+class Game:
+    """The game takes place in a world of connected locations. The purpose of the game is to collect
+    edible items and then bring them to the elf in the woods behind campus. The elf needs
+    500 calories of edible food before it will save GVSU. Each item can have 0 or more calories.
+    If a player gives the elf something inedible, the elf will be displeased and
+    will teleport the player to a random location in the world.
+    The player can only carry 30 pounds at a time, so multiple trips to the elf may be needed. Once
+    the elf has enough calories, it will save campus and the game will end.
+
+    Attributes
+    ----------
+    _world: WorldTemplate
+        the world the game is played in, shared with other games.
+    _state: WorldState
+        this games changes to the world.
+    _commands: dict
+        creates a dictionary that holds the games commands.
+        is set equal to the return call from setup_commands.
+    _inventory: Inventory
+        the items the player is holding, along with their total weight
+        and calories.
+    _Location_list: lst
+        the list of the locations that exist in the game, from _world.
+    _current_location: str
+        keeps track of which location the player is in. is set
+        to a random location with random_location.
+    _cals_needed: int
+        keeps track of how many calories are needed to beat the game.
+    _game_progress: bool
+        keeps track of whether the game is continuing or ending.
+    _output: lst
+        collects the output events of the command currently running.
+    _teleport_lines: dict
+        location id to the line look shows for it among the locations to teleport to.
+    _seed: int
+        the seed of _rng.
+    _rng: random.Random
+        makes every random choice of the game, so the same seed and commands give the same game.
+    _draws: int
+        how many random locations _rng has chosen.
+    _log: CommandLog
+        the log every command is written to before it runs (see commandlog.py), or None.
+    """
+
+    def __init__(self, world: WorldTemplate = None, state_class=WorldState, seed: int = None):
+        """
+        parameters:
+        ----------
+        world: WorldTemplate = None:
+            the world to play in, the Lands Between if not given
+        state_class:
+            WorldState, or BitsetWorldState for worlds with many items
+        seed: int = None:
+            the seed of the games random choices, from 0 to MAX_SEED, drawn from
+            the random module if not given
+
+        error:
+        -----
+        ValueError:
+            the seed is out of range
+        """
+        if seed is not None and not 0 <= seed <= MAX_SEED:
+            raise ValueError(f'Seed must be from 0 to {MAX_SEED}.')
+        if world is None:
+            world = default_world()
+        self._seed = random.getrandbits(64) if seed is None else seed
+        self._rng = random.Random(self._seed)
+        self._draws = 0
+        self._log = None
+        self._world = world
+        self._state = state_class(world)
+        self._commands = self.setup_commands()
+        self._inventory = Inventory()
+        self._Location_list = world._Location_list
+        self._current_location = self.random_location()
+        self._cals_needed = int(500)
+        self._game_progress = True
+        self._output = []
+        self._teleport_lines = {}
+
+    def setup_commands(self) -> dict[str, callable]:
+        """creates a new dictionary for commands.
+
+        returns:
+        -------
+        commands:
+            a dictionary containing a str(direction) and a callable(location)
+        """
+        commands = {'talk': self.talk,
+                    'help': self.show_help,
+                    'meet': self.meet,
+                    'take': self.take,
+                    'give': self.give,
+                    'go': self.go,
+                    'items': self.show_items,
+                    'look': self.look,
+                    'quit': self.quit,
+                    'teleport': self.teleport,
+                    'route': self.route,
+                    'inspect': self.inspect,
+                    'fight': self.fight}
+        return commands
+
+    def snapshot(self) -> bytes:
+        """packs everything about this game that can change into bytes, referring
+        to locations, items and npcs by id. The world itself is not included, so
+        the snapshot is only a few dozen bytes for a game of the Lands Between.
+
+        returns:
+        -------
+        data:
+            the snapshot, which restore turns back into a game
+        """
+        ints = array('I', (self._current_location._id, len(self._inventory)))
+        ints.extend([item._id for item in self._inventory])
+        directions = []
+        self._state.dump(ints, directions)
+        if sys.byteorder == 'big':
+            ints.byteswap()
+        names = '\0'.join(directions).encode('utf-8')
+        flags = ((SNAPSHOT_IN_PROGRESS if self._game_progress else 0)
+                 | (SNAPSHOT_FLOAT_CALORIES if isinstance(self._cals_needed, float) else 0))
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags,
+                                      len(self._Location_list), len(self._world._Item_list),
+                                      len(self._world._NPC_list), self._cals_needed,
+                                      len(ints), len(names), self._seed, self._draws)
+        return header + ints.tobytes() + names
+
+    @classmethod
+    def restore(cls, data: bytes, world: WorldTemplate = None, state_class=WorldState) -> 'Game':
+        """creates a game from a snapshot, raises a ValueError if the snapshot
+        is damaged or was taken in a different world
+
+        parameters:
+        ----------
+        data: bytes:
+            the return value of snapshot
+        world: WorldTemplate = None:
+            the world the snapshot was taken in, the Lands Between if not given
+        state_class:
+            WorldState or BitsetWorldState, as for __init__
+
+        returns:
+        -------
+        game:
+            the restored game
+
+        error:
+        -----
+        ValueError:
+            the snapshot is damaged or does not belong to this world
+        """
+        header = cls._unpack_header(data)
+        game = cls(world, state_class, header[-2])
+        game._load_snapshot(data, header)
+        return game
+
+    @staticmethod
+    def _unpack_header(data: bytes) -> tuple:
+        """unpacks the header of a snapshot, raises a ValueError if it is not one
+
+        parameters:
+        ----------
+        data: bytes:
+            the snapshot
+
+        returns:
+        -------
+        header:
+            the fields of SNAPSHOT_HEADER after the version: flags, location, item
+            and npc counts, calories needed, int count, name length, seed and draws
+
+        error:
+        -----
+        ValueError:
+            the data is not a snapshot of this version
+        """
+        try:
+            (magic, version, *header) = SNAPSHOT_HEADER.unpack_from(data)
+        except struct.error:
+            raise ValueError('Snapshot is too short.')
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError('Not a snapshot, or a snapshot from another version.')
+        return tuple(header)
+
+    def _load_snapshot(self, data: bytes, header: tuple) -> None:
+        """replaces everything about this game that can change with a snapshot,
+        raises a ValueError if the snapshot is damaged or was taken in a
+        different world. The game must have been created with the snapshots seed.
+
+        parameters:
+        ----------
+        data: bytes:
+            the snapshot
+        header: tuple:
+            the return value of _unpack_header for data
+
+        error:
+        -----
+        ValueError:
+            the snapshot is damaged or does not belong to this world
+        """
+        (flags, location_count, item_count, npc_count, cals_needed,
+         int_count, names_length, seed, draws) = header
+        world = self._world
+        if draws < self._draws:
+            raise ValueError('Snapshot is damaged.')
+        #bring the random choices back to where they were
+        while self._draws < draws:
+            self.random_location()
+        if (location_count, item_count, npc_count) != (len(world._Location_list),
+                                                        len(world._Item_list),
+                                                        len(world._NPC_list)):
+            raise ValueError('Snapshot was taken in a different world.')
+        start = SNAPSHOT_HEADER.size
+        if len(data) != start + 4 * int_count + names_length:
+            raise ValueError('Snapshot is damaged.')
+        ints = array('I')
+        ints.frombytes(data[start:start + 4 * int_count])
+        if sys.byteorder == 'big':
+            ints.byteswap()
+        names = data[start + 4 * int_count:]
+        directions = names.decode('utf-8').split('\0') if names else []
+
+        try:
+            self._current_location = world._Location_list[ints[0]]
+            inventory = Inventory()
+            for item_id in ints[2:2 + ints[1]]:
+                inventory.add(world._Item_list[item_id])
+            self._inventory = inventory
+            position = self._state.load(ints, 2 + ints[1], directions)
+        except IndexError:
+            raise ValueError('Snapshot is damaged.')
+        if position != len(ints):
+            raise ValueError('Snapshot is damaged.')
+        self._cals_needed = cals_needed if flags & SNAPSHOT_FLOAT_CALORIES else int(cals_needed)
+        self._game_progress = bool(flags & SNAPSHOT_IN_PROGRESS)
+
+    def random_location(self) -> Location:
+        """selects a random location from the locations list and
+        returns that location.
+
+        returns:
+        -------
+        a random location chosen from the list of gae locations
+        """
+        self._draws += 1
+        return self._rng.choice(self._Location_list)
+
+    def get_seed(self) -> int:
+        """gets and returns the seed of the games random choices
+
+        returns:
+        -------
+        self._seed:
+            an instance of _seed
+        """
+        return self._seed
+
+    def set_log(self, log) -> None:
+        """sets the log every command is written to before it runs
+
+        parameters:
+        ----------
+        log:
+            a CommandLog, or None to stop logging
+        """
+        self._log = log
+
+    def start(self) -> list['OutputEvent']:
+        """returns the opening message and the list of commands without
+        waiting for any input.
+
+        returns:
+        -------
+        events:
+            the output events for the start of the game
+        """
+        self._say(Color.GREEN + 'Welcome to the Lands Between, '
+                  'a vast domain ruled by Queen Marika the Eternal.' + '\n'
+                  'In order to successfully save the land, you, '
+                  'the player, has to scavenge '
+                  'food from around the world to feed the elf.' + '\n'
+                  'After the elf has ingested 500 calories '
+                  'worth of food, he will lift the curse '
+                  'that was placed upon this domain, saving all '
+                  'who reside within it.' + '\n')
+        self.show_help()
+        return self._flush()
+
+    def step(self, command: str) -> list['OutputEvent']:
+        """runs a single command and returns everything it would have printed,
+        without reading from or writing to the console. Afterwards checks if the
+        elf has been fed enough or killed with the Dark Elf Sword.
+
+        parameters:
+        ----------
+        command: str:
+            one line of player input, such as 'go north' or 'take Boiled Crab'
+
+        returns:
+        -------
+        events:
+            the output events produced by the command
+        """
+        if not self._game_progress:
+            return []
+        verb, target = self._world.get_parser(self._commands).parse(command)
+        return self.run_command(verb, target)
+
+    def run_command(self, verb, target: str) -> list['OutputEvent']:
+        """runs a parsed command, the way step does after parsing it. Commands
+        with a verb are written to the log first, since they are the only ones
+        that can change the game.
+
+        parameters:
+        ----------
+        verb:
+            the command name, '' if the line was empty or None if it was not a command
+        target: str:
+            what the command is run on
+
+        returns:
+        -------
+        events:
+            the output events produced by the command
+        """
+        if not self._game_progress:
+            return []
+        if verb:
+            if self._log is not None:
+                self._log.append(verb, target)
+            if _instruments is None:
+                self._commands[verb](target)
+            else:
+                _instruments.call(verb, self._commands[verb], target)
+        elif verb is None:
+            self._say(Color.RED + 'Please choose a valid command.')
+        else:
+            self._say(Color.RED + 'Please enter a command.')
+        self.check_ending()
+        return self._flush()
+
+    def check_ending(self) -> None:
+        """ends the game if the elf has been fed 500 calories, or if the player
+        brought the Dark Elf Sword to the Mountaintops of the Giants.
+        """
+        if self._cals_needed <= 0:
+            self._say()
+            self._say(Color.GREEN + 'The elf was fed 500 calories. '
+                      'The Lands Between '
+                      'have finally been saved. '
+                      'Thank you, kind traveler.')
+            self._game_progress = False
+            return
+
+        if self._inventory.has('Dark Elf Sword'):
+            if self._current_location._name == 'Mountaintops of the Giants':
+                self._say()
+                self._say(Color.YELLOW + 'You approach the Elf while he sits '
+                          'on his throne. Everything was a lie. '
+                          'Feeding the him would only'
+                          'destroy the Lands Between, not save it. ' + '\n'
+                          'You slowly draw your sword from its holster, '
+                          'black flames emerging'
+                          'from the blade.' + '\n')
+                self._say()
+                self._pause(2)
+                self._say(Color.CYAN + 'Elf:', Color.RED + 'Ahhhh... so you have '
+                          'finally figured me out. This land was always doomed.' + '\n'
+                          'I only brought the Scarlet Rot upon its inhabitants '
+                          'to save them from the worlds wrath.' + '\n')
+                self._say()
+                self._pause(2)
+                self._say(Color.YELLOW + 'You let out a horrifying roar as you'
+                          'rush towards the throne, sword in hand. '
+                          'The Elf tries to move,'
+                          'but your sword reaches him first. The '
+                          'moment the blade cuts through his neck, '
+                          'the swords black flames seem to become enraged.' + '\n'
+                          'You follow through, and his head is gone. '
+                          'The flames engulf his body, slowing turning it'
+                          'into a dark pile of ash. The Elf is dead.')
+                self._say()
+                self._pause(2)
+                self._say(Color.YELLOW + 'You have done it, traveler. '
+                          'The Lands Between are finally saved.')
+                self._game_progress = False
+
+    def get_ending(self):
+        """returns how the game ended: 'fed' if the elf was fed, 'sword' if the elf
+        was killed with the Dark Elf Sword, 'quit' if the player quit, or None while
+        the game is still going.
+
+        returns:
+        -------
+        ending:
+            the ending, or None
+        """
+        if self._game_progress:
+            return None
+        if self._cals_needed <= 0:
+            return 'fed'
+        if (self._inventory.has('Dark Elf Sword')
+                and self._current_location._name == 'Mountaintops of the Giants'):
+            return 'sword'
+        return 'quit'
+
+    def play(self, pacer=None) -> None:
+        """Core game loop. Prints beginning message, then reads commands from the
+        console and passes each one to step until the game is over.
+
+        parameters:
+        ----------
+        pacer:
+            decides how pauses are shown, sleeps between them by default
+        """
+        if pacer is None:
+            pacer = BlockingPacer()
+        prompt = pacer.get_renderer().render_spans(Color.RED + 'Input command here: ')
+        pacer.deliver(self.start(), self._write)
+
+        while self._game_progress:
+            print()
+            user_response = input(prompt)
+            print()
+            pacer.deliver(self.step(user_response), self._write)
+
+    @staticmethod
+    def _write(text: str) -> None:
+        """writes a block of output to the console
+
+        parameters:
+        ----------
+        text: str:
+            the text to write
+        """
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    def _say(self, *values, sep: str = ' ') -> None:
+        """adds a line of text to the output of the current command.
+        Takes the same arguments as print, but colors come from Color
+        instead of colorama.
+
+        parameters:
+        ----------
+        values:
+            the pieces of the line, each a str or Spans
+        sep: str = ' ':
+            the string placed between each piece
+        """
+        spans = []
+        for number, value in enumerate(values):
+            if number:
+                spans.append((None, sep))
+            if isinstance(value, Spans):
+                spans.extend(value)
+            else:
+                spans.append((None, value))
+        self._output.append(OutputEvent('text', Spans(spans)))
+
+    def _pause(self, seconds: int) -> None:
+        """adds a pause to the output of the current command.
+
+        parameters:
+        ----------
+        seconds: int:
+            how long the pause should last
+        """
+        self._output.append(OutputEvent('pause', delay=seconds))
+
+    def _flush(self) -> list['OutputEvent']:
+        """returns the output collected so far and starts a new list.
+
+        returns:
+        -------
+        events:
+            the output events collected since the last flush
+        """
+        events = self._output
+        self._output = []
+        return events
+
+    def show_help(self, target=None):
+        """prints a help message along with all commands from dictionary.
+        """
+        #imported here, only help needs the date and time
+        import datetime
+        now = datetime.datetime.now()
+        self._say(Color.YELLOW + 'Current time:', Color.YELLOW + now.strftime("%Y-%m-%d %H:%M:%S"))
+        self._say(Color.YELLOW + 'List of available commands:', ', '.join(self._commands.keys()))
+
+    def inspect(self, target):
+        """if the target item is in your inventory,
+        it prints out its name,
+        description, weight, and calories.
+        prints a statement if the item is not in your inventory.
+
+        parameters:
+        ----------
+        target:
+            the item you wish to look at
+        """
+        item = self._inventory.get(target)
+        if item:
+            self._say(Color.CYAN + f'{item._name}: ' + Color.YELLOW + item._description)
+            self._say(Color.CYAN + 'Item weight: ' + Color.YELLOW + str(item._weight))
+            self._say(Color.CYAN + 'Item calories: ' + Color.YELLOW + str(item._calories))
+        else:
+            self._say(Color.YELLOW + target, Color.RED + 'not in inventory.')
+
+    def fight(self, target):
+        """if the target is in the location,
+        you can fight them. If you have the Dark Elf Sword,
+        you can kill npcs and finish the game by killing the elf
+
+        parameters:
+        ----------
+        target:
+            the target npc
+        """
+        loc_npc = self._state.get_npc(self._current_location, target)
+        if loc_npc and self._inventory.has('Dark Elf Sword'):
+            self._say(Color.BLUE + target, Color.RED + 'I challenge you to a fight '
+                                                    'to the death.')
+            self._say()
+            self._pause(2)
+            self._say(Color.BLUE + f'{target}:', Color.MAGENTA + 'You dare wish to fight me? '
+                                                                 'I will kill you!')
+            self._say()
+            self._pause(2)
+            self._say(Color.BLUE + target, Color.RED + 'has been slain.')
+            self._state.remove_npc(self._current_location, loc_npc)
+            return
+
+        if loc_npc and not self._inventory.has('Dark Elf Sword'):
+            self._say(Color.BLUE + target, Color.RED + 'I challenge you to a '
+                                                    'fight to the death.')
+            self._say()
+            self._pause(2)
+            self._say(Color.BLUE + f'{target}:', Color.MAGENTA + '*Pulls a small knife out of'
+                      'their boot*...never bring only your fists to a knife fight.')
+            self._say()
+            self._pause(2)
+            self._say(Color.BLUE + target, Color.RED + 'has killed you in battle. '
+                      'You were sent to a random location.')
+            self._current_location = self.random_location()
+        else:
+            self._say(Color.BLUE + target, Color.RED + 'is not in this location.')
+
+    def teleport(self, target):
+        """if a location has been discovered, the player can teleport to said
+        location from any other discovered location
+
+        parameters:
+        ----------
+        target:
+            the location we are trying to teleport to
+        """
+        target_location = self._world.get_location(target)
+        if target_location:
+            if target_location == self._current_location:
+                self._say(Color.RED + 'You are already in this location.')
+            elif self._state.get_visited(target_location):
+                self._state.set_neighbor(self._current_location, 'teleport', target_location)
+                self._current_location = target_location
+                self._say(Color.GREEN + 'You have teleported to '
+                          + Color.YELLOW + target_location._name)
+            else:
+                self._say(Color.RED + 'this location has not been discovered.')
+        else:
+            self._say(Color.RED + 'That is not a valid location to teleport to.')
+
+    def route(self, target) -> None:
+        """prints the shortest way to walk from the current location to the target
+        location, one direction per move
+
+        parameters:
+        ----------
+        target:
+            the location we are trying to find a route to
+        """
+        target_location = self._world.get_location(target)
+        if not target_location:
+            self._say(Color.RED + 'That is not a valid location to find a route to.')
+            return
+        route = self._world.get_graph().route(self._current_location._id, target_location._id)
+        if route is None:
+            self._say(Color.RED + 'There is no way to walk to ' + Color.YELLOW + target)
+        elif not route:
+            self._say(Color.RED + 'You are already in this location.')
+        else:
+            self._say(Color.GREEN + f'Route to {target}: ' + Color.YELLOW + ', '.join(route))
+
+    def talk(self, target) -> None:
+        """checks if NPC is in the room, if so it calls the NPC's get_message.
+
+        parameters:
+        ----------
+        target:
+            the npc we are trying to talk to
+        """
+        loc_npc = self._state.get_npc(self._current_location, target)
+        if loc_npc:
+            message = self._state.next_message(loc_npc)
+            self._say(Color.BLUE + f'{target}: ' + Color.MAGENTA + message)
+        else:
+            self._say(Color.BLUE + target, Color.RED + 'is not in this location.')
+
+    def meet(self, target) -> None:
+        """checks if NPC is in the room, if so asks for NPC description.
+
+        parameters:
+        ----------
+        target:
+            the npc we are trying to meet
+        """
+        meet_npc = self._state.get_npc(self._current_location, target)
+        if meet_npc:
+            description = meet_npc.get_description()
+            self._say(Color.BLUE + f'{target}: ' + Color.MAGENTA + description)
+        else:
+            self._say(Color.BLUE + target, Color.RED + 'is not in this location.')
+
+    def take(self, target) -> None:
+        """if target is in the room, removes it from the rooms inventory and adds
+        it to the users inventory, along with the weight.
 
         parameters:
         ----------
         target:
             the item we are trying to take
         """
-        loc_item = None
-        for item in self._current_location.get_items():
-            if item._name == target:
-                loc_item = item
-                break
+        loc_item = self._state.get_item(self._current_location, target)
         if loc_item:
             if self._current_location._name == 'Mountaintops of the Giants':
                 if loc_item._calories > 0:
-                    print(f'{Fore.YELLOW + target}', Fore.RED + 'has already been eaten '
-                          'by the elf...what a shame...')
+                    self._say(Color.YELLOW + target, Color.RED + 'has already been eaten '
+                              'by the elf...what a shame...')
                     return
-            print(f'{Fore.YELLOW + target}', Fore.GREEN + 'is now in your inventory.')
-            self._Item_list.append(loc_item)
-            self._current_location.get_items().remove(loc_item)
-            if isinstance(loc_item._weight,int):
-                self._weight += loc_item._weight
+            self._say(Color.YELLOW + target, Color.GREEN + 'is now in your inventory.')
+            self._inventory.add(loc_item)
+            self._state.remove_item(self._current_location, loc_item)
         else:
-            print(f'{Fore.YELLOW + target}', Fore.RED + 'not found in this location.')
+            self._say(Color.YELLOW + target, Color.RED + 'not found in this location.')
 
     def give(self, target) -> None:
         """removes target item from users inventory and adds it to the current locations
@@ -1032,26 +2594,25 @@ class Game:
         target:
             the item we are trying to give
         """
-        for item in self._Item_list:
-            if item._name == target:
-                print(Fore.GREEN + f'You have dropped {Fore.YELLOW + target}')
-                self._current_location._item_list.append(item)
-                self._Item_list.remove(item)
-                self._weight -= item._weight
-
-                if self._current_location._name == 'Mountaintops of the Giants':
-                    if item._calories > 0 and item._name == target:
-                        self._cals_needed -= item._calories
-                        print(Fore.GREEN + f'Elf calories needed: '
-                              f'{Fore.YELLOW + str(self._cals_needed)}')
-                    else:
-                        print()
-                        print(Fore.RED + 'The air grows thin and the sky turns dark...'
+        item = self._inventory.get(target)
+        if item:
+            self._say(Color.GREEN + 'You have dropped ' + Color.YELLOW + target)
+            self._state.add_item(self._current_location, item)
+            self._inventory.remove(item)
+
+            if self._current_location._name == 'Mountaintops of the Giants':
+                if item._calories > 0:
+                    self._cals_needed -= item._calories
+                    self._say(Color.GREEN + 'Elf calories needed: '
+                              + Color.YELLOW + str(self._cals_needed))
+                else:
+                    self._say()
+                    self._say(Color.RED + 'The air grows thin and the sky turns dark...'
                               'everything goes black.' + '\n'
                               'You wake up in a pile of ash...where are you?')
-                        self._current_location = self.random_location()
-                return
-        print(f'{Fore.YELLOW + target}', Fore.RED + 'is not in your inventory.')
+                    self._current_location = self.random_location()
+            return
+        self._say(Color.YELLOW + target, Color.RED + 'is not in your inventory.')
 
     def go(self, target) -> None:
         """Sets current location's visited status to True. Checks if players weight is over 30;
@@ -1064,17 +2625,18 @@ class Game:
         target:
             the location we are trying to go to
         """
-        self._current_location.visited = True
-        if self._weight > 30:
-            print(Fore.RED + 'You are carrying too much. You must drop something.')
+        self._state.set_visited(self._current_location)
+        if self._inventory.get_weight() > 30:
+            self._say(Color.RED + 'You are carrying too much. You must drop something.')
             return
-        if target in self._current_location._neighbors:
-            self._current_location = self._current_location._neighbors[target]
-            print(Fore.GREEN + f'You have arrived in {Fore.YELLOW + self._current_location._name}')
-            print()
+        neighbors = self._state.get_neighbors(self._current_location)
+        if target in neighbors:
+            self._current_location = neighbors[target]
+            self._say(Color.GREEN + 'You have arrived in ' + Color.YELLOW + self._current_location._name)
+            self._say()
             self.look()
         else:
-            print(f'{Fore.YELLOW + target}', Fore.RED + 'is not a valid location.')
+            self._say(Color.YELLOW + target, Color.RED + 'is not a valid location.')
 
     def show_items(self, args: str = None) -> None:
         """prints out all the items the player is carrying,
@@ -1085,16 +2647,15 @@ class Game:
         args: str = None:
             used to make it callable with the same syntax as other commands
         """
-        items = [item._name for item in self._Item_list]
-        print(Fore.CYAN + "You are carrying:" if items else Fore.RED +
-              "You are not carrying any items.")
-        for item in items:
-            print(Fore.YELLOW + "-", Fore.YELLOW + item)
-        print(Fore.CYAN + "Current weight:", Fore.YELLOW +
-              str(sum(item._weight for item in self._Item_list)),
-              Fore.YELLOW + "lb")
-        print(Fore.CYAN + "Current Calories Held:",
-              Fore.YELLOW + str(sum(item._calories for item in self._Item_list)))
+        self._say(Color.CYAN + "You are carrying:" if self._inventory else Color.RED +
+                  "You are not carrying any items.")
+        for item in self._inventory:
+            self._say(Color.YELLOW + "-", Color.YELLOW + item._name)
+        self._say(Color.CYAN + "Current weight:", Color.YELLOW +
+                  str(self._inventory.get_weight()),
+                  Color.YELLOW + "lb")
+        self._say(Color.CYAN + "Current Calories Held:",
+                  Color.YELLOW + str(self._inventory.get_calories()))
 
     def look(self, args: str = None) -> None:
         """prints the current location, a list of items in the location or a message
@@ -1108,40 +2669,57 @@ class Game:
         args: str = None:
             used to make it callable with the same syntax as other commands
         """
-        self._current_location.set_visited()
-        print(Fore.CYAN + f'{self._current_location._name}: '
-              f'{Fore.GREEN + self._current_location._description}')
-        print(Fore.CYAN + 'Location items:')
-        if len(self._current_location._item_list) > 0:
-            for item in self._current_location._item_list:
-                print(Fore.YELLOW + f'- {Fore.YELLOW + item._name}')
-        else:
-            print(Fore.RED + 'The location currently has no items.')
-        print(Fore.CYAN + 'Location npc(s):')
-        if len(self._current_location._npc_list) > 0:
-            for npc in self._current_location._npc_list:
-                print(Fore.YELLOW + f'- {Fore.YELLOW + npc._name}')
+        location = self._current_location
+        state = self._state
+        state.set_visited(location)
+        output = self._output
+        view = state.get_view(location)
+        if view is not None:
+            output.extend(view)
         else:
-            print(Fore.RED + 'You are alone.')
-
-        print(Fore.CYAN + 'You can travel in the following directions:')
-        for direction in self._current_location._neighbors:
-            neighbor = self._current_location._neighbors[direction]
-            if neighbor._visited:
-                print(Fore.YELLOW + f'- {Fore.YELLOW + direction} '
-                      f'to {Fore.YELLOW + neighbor._name}')
+            start = len(output)
+            self._say(Color.CYAN + f'{location._name}: '
+                      + Color.GREEN + location._description)
+            self._say(Color.CYAN + 'Location items:')
+            items = state.get_items(location)
+            if len(items) > 0:
+                for item in items:
+                    self._say(Color.YELLOW + '- ' + Color.YELLOW + item._name)
             else:
-                print(Fore.YELLOW + f'- {Fore.YELLOW + direction}')
-
-        print(Fore.CYAN + 'Locations you can teleport to:')
-        teleport_loc = [loc for loc in self._Location_list
-                        if loc != self._current_location
-                        and loc.get_visited()]
-        if teleport_loc:
-            for loc in teleport_loc:
-                print(Fore.YELLOW + f'- {Fore.YELLOW + loc._name}')
+                self._say(Color.RED + 'The location currently has no items.')
+            self._say(Color.CYAN + 'Location npc(s):')
+            npcs = state.get_npcs(location)
+            if len(npcs) > 0:
+                for npc in npcs:
+                    self._say(Color.YELLOW + '- ' + Color.YELLOW + npc._name)
+            else:
+                self._say(Color.RED + 'You are alone.')
+
+            self._say(Color.CYAN + 'You can travel in the following directions:')
+            neighbors = state.get_neighbors(location)
+            for direction in neighbors:
+                neighbor = neighbors[direction]
+                if state.get_visited(neighbor):
+                    self._say(Color.YELLOW + '- ' + Color.YELLOW + direction
+                              + ' to ' + Color.YELLOW + neighbor._name)
+                else:
+                    self._say(Color.YELLOW + '- ' + Color.YELLOW + direction)
+            state.set_view(location, output[start:])
+
+        self._say(Color.CYAN + 'Locations you can teleport to:')
+        lines = self._teleport_lines
+        teleport_lines = []
+        for loc_id in state.get_discovered():
+            if loc_id != location._id:
+                line = lines.get(loc_id)
+                if line is None:
+                    name = self._Location_list[loc_id]._name
+                    line = lines[loc_id] = OutputEvent('text', Color.YELLOW + '- ' + Color.YELLOW + name)
+                teleport_lines.append(line)
+        if teleport_lines:
+            output.extend(teleport_lines)
         else:
-            print(Fore.RED + 'There is no location to teleport to.')
+            self._say(Color.RED + 'There is no location to teleport to.')
 
     def quit(self, args: str = None) -> None:
         """prints a failure message and quits the game
@@ -1151,5 +2729,254 @@ class Game:
         args: str = None:
             used to make it callable with the same syntax as other commands
         """
-        print(Fore.RED + 'Game over.')
-        exit(0)
+        self._say(Color.RED + 'Game over.')
+        self._game_progress = False
+
+
+def create_world() -> WorldTemplate:
+    """creates all the Locations, Items, and NPCs in the game.
+
+    returns:
+    -------
+    world:
+        the Lands Between
+    """
+    world = WorldTemplate()
+    #Creating all locations in the game
+    limgrave = Location('Limgrave', 'Limgrave is a lush, expansive section of the '
+                        'Tenebrae Demesne. Golden trees and tall grass and bushes' + '\n'
+                        'provide plenty of sustenance for the local wildlife, '
+                        'that features boars, sheep, goat and rodents in' + '\n'
+                        'addition to flying creatures such as eagles and owls. '
+                        'More sinister and aggressive wildlife also exists,' + '\n'
+                        'and those venturing forth should be '
+                        'prepared to combat them.' + '\n')
+    weeping_penninsula = Location('Weeping Penninsula', 'The peninsula, to Limgraves '
+                                  'south, is named for its '
+                                  'unceasing rainfall, redolent of lament.' + '\n')
+    liurnia = Location('Liurnia', 'With its shallow waters and vast wetlands, '
+                       'the region of Liurnia is beset with the '
+                       'gradual sinking of most of its landmass.' + '\n'
+                       'With its forests perpetually blanketed in fog, '
+                       'eerie sounds of bells can''be heard in '
+                       'the distance.' + '\n')
+    caelid = Location('Caelid', 'Caelid, known as the locale of the last '
+                      'battle between General Radahn and Malenia, Blade' + '\n'
+                      'of Miquella, is a vast land consummately marred '
+                      'by scarlet rot.' + '\n')
+    dragonbarrow = Location('Dragonbarrow', 'The dragons that escaped the scarlet rot '
+                            'made nest of the plateau to Caelids north. '
+                            'Thus it was named "Dragonbarrow," '
+                            'and none dare to enter.' + '\n')
+    atlus_plateau = Location('Atlus Plateau', 'Atlus Plateau, a large area filled with '
+                             'tall golden trees, '
+                             'lush golden grass, and many useful materials.' + '\n')
+    mt_gelmir = Location('Mt. Gelmir', 'Mt. Gelmir is a volcanic region west '
+                         'of the Altus Plateau, ruled over by the '
+                         'enigmatic Volcano Manor and their lord, Praetor Rykard.' + '\n'
+                         'This region has been'
+                         'ravaged, and is home to many grotesque creatures.' + '\n')
+    leyndell = Location('Leyndell', 'The Capital City, located at the foot '
+                        'of the Erdtree. Despite being partially '
+                        'destroyed by the dragon Gransax, it still' + '\n'
+                        'holds strong to this day. It houses '
+                        'many strong foes, along with the mysterious '
+                        'Veiled Monarch, Morgott.' + '\n')
+    mountaintops_of_the_giants = Location('Mountaintops of the Giants',
+                                          'The fabled domain of the Giants, now in ruins. '
+                                          'Devastated after their war against '
+                                          'the Erdtree, their corpses lay frozen at the peak, '
+                                          'with only the Fire Monks residing close by.' + '\n')
+
+    #Adding locations into the _Location_list
+    world.add_location(limgrave)
+    world.add_location(weeping_penninsula)
+    world.add_location(liurnia)
+    world.add_location(caelid)
+    world.add_location(dragonbarrow)
+    world.add_location(atlus_plateau)
+    world.add_location(mt_gelmir)
+    world.add_location(leyndell)
+    world.add_location(mountaintops_of_the_giants)
+
+    #Adding the neighboring locations for each location
+    #Limgrave
+    limgrave.add_location('north', liurnia)
+    limgrave.add_location('east', caelid)
+    limgrave.add_location('south', weeping_penninsula)
+    #Caelid
+    caelid.add_location('north', dragonbarrow)
+    caelid.add_location('west', limgrave)
+    #Liurnia
+    liurnia.add_location('north', atlus_plateau)
+    liurnia.add_location('south', limgrave)
+    #Weeping Penninsula
+    weeping_penninsula.add_location('north', limgrave)
+    #Dragonbarrow
+    dragonbarrow.add_location('south', caelid)
+    #Atlus Plateau
+    atlus_plateau.add_location('north', mt_gelmir)
+    atlus_plateau.add_location('east', leyndell)
+    atlus_plateau.add_location('south', liurnia)
+    #Leyndell
+    leyndell.add_location('east', mountaintops_of_the_giants)
+    leyndell.add_location('west', atlus_plateau)
+    #Mt. Gelmir
+    mt_gelmir.add_location('south', atlus_plateau)
+    #Mountaintops of the Giants
+    mountaintops_of_the_giants.add_location('west', leyndell)
+
+    #Creating items
+    boiled_prawn = Item('Boiled Prawn', 'It looks a little green...', calories=62.5, weight=4)
+    boiled_crab = Item('Boiled Crab', 'Better than Red Lobster!', calories=62.5, weight=4)
+    white_cured_meat = Item('White Cured Meat', 'Mm-mmmm... meat!', calories=62.5, weight=3)
+    cooked_meat = Item('Cooked Meat', 'Its a little too rare for me...',
+                       calories=62.5, weight=4)
+    flask_of_crimson_tears = Item('Flask of Crimson Tears', 'It glows... and tastes good!',
+                                  calories=62.5 ,weight=6)
+    flask_of_cerulean_tears = Item('Flask of Cerulean Tears', 'The first one was way better.',
+                                   calories=62.5, weight=6)
+    broken_sword = Item('Broken Sword', 'Belonged to the knights of Miquella... '
+                                        'I wonder where they are...',
+                        calories=0, weight=6)
+    damaged_armor = Item('Damaged Armor', 'This armor belonged to one of Miquellas soldiers '
+                                          'as well ...I wonder if ill need it...',
+                         calories=0, weight=15)
+    boiled_fish = Item('Boiled Fish', 'Did anybody even season this thing?',
+                       calories=62.5, weight=4)
+    silver_pickled_foul_foot = Item('Silver Pickled Foul Foot', 'W-who would even EAT this?',
+                                    calories=62.5, weight=2)
+    oil_pot = Item('Oil Pot', 'If only I had a match...',
+                   calories=0,weight=7)
+    dark_elf_sword = Item('Dark Elf Sword', 'I wonder if there is another way to '
+                                            'save the land...',
+                          calories=0, weight=30)
+
+    #Adding items to respected locations
+    world.add_item(limgrave, boiled_prawn)
+    world.add_item(limgrave, boiled_crab)
+    world.add_item(weeping_penninsula, white_cured_meat)
+    world.add_item(liurnia, cooked_meat)
+    world.add_item(caelid, flask_of_cerulean_tears)
+    world.add_item(caelid, flask_of_crimson_tears)
+    world.add_item(dragonbarrow, broken_sword)
+    world.add_item(dragonbarrow, damaged_armor)
+    world.add_item(atlus_plateau, boiled_fish)
+    world.add_item(atlus_plateau, dark_elf_sword)
+    world.add_item(mt_gelmir, silver_pickled_foul_foot)
+    world.add_item(leyndell, oil_pot)
+
+    #Creating npcs and setting their message list
+    merchant_kale = NPC('Merchant Kale', 'A lonely merchant')
+    merchant_kale.npc_message_list(['You are a Tarnished, I can see it. And I can also see... '
+                                    'that youre not after my throat.' + '\n'
+                                    'Then why not purchase '
+                                    'a little something? I am Kale, Purveyor of fine goods.',
+                                    'What is it? Still going to purchase something?',
+                                    'Good-bye, for now.'])
+    witch_hunter_jerren = NPC('Witch Hunter Jerren', 'Known as Catellan Jerren, '
+                              'a harold at the Radahn Festival.' + '\n'
+                              'It is said that Jerren helped the tarnished one defeat Radahn.')
+    witch_hunter_jerren.npc_message_list(['Oh, Tarnished, are you? How did you slip inside, '
+                                          'with the gate closed?' + '\n'
+                                          'Hmph. No matter. If you can fell '
+                                          'one of them, you are a champion, in my book. '
+                                          'I am Jerren. Foolish old warrior, and witness.' + '\n'
+                                          'Incidentally, do you like a good '
+                                          'festival, from time to time? Well, '
+                                          'its true, this fortress houses only the' + '\n'
+                                          'vanquished. But when the stars align, '
+                                          'we celebrate. A war festival honoring the '
+                                          'last battle and death of General Radahn, '
+                                          'the mightiest demigod of the Shattering,' + '\n'
+                                          'and bearer of a Great Rune.',
+                                          'Well, you are not much fun, are '
+                                          'you, chum? No matter.' + '\n'
+                                          'One day you will see. That true '
+                                          'warriors bask in glory at the festival.',
+                                          'Go on, now. This old geezer has not '
+                                          'any use for you just yet.'])
+    miriel = NPC('Miriel', 'The Church of Vows steward, a huge silver turtle wearing a mitre.')
+    miriel.npc_message_list(
+        ['Youre Tarnished, arent you? I Welcome you,'
+         'to the Church of Vows. I am Miriel, steward of' + '\n'
+         'this sacred chamber. My apologies, '
+         'for the unseemly state of affairs. '
+         'Do you know the origin of this place?',
+         'Is there something else?', 'Bye now, '
+         'come again.'])
+    blaidd = NPC('Blaidd', 'Half man, half wolf, and trusted '
+                 'companion and guardian of Ranni the Witch.')
+    blaidd.npc_message_list(
+        ['Ahh, long time, friend. Blaidd, if you’ve forgotten. '
+         'Glad to have you in the service of mistress Ranni',
+         'Do you need any assistance?', 'Thats enough '
+         'chit-chat for now. Its time we parted ways.'])
+    alexander_warrior_jar = NPC('Alexander Warrior Jar',
+                                'Know as Iron Fist Alexander, a large living'
+                                'jar who set out from' + '\n'
+                                'his home one day ins search'
+                                'of adventure, seeking to become'
+                                'a mighty warrior.')
+    alexander_warrior_jar.npc_message_list(
+        ['Oh my stars Im so happy to see you! I am Alexander, '
+         'also known as the Iron Fist.',
+         'I left my home in search of adventure, '
+         'and it has brought me to you! Please, traveler,' + '\n'
+         'duel me! Let us fight until the sun sets!',
+         'Hmmm.. thats what I thought. Well, '
+         'you know where to find me when you are '
+         'looking for a good fight!'])
+    elf = NPC('Elf', 'The proclaimed Elf Lord of the Mountains, '
+                     'yet to be touched by the Scarlet Rot.' + '\n'
+                     'Legend has it, if he is fed enough goods, '
+                     'the Lands Between might be saved from the darkness.')
+    elf.npc_message_list(['Mmmmmm...hungry...',
+                          'Hmph....*stomach gurgles*',
+                          'Feed...me...'])
+
+    #Adding npcs to their respected locations
+    world.add_npc(limgrave, merchant_kale)
+    world.add_npc(weeping_penninsula, witch_hunter_jerren)
+    world.add_npc(liurnia, miriel)
+    world.add_npc(caelid, blaidd)
+    world.add_npc(mt_gelmir, alexander_warrior_jar)
+    world.add_npc(mountaintops_of_the_giants, elf)
+    return world
+
+
+#the Lands Between, built the first time a game asks for it
+_default_world = None
+
+
+def default_world() -> WorldTemplate:
+    """returns the Lands Between, creating it the first time it is needed.
+    Every game shares the same copy.
+
+    returns:
+    -------
+    _default_world:
+        the shared Lands Between
+    """
+    global _default_world
+    if _default_world is None:
+        _default_world = create_world()
+        _default_world.get_graph().validate()
+    return _default_world
+
+
+#measures every command run by every game, installed with set_instruments
+_instruments = None
+
+
+def set_instruments(instruments) -> None:
+    """installs the Instruments (see instrument.py) that measure every command
+    run from now on, or removes them when given None
+
+    parameters:
+    ----------
+    instruments:
+        an Instruments, or None
+    """
+    global _instruments
+    _instruments = instruments
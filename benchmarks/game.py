@@ -0,0 +1,251 @@
+"""
+Times the hot paths of the game with pyperf: building the world and a Game,
+every command on its own, look and teleport in scaled up synthetic worlds, and
+full scripted playthroughs of both endings. Nothing ever sleeps; output goes
+through an ImmediatePacer and a PlainRenderer into a function that drops it.
+
+Usage:
+    python benchmarks/game.py [pyperf options, such as --fast or -o results.json]
+    python -m pyperf compare_to before.json after.json
+
+Needs pyperf.
+"""
+#used to run each benchmark in fresh processes and report the spread
+import pyperf
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from GVZork import Game, Item, NPC, Location, WorldTemplate, create_world
+from pacing import ImmediatePacer
+from render import PlainRenderer
+
+#sizes of the synthetic worlds
+SIZES = (10, 100, 1000)
+FEED = ['look', 'take Boiled Prawn', 'take Boiled Crab', 'go south', 'take White Cured Meat',
+        'go north', 'go north', 'take Cooked Meat', 'go north', 'take Boiled Fish', 'go east',
+        'go east', 'give Boiled Prawn', 'give Boiled Crab', 'give White Cured Meat',
+        'give Cooked Meat', 'give Boiled Fish', 'go west', 'go west', 'go north',
+        'take Silver Pickled Foul Foot', 'go south', 'go south', 'go south', 'go east',
+        'take Flask of Crimson Tears', 'take Flask of Cerulean Tears', 'go west', 'go north',
+        'go north', 'go east', 'go east', 'give Silver Pickled Foul Foot',
+        'give Flask of Crimson Tears', 'give Flask of Cerulean Tears']
+SWORD = ['look', 'go north', 'go north', 'take Dark Elf Sword', 'go east', 'go east']
+
+
+def new_game(world, location: str) -> Game:
+    """returns a game that starts in the named location
+
+    parameters:
+    ----------
+    world:
+        the WorldTemplate to play in
+    location:
+        the name of the starting location
+
+    returns:
+    -------
+    game:
+        the game
+    """
+    game = Game(world)
+    game._current_location = world.get_location(location)
+    return game
+
+
+# noinspection PyProtectedMember
+def command_cases(world) -> dict:
+    """returns a case for every command of setup_commands. Each case is a game,
+    the command to time, and a function that puts the game back the way the
+    command expects it before every run.
+
+    parameters:
+    ----------
+    world:
+        the Lands Between
+
+    returns:
+    -------
+    cases:
+        command name to (game, command, reset)
+    """
+    def at(location, holding=(), visited=()):
+        game = new_game(world, location)
+        for name in holding:
+            game.step(f'take {name}')
+        for name in visited:
+            game._state.set_visited(world.get_location(name))
+        limgrave = game._current_location
+
+        def reset():
+            game._current_location = limgrave
+            game._game_progress = True
+            for name in holding:
+                if not game._inventory.has(name):
+                    game.step(f'take {name}')
+        return game, reset
+
+    cases = {}
+    game, reset = at('Limgrave')
+    cases['talk'] = (game, 'talk Merchant Kale', reset)
+    cases['help'] = (game, 'help', reset)
+    cases['meet'] = (game, 'meet Merchant Kale', reset)
+    cases['items'] = (game, 'items', reset)
+    cases['look'] = (game, 'look', reset)
+    cases['quit'] = (game, 'quit', reset)
+    cases['route'] = (game, 'route Mountaintops of the Giants', reset)
+    cases['fight'] = (game, 'fight Merchant Kale', reset)
+    cases['go'] = (game, 'go north', reset)
+    game, reset = at('Limgrave', visited=('Liurnia',))
+    cases['teleport'] = (game, 'teleport Liurnia', reset)
+    game, reset = at('Limgrave', holding=('Boiled Crab',))
+    cases['inspect'] = (game, 'inspect Boiled Crab', reset)
+    cases['give'] = (game, 'give Boiled Crab', reset)
+    game, reset = at('Limgrave')
+
+    def untake(game=game):
+        if game._inventory.has('Boiled Crab'):
+            game.step('give Boiled Crab')
+    cases['take'] = (game, 'take Boiled Crab', untake)
+    return cases
+
+
+def crowded_world(size: int) -> WorldTemplate:
+    """returns a world of two locations, the first holding size items and size npcs
+
+    parameters:
+    ----------
+    size: int:
+        how many items and npcs there are
+
+    returns:
+    -------
+    world:
+        the world
+    """
+    world = WorldTemplate()
+    market = world.add_location(Location('Market', 'A crowded market.'))
+    street = world.add_location(Location('Street', 'A quiet street.'))
+    market.add_location('east', street)
+    street.add_location('west', market)
+    for number in range(size):
+        world.add_item(market, Item(f'Trinket {number}', 'A trinket.', calories=1, weight=1))
+        npc = NPC(f'Trader {number}', 'A trader.')
+        npc.npc_message_list(['Hello.', 'Goodbye.'])
+        world.add_npc(market, npc)
+    return world
+
+
+def ring_world(size: int) -> WorldTemplate:
+    """returns a world of size locations, each leading east to the next and
+    west to the one before, the last one back around to the first
+
+    parameters:
+    ----------
+    size: int:
+        how many locations there are
+
+    returns:
+    -------
+    world:
+        the world
+    """
+    world = WorldTemplate()
+    locations = [world.add_location(Location(f'Place {number}', 'A place.')) for number in range(size)]
+    for number, location in enumerate(locations):
+        location.add_location('east', locations[(number + 1) % size])
+        location.add_location('west', locations[number - 1])
+    return world
+
+
+def time_command(loops: int, game: Game, command: str, reset) -> float:
+    """runs a command loops times, timing only the command and not the reset
+    before it
+
+    parameters:
+    ----------
+    loops: int:
+        how many times to run it
+    game: Game:
+        the game to run it in
+    command: str:
+        the command
+    reset:
+        called before every run, or None
+
+    returns:
+    -------
+    float:
+        the total seconds spent in the command
+    """
+    total = 0.0
+    step = game.step
+    for _ in range(loops):
+        if reset is not None:
+            reset()
+        started = time.perf_counter()
+        step(command)
+        total += time.perf_counter() - started
+    return total
+
+
+def time_playthrough(loops: int, world, commands) -> float:
+    """plays a whole game loops times, including rendering its output
+
+    parameters:
+    ----------
+    loops: int:
+        how many games to play
+    world:
+        the Lands Between
+    commands:
+        the commands of the game, starting in Limgrave
+
+    returns:
+    -------
+    float:
+        the total seconds
+    """
+    pacer = ImmediatePacer(renderer=PlainRenderer())
+    drop = [].append
+    started = time.perf_counter()
+    for _ in range(loops):
+        game = new_game(world, 'Limgrave')
+        pacer.deliver(game.start(), drop)
+        for command in commands:
+            pacer.deliver(game.step(command), drop)
+    return time.perf_counter() - started
+
+
+def main():
+    runner = pyperf.Runner()
+    world = create_world()
+    runner.bench_func('create_world', create_world)
+    runner.bench_func('Game(world)', Game, world)
+
+    for name, (game, command, reset) in sorted(command_cases(world).items()):
+        runner.bench_time_func(f'command {name}', time_command, game, command, reset)
+
+    for size in SIZES:
+        crowded = crowded_world(size)
+        runner.bench_time_func(f'look, {size} items and npcs', time_command,
+                               new_game(crowded, 'Market'), 'look', None)
+        ring = ring_world(size)
+        game = new_game(ring, 'Place 0')
+        for location in ring.get_locations():
+            game._state.set_visited(location)
+        here = game._current_location
+        there = ring.get_locations()[size // 2]
+
+        def back(game=game, here=here):
+            game._current_location = here
+        runner.bench_time_func(f'teleport, {size} discovered', time_command,
+                               game, f'teleport {there._name}', back)
+        runner.bench_time_func(f'look, {size} discovered', time_command, game, 'look', back)
+
+    runner.bench_time_func('playthrough, feed the elf', time_playthrough, world, FEED)
+    runner.bench_time_func('playthrough, Dark Elf Sword', time_playthrough, world, SWORD)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Plays many mostly idle players through a SessionManager with a budget, to see
+how the hit rate and rehydration latency trade against the memory the games
+in memory hold. Each command comes from a player picked by a Zipf-like
+weighting, so a few players play most of the commands and the rest return
+now and then.
+
+Usage: python benchmarks/idle.py [--players N] [--commands N] [--max-resident N]
+                                     [--max-resident-mb MB] [--skew S] [--seed N]
+"""
+#used to read the command line options
+import argparse
+#used to pick players and commands
+import random
+#used to time the commands
+import time
+#used to keep the store out of the way
+import tempfile
+from itertools import accumulate
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from runner import random_command
+from sessions import SessionManager, session_size
+
+
+# noinspection PyProtectedMember
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark a SessionManager with mostly idle players.')
+    parser.add_argument('--players', type=int, default=10000)
+    parser.add_argument('--commands', type=int, default=100000)
+    parser.add_argument('--max-resident', type=int, default=1000)
+    parser.add_argument('--max-resident-mb', type=float)
+    parser.add_argument('--skew', type=float, default=1.0, help='Zipf exponent of how often each player plays')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    weights = list(accumulate(1 / (rank + 1) ** args.skew for rank in range(args.players)))
+    max_bytes = None if args.max_resident_mb is None else int(args.max_resident_mb * 1e6)
+
+    with tempfile.TemporaryDirectory() as directory:
+        sessions = SessionManager(directory, max_sessions=args.max_resident, max_bytes=max_bytes)
+        #the next command of every player, picked while their game is in memory
+        upcoming = {}
+        started = time.perf_counter()
+        for player in range(args.players):
+            session_id = str(player)
+            sessions.start(session_id, seed=player)
+            upcoming[session_id] = random_command(sessions.get_game(session_id), rng)
+        setup = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for player in rng.choices(range(args.players), cum_weights=weights, k=args.commands):
+            session_id = str(player)
+            if session_id not in sessions:
+                sessions.start(session_id, seed=player)
+            else:
+                sessions.step(session_id, upcoming[session_id])
+            if session_id in sessions:
+                upcoming[session_id] = random_command(sessions.get_game(session_id), rng)
+        elapsed = time.perf_counter() - started
+
+        sizes = [session_size(game) for game in sessions._sessions.values()]
+        print(f'{"players":<24}{args.players:>12}')
+        print(f'{"start all s":<24}{setup:>12.2f}')
+        print(f'{"commands":<24}{args.commands:>12}')
+        print(f'{"us per command":<24}{elapsed / args.commands * 1e6:>12.1f}')
+        print(sessions.report())
+        print(f'{"mean bytes per game":<24}{sum(sizes) / max(len(sizes), 1):>12.0f}')
+        sessions.close()
+
+
+if __name__ == "__main__":
+    main()
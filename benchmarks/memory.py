@@ -0,0 +1,81 @@
+"""
+Reports how many bytes each Location, Item and NPC costs, not counting the
+strings they hold (those are shared or interned). Each kind of object is built
+COUNT times while tracemalloc is tracing, the same way a generated world would
+build them.
+
+Usage: python benchmarks/memory.py [COUNT]
+"""
+#used to measure allocations
+import tracemalloc
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from GVZork import Item, NPC, Location, WorldTemplate
+
+
+def measure(build, count):
+    """returns the bytes allocated per object by calling build count times
+
+    parameters:
+    ----------
+    build:
+        called with an index, returns the object to keep
+    count:
+        how many objects to build
+
+    returns:
+    -------
+    float:
+        bytes per object
+    """
+    kept = []
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(count):
+        kept.append(build(i))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    #the list holding the objects is not part of their cost
+    return (after - before - sys.getsizeof(kept)) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    #interned up front, so only the objects themselves are measured
+    names = [sys.intern(f'Place {i}') for i in range(count)]
+    description = sys.intern('A generated place.')
+    messages = ['Hello.', 'Goodbye.']
+
+    empty = measure(lambda i: Location(names[i], description), count)
+
+    world = WorldTemplate()
+    locations = [world.add_location(Location(names[i], description)) for i in range(count)]
+
+    def connected(i):
+        location = Location(names[i], description)
+        location.add_location('north', locations[i])
+        location.add_location('south', locations[i - 1])
+        return location
+
+    linked = measure(connected, count)
+    items = measure(lambda i: Item(names[i], description, 10, 2), count)
+    placed = measure(lambda i: world.add_item(locations[i], Item(names[i], description, 10, 2)), count)
+
+    def talking(i):
+        npc = NPC(names[i], description)
+        npc.npc_message_list(messages)
+        return npc
+
+    npcs = measure(talking, count)
+
+    print(f'objects per kind:                {count}')
+    print(f'bytes per empty location:        {empty:.1f}')
+    print(f'bytes per location, 2 neighbors: {linked:.1f}')
+    print(f'bytes per item:                  {items:.1f}')
+    print(f'bytes per item, first in a place: {placed:.1f}')
+    print(f'bytes per npc:                   {npcs:.1f}')
+
+
+if __name__ == "__main__":
+    main()
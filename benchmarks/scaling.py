@@ -0,0 +1,62 @@
+"""
+Reports how world construction, look and teleport scale with the size of
+a generated world (see worldgen.py), to find where they stop keeping up.
+Every look is timed twice, once to build its view and once more to reuse it.
+
+Usage: python benchmarks/scaling.py [SIZE...]
+"""
+#used to time each step
+import time
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from GVZork import Game
+from worldgen import generate_world
+
+SIZES = (1000, 100000, 1000000)
+
+
+def timed(function, *arguments):
+    """calls a function and returns its result and how long it took
+
+    parameters:
+    ----------
+    function:
+        what to call
+    arguments:
+        what to call it with
+
+    returns:
+    -------
+    result, seconds:
+        the return value and the seconds it took
+    """
+    started = time.perf_counter()
+    result = function(*arguments)
+    return result, time.perf_counter() - started
+
+
+# noinspection PyProtectedMember
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    print(f'{"locations":>10}{"generate s":>12}{"Game() ms":>12}{"parser ms":>12}{"look ms":>12}'
+          f'{"again ms":>12}{"look, all found ms":>20}{"again ms":>12}{"teleport us":>14}')
+    for size in sizes:
+        world, generate = timed(generate_world, size)
+        game, construct = timed(Game, world)
+        #the first command builds the parser, which is timed on its own
+        _, parser = timed(game.step, 'help')
+        _, look = timed(game.step, 'look')
+        _, look_again = timed(game.step, 'look')
+        for location in world.get_locations():
+            game._state.set_visited(location)
+        _, look_found = timed(game.step, 'look')
+        _, found_again = timed(game.step, 'look')
+        target = world.get_locations()[size // 2]._name
+        _, teleport = timed(game.step, f'teleport {target}')
+        print(f'{size:>10}{generate:>12.2f}{construct * 1e3:>12.2f}{parser * 1e3:>12.2f}{look * 1e3:>12.2f}'
+              f'{look_again * 1e3:>12.2f}{look_found * 1e3:>20.2f}{found_again * 1e3:>12.2f}'
+              f'{teleport * 1e6:>14.1f}')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Reports how many commands per second players in one SharedWorld (see
+multiplayer.py) get through from 1 up to N threads, against the same players
+each playing in a world of their own. Players are either spread over the
+whole world, so they rarely share a location lock, or crowded into a single
+location, where every take, give, fight and talk waits for the same lock.
+
+Threads only run python code side by side on a free-threaded build; on one
+with the GIL the numbers show what the locks cost rather than how they scale.
+
+Usage: python benchmarks/shared.py [--locations N] [--players-per-thread N]
+                                   [--commands N] [--threads N...]
+"""
+#used to play from many threads at once
+import threading
+#used to read the command line options
+import argparse
+#used to pick commands
+import random
+#used to time the threads
+import time
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from GVZork import Game
+from multiplayer import SharedWorld, Player
+from runner import random_command
+from worldgen import generate_world
+
+
+# noinspection PyProtectedMember
+def run(world, mode: str, threads: int, players_per_thread: int, commands: int) -> float:
+    """plays every thread's players in turn from its own thread, until each
+    has played commands commands
+
+    parameters:
+    ----------
+    world: WorldTemplate:
+        the world to play in
+    mode: str:
+        'private' for a world per player, 'spread' or 'crowded' for one SharedWorld
+    threads: int:
+        how many threads play
+    players_per_thread: int:
+        how many players each thread plays
+    commands: int:
+        how many commands each thread plays
+
+    returns:
+    -------
+    float:
+        commands per second over every thread
+    """
+    shared = SharedWorld(world) if mode != 'private' else None
+    crowd = world._Location_list[0]
+    groups = []
+    for thread in range(threads):
+        group = []
+        for number in range(players_per_thread):
+            seed = thread * players_per_thread + number
+            player = Game(world, seed=seed) if shared is None else Player(shared, seed=seed)
+            if mode == 'crowded':
+                player._current_location = crowd
+            group.append(player)
+        groups.append(group)
+    barrier = threading.Barrier(threads + 1)
+
+    def play(group, seed):
+        rng = random.Random(seed)
+        barrier.wait()
+        for number in range(commands):
+            player = group[number % len(group)]
+            if player._game_progress:
+                player.step(random_command(player, rng))
+
+    workers = [threading.Thread(target=play, args=(group, seed)) for seed, group in enumerate(groups)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return threads * commands / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark players sharing one world across threads.')
+    parser.add_argument('--locations', type=int, default=10000)
+    parser.add_argument('--players-per-thread', type=int, default=50)
+    parser.add_argument('--commands', type=int, default=20000, help='commands per thread')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    world = generate_world(args.locations)
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f'GIL {"enabled" if gil else "disabled"}, {os.cpu_count()} CPUs')
+    print(f'{"threads":>8}{"private /s":>14}{"spread /s":>14}{"crowded /s":>14}')
+    for threads in args.threads:
+        rates = [run(world, mode, threads, args.players_per_thread, args.commands)
+                 for mode in ('private', 'spread', 'crowded')]
+        print(f'{threads:>8}' + ''.join(f'{rate:>14.0f}' for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Reports how long a new game process takes to show its first prompt, and
+which imports that time goes to. Bot sessions run in short lived processes,
+so for them startup is most of the cost of a game.
+
+The repository is compiled first, so the numbers are for a warm install even
+when PYTHONDONTWRITEBYTECODE is set. The first prompt is timed by starting
+main.py with its output on a pipe and waiting for the prompt to appear. The
+import breakdown comes from python -X importtime, listing the slowest modules
+imported along the way.
+
+Usage: python benchmarks/startup.py [RUNS] [--world FILE] [--plain]
+"""
+#used to start game processes
+import subprocess
+#used to make sure every run loads compiled modules
+import compileall
+import argparse
+import os
+import sys
+import time
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROMPT = b'Input command here: '
+
+
+def time_to_prompt(arguments) -> float:
+    """starts a game and returns the seconds until its first prompt
+
+    parameters:
+    ----------
+    arguments:
+        extra command line arguments for main.py
+
+    returns:
+    -------
+    float:
+        seconds from starting the process to reading the prompt
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'main.py'), *arguments],
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=ROOT)
+    output = b''
+    while PROMPT not in output:
+        chunk = os.read(process.stdout.fileno(), 65536)
+        if not chunk:
+            raise RuntimeError('main.py exited before showing a prompt.')
+        output += chunk
+    elapsed = time.perf_counter() - started
+    process.kill()
+    process.wait()
+    process.stdin.close()
+    process.stdout.close()
+    return elapsed
+
+
+def import_times(module, count=12) -> list[tuple[int, int, str]]:
+    """imports a module in a new process with -X importtime
+
+    parameters:
+    ----------
+    module:
+        the module to import
+    count:
+        how many modules to return
+
+    returns:
+    -------
+    times:
+        (cumulative microseconds, own microseconds, module) of the slowest imports
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, cwd=ROOT)
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        times.append((int(cumulative), int(own), name.rstrip()))
+    times.sort(reverse=True)
+    return times[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time GVZork startup.')
+    parser.add_argument('runs', nargs='?', type=int, default=20)
+    parser.add_argument('--world', help='a JSON or TOML world file to start in')
+    parser.add_argument('--plain', action='store_true', help='start games without colors')
+    args = parser.parse_args()
+    arguments = ['--world', args.world] if args.world else []
+    if args.plain:
+        arguments.append('--plain')
+    compileall.compile_dir(ROOT, quiet=1)
+
+    baseline = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        baseline.append(time.perf_counter() - started)
+    prompts = [time_to_prompt(arguments) for _ in range(args.runs)]
+
+    print(f'runs:                      {args.runs}')
+    print(f'empty interpreter:         {statistics.median(baseline) * 1000:.1f} ms median')
+    print(f'time to first prompt:      {statistics.median(prompts) * 1000:.1f} ms median, '
+          f'{min(prompts) * 1000:.1f} ms best')
+    print()
+    print('slowest imports of main (cumulative us, own us, module):')
+    for cumulative, own, name in import_times('main'):
+        print(f'{cumulative:>10} {own:>10}  {name}')
+
+
+if __name__ == "__main__":
+    main()
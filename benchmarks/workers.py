@@ -0,0 +1,113 @@
+"""
+Reports how much memory each of N worker processes uses once it has loaded a
+world and played a game in it, to compare building a world in every worker
+with mapping one world store (see worldstore.py) that they all share.
+
+RSS counts every page a worker touches, shared or not. PSS splits each shared
+page between the processes sharing it, so adding up the PSS of every worker
+gives what they cost the host together, and USS counts only the pages no other
+process has.
+
+Usage: python benchmarks/workers.py WORLD [--workers N] [--commands N]
+
+WORLD is a world file or a .gvw store; - plays in the Lands Between. Needs
+Linux, for /proc/self/smaps_rollup.
+"""
+#used to start the workers together and keep them alive until all are measured
+import multiprocessing
+import argparse
+import random
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+#the barrier every worker waits at before measuring itself
+_barrier = None
+
+
+def memory() -> dict:
+    """returns the memory of this process in kB
+
+    returns:
+    -------
+    memory:
+        'Rss', 'Pss', 'Private_Clean' and 'Private_Dirty' to kB
+    """
+    values = {}
+    with open('/proc/self/smaps_rollup') as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1])
+    return values
+
+
+# noinspection PyProtectedMember
+def work(path: str, commands: int, seed: int) -> tuple:
+    """loads the world in a worker, plays random commands in it and measures
+    the worker once every worker has done the same
+
+    parameters:
+    ----------
+    path: str:
+        the world, or - for the Lands Between
+    commands: int:
+        how many commands to play
+    seed: int:
+        seeds the game
+
+    returns:
+    -------
+    rss, pss, uss:
+        the memory of the worker in kB
+    """
+    from GVZork import Game, default_world
+    if path == '-':
+        world = default_world()
+    else:
+        from worldfile import load_world
+        world = load_world(path)
+    game = Game(world, seed=seed)
+    rng = random.Random(seed)
+    for _ in range(commands):
+        location = game._current_location
+        choices = ['look'] + [f'go {direction}' for direction in game._state.get_neighbors(location)]
+        choices.extend(f'take {item._name}' for item in game._state.get_items(location))
+        game.step(rng.choice(choices))
+    _barrier.wait()
+    values = memory()
+    _barrier.wait()
+    return values['Rss'], values['Pss'], values['Private_Clean'] + values['Private_Dirty']
+
+
+def start_worker(barrier) -> None:
+    """keeps the barrier the workers wait at
+
+    parameters:
+    ----------
+    barrier:
+        a multiprocessing.Barrier for every worker
+    """
+    global _barrier
+    _barrier = barrier
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the memory of workers sharing a world.')
+    parser.add_argument('world', help='a world file or .gvw store, - for the Lands Between')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--commands', type=int, default=1000, help='commands each worker plays')
+    args = parser.parse_args()
+    barrier = multiprocessing.Barrier(args.workers)
+    with multiprocessing.Pool(args.workers, start_worker, (barrier,)) as pool:
+        results = pool.starmap(work, [(args.world, args.commands, seed) for seed in range(args.workers)],
+                               chunksize=1)
+    print(f'{"worker":>8}{"RSS MB":>10}{"PSS MB":>10}{"USS MB":>10}')
+    for number, (rss, pss, uss) in enumerate(results):
+        print(f'{number:>8}{rss / 1024:>10.1f}{pss / 1024:>10.1f}{uss / 1024:>10.1f}')
+    print(f'{"total":>8}{sum(r[0] for r in results) / 1024:>10.1f}{sum(r[1] for r in results) / 1024:>10.1f}'
+          f'{sum(r[2] for r in results) / 1024:>10.1f}')
+
+
+if __name__ == "__main__":
+    main()
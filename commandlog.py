@@ -0,0 +1,256 @@
+"""
+Keeps an append-only log of the commands of one game, so the game can be
+rebuilt after a crash without snapshotting it after every move.
+
+A log file starts with a checkpoint: a header, the names of the games commands
+and a Game.snapshot. Every command that can change the game is then appended
+before it runs, as one small record: the position of the command name in that
+list, the length of the target and the utf-8 target. 'go north' takes 7 bytes.
+Lines that are not commands change nothing and are not logged. After every
+interval commands the log is rewritten as a new checkpoint holding only a fresh
+snapshot, so replaying never has to go back further than that.
+
+Since a game makes its random choices from its own seed, which is in the
+snapshot, replaying the commands rebuilds exactly the same game:
+
+    log = CommandLog('player.log', game)
+    ...
+    game = recover('player.log')
+
+Appends are single unbuffered writes, so they survive the process crashing.
+Pass sync=True to also survive the machine losing power, at the cost of an
+fsync per command.
+"""
+#used to pack the header and records
+import struct
+#used to append without buffering and to replace the file at checkpoints
+import os
+from GVZork import Game, WorldState
+
+#log header: magic, version, and the length of the command names and snapshot that follow
+LOG_HEADER = struct.Struct('<4sBxHI')
+LOG_MAGIC = b'GVZl'
+LOG_VERSION = 1
+#record: command number and target length. Longer targets store LONG_TARGET
+#as their length, followed by the real length in four more bytes.
+RECORD = struct.Struct('<BB')
+LONG_TARGET = 255
+LONG_LENGTH = struct.Struct('<I')
+#how many commands are appended before the log is rewritten as a checkpoint
+CHECKPOINT_INTERVAL = 1000
+
+
+# noinspection PyProtectedMember
+class CommandLog:
+    """Represents the log of one game, which it attaches itself to.
+
+    Attributes
+    ----------
+    _path: str
+        the log file.
+    _game: Game
+        the game being logged.
+    _verbs: dict
+        command name to its number in the log.
+    _file: int
+        the file descriptor the records are appended to.
+    _count: int
+        how many commands have been appended since the last checkpoint.
+    _interval: int
+        how many commands are appended before the next checkpoint.
+    _sync: bool
+        whether every append is flushed to the disk with fsync.
+    """
+
+    def __init__(self, path: str, game: Game, interval: int = CHECKPOINT_INTERVAL, sync: bool = False):
+        """writes a checkpoint of the game to a new log, replacing any log
+        already at path, and starts logging the games commands
+
+        parameters:
+        ----------
+        path: str:
+            the log file
+        game: Game:
+            the game to log
+        interval: int = CHECKPOINT_INTERVAL:
+            how many commands are appended between checkpoints
+        sync: bool = False:
+            flush every command to the disk before it runs
+        """
+        self._path = path
+        self._game = game
+        self._verbs = {verb: number for number, verb in enumerate(sorted(game._commands))}
+        self._file = None
+        self._count = 0
+        self._interval = interval
+        self._sync = sync
+        self.checkpoint()
+        game.set_log(self)
+
+    def get_count(self):
+        """gets and returns how many commands have been appended since the last checkpoint
+
+        returns:
+        -------
+        self._count:
+            an instance of _count
+        """
+        return self._count
+
+    def append(self, verb: str, target: str) -> None:
+        """writes a command to the log, first rewriting the log as a
+        checkpoint if interval commands have been appended since the last one
+
+        parameters:
+        ----------
+        verb: str:
+            the command name
+        target: str:
+            what the command is run on
+
+        error:
+        -----
+        ValueError:
+            the log has been closed
+        """
+        if self._file is None:
+            raise ValueError('The command log is closed.')
+        if self._count >= self._interval:
+            self.checkpoint()
+        encoded = target.encode('utf-8')
+        if len(encoded) < LONG_TARGET:
+            record = RECORD.pack(self._verbs[verb], len(encoded)) + encoded
+        else:
+            record = (RECORD.pack(self._verbs[verb], LONG_TARGET)
+                      + LONG_LENGTH.pack(len(encoded)) + encoded)
+        os.write(self._file, record)
+        if self._sync:
+            os.fsync(self._file)
+        self._count += 1
+
+    def checkpoint(self) -> None:
+        """replaces the log with a snapshot of the game as it is now. The file
+        is replaced only once it has been written completely.
+        """
+        names = '\0'.join(self._verbs).encode('utf-8')
+        snapshot = self._game.snapshot()
+        temp_path = f'{self._path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, len(names), len(snapshot)))
+            file.write(names)
+            file.write(snapshot)
+            if self._sync:
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(temp_path, self._path)
+        self._close_file()
+        self._file = os.open(self._path, os.O_WRONLY | os.O_APPEND)
+        self._count = 0
+
+    def close(self) -> None:
+        """stops logging the game and closes the log file, which can still be
+        recovered. The game keeps running without a log.
+        """
+        if self._game._log is self:
+            self._game.set_log(None)
+        self._close_file()
+
+    def _close_file(self) -> None:
+        """closes the file descriptor the records are appended to, if it is open"""
+        if self._file is not None:
+            os.close(self._file)
+            self._file = None
+
+
+def read_log(path: str) -> tuple[bytes, list[tuple[str, str]]]:
+    """reads a log file, raises a ValueError if it is damaged. A record cut
+    short at the end of the file, from a crash in the middle of an append, is
+    left out, since its command never ran.
+
+    parameters:
+    ----------
+    path: str:
+        the log file
+
+    returns:
+    -------
+    snapshot, commands:
+        the snapshot of the last checkpoint, and the (command name, target) pairs
+        appended after it
+
+    error:
+    -----
+    ValueError:
+        the file is not a log or is damaged
+    """
+    with open(path, 'rb') as file:
+        blob = file.read()
+    try:
+        magic, version, names_length, snapshot_length = LOG_HEADER.unpack_from(blob)
+    except struct.error:
+        raise ValueError('Command log is too short.')
+    if magic != LOG_MAGIC or version != LOG_VERSION:
+        raise ValueError('Not a command log, or a command log from another version.')
+    position = LOG_HEADER.size
+    verbs = blob[position:position + names_length].decode('utf-8').split('\0')
+    position += names_length
+    snapshot = blob[position:position + snapshot_length]
+    if len(snapshot) != snapshot_length:
+        raise ValueError('Command log is damaged.')
+    position += snapshot_length
+
+    commands = []
+    while position + RECORD.size <= len(blob):
+        number, length = RECORD.unpack_from(blob, position)
+        start = position + RECORD.size
+        if length == LONG_TARGET:
+            if start + LONG_LENGTH.size > len(blob):
+                break
+            length, = LONG_LENGTH.unpack_from(blob, start)
+            start += LONG_LENGTH.size
+        if start + length > len(blob):
+            break
+        if number >= len(verbs):
+            raise ValueError('Command log is damaged.')
+        commands.append((verbs[number], blob[start:start + length].decode('utf-8')))
+        position = start + length
+    return snapshot, commands
+
+
+def recover(path: str, world=None, state_class=WorldState, interval: int = CHECKPOINT_INTERVAL,
+            sync: bool = False) -> Game:
+    """rebuilds a game from its log by restoring the last checkpoint and
+    running every command appended after it, then goes on logging the game to
+    the same file, starting from a new checkpoint
+
+    parameters:
+    ----------
+    path: str:
+        the log file
+    world:
+        the WorldTemplate the game was played in, the Lands Between if not given
+    state_class:
+        WorldState or BitsetWorldState, as for Game
+    interval: int = CHECKPOINT_INTERVAL:
+        how many commands are appended between checkpoints from now on
+    sync: bool = False:
+        flush every command to the disk before it runs
+
+    returns:
+    -------
+    game:
+        the game as it was after its last logged command
+
+    error:
+    -----
+    ValueError:
+        the log is damaged or was written in a different world
+    """
+    snapshot, commands = read_log(path)
+    game = Game.restore(snapshot, world, state_class)
+    for verb, target in commands:
+        if verb not in game._commands:
+            raise ValueError(f'Command log uses an unknown command: {verb}.')
+        game.run_command(verb, target)
+    CommandLog(path, game, interval, sync)
+    return game
@@ -0,0 +1,334 @@
+"""
+Measures every command a game runs: how many times each command is called,
+histograms of the wall clock and CPU time it takes, and how many memory blocks
+and bytes it leaves allocated. cProfile and tracemalloc can be switched on and
+off while the games keep running.
+
+Install an Instruments with GVZork.set_instruments. The numbers can be read as
+a table with report, or written to a file in the Prometheus text format, once
+with write or every few seconds with start_periodic:
+
+    instruments = Instruments()
+    set_instruments(instruments)
+    instruments.start_periodic('gvzork.prom', 15)
+"""
+#used to time commands
+import time
+#used to count the memory blocks a command leaves allocated
+import sys
+#used to write the metrics file in the background
+import threading
+import os
+from bisect import bisect_left
+
+#upper bounds of the histogram buckets, in seconds
+BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+           1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+
+
+class CommandStats:
+    """Represents the measurements of one command.
+
+    Attributes
+    ----------
+    _calls: int
+        how many times the command ran.
+    _wall: list
+        how many runs fell in each bucket of wall clock time, the last for longer runs.
+    _wall_sum: float
+        the total wall clock time, in seconds.
+    _cpu: list
+        how many runs fell in each bucket of CPU time.
+    _cpu_sum: float
+        the total CPU time, in seconds.
+    _blocks: int
+        the memory blocks the runs left allocated.
+    _bytes: int
+        the bytes the runs left allocated, counted only while tracemalloc is on.
+    """
+
+    def __init__(self):
+        self._calls = 0
+        self._wall = [0] * (len(BUCKETS) + 1)
+        self._wall_sum = 0.0
+        self._cpu = [0] * (len(BUCKETS) + 1)
+        self._cpu_sum = 0.0
+        self._blocks = 0
+        self._bytes = 0
+
+    def add(self, wall: float, cpu: float, blocks: int, allocated: int) -> None:
+        """adds one run of the command
+
+        parameters:
+        ----------
+        wall: float:
+            the wall clock time it took, in seconds
+        cpu: float:
+            the CPU time it took, in seconds
+        blocks: int:
+            the memory blocks it left allocated
+        allocated: int:
+            the bytes it left allocated
+        """
+        self._calls += 1
+        self._wall[bisect_left(BUCKETS, wall)] += 1
+        self._wall_sum += wall
+        self._cpu[bisect_left(BUCKETS, cpu)] += 1
+        self._cpu_sum += cpu
+        self._blocks += blocks
+        self._bytes += allocated
+
+    def get_calls(self):
+        """gets and returns how many times the command ran
+
+        returns:
+        -------
+        self._calls:
+            an instance of _calls
+        """
+        return self._calls
+
+    def percentile(self, fraction: float) -> float:
+        """returns the upper bound of the wall clock bucket the given share of
+        runs finished within
+
+        parameters:
+        ----------
+        fraction: float:
+            the share of runs, such as 0.99
+
+        returns:
+        -------
+        float:
+            seconds, or infinity if the runs were slower than every bucket
+        """
+        wanted = fraction * self._calls
+        seen = 0
+        for bound, count in zip(BUCKETS + (float('inf'),), self._wall):
+            seen += count
+            if seen >= wanted:
+                return bound
+        return float('inf')
+
+
+class Instruments:
+    """Collects CommandStats for every command run while it is installed.
+
+    Attributes
+    ----------
+    _stats: dict
+        command name to its CommandStats.
+    _lock: threading.Lock
+        held while the stats are changed or read, so a periodic write sees whole runs.
+    _profile: cProfile.Profile
+        the profiler, while profiling is on.
+    _tracing: bool
+        whether tracemalloc was started by set_tracemalloc.
+    _timer: threading.Thread
+        the thread started by start_periodic.
+    _stopped: threading.Event
+        set to stop the periodic writes.
+    _sources: list
+        functions returning more metrics in the Prometheus text format, added by add_source.
+    """
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._profile = None
+        self._tracing = False
+        self._timer = None
+        self._stopped = threading.Event()
+        self._sources = []
+
+    def add_source(self, source) -> None:
+        """adds more metrics to everything prometheus returns, such as those
+        of a SessionManager
+
+        parameters:
+        ----------
+        source:
+            called without arguments, returns metrics in the Prometheus text format
+        """
+        self._sources.append(source)
+
+    def call(self, command: str, function, target: str) -> None:
+        """runs a command and measures it
+
+        parameters:
+        ----------
+        command: str:
+            the name of the command
+        function:
+            the Game method that runs it
+        target: str:
+            what the command is run on
+        """
+        tracing = self._tracing
+        if tracing:
+            import tracemalloc
+            bytes_before = tracemalloc.get_traced_memory()[0]
+        profile = self._profile
+        blocks_before = sys.getallocatedblocks()
+        cpu_before = time.process_time()
+        wall_before = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            function(target)
+        finally:
+            if profile is not None:
+                profile.disable()
+            wall = time.perf_counter() - wall_before
+            cpu = time.process_time() - cpu_before
+            blocks = sys.getallocatedblocks() - blocks_before
+            allocated = tracemalloc.get_traced_memory()[0] - bytes_before if tracing else 0
+            with self._lock:
+                stats = self._stats.get(command)
+                if stats is None:
+                    stats = self._stats[command] = CommandStats()
+                stats.add(wall, cpu, blocks, allocated)
+
+    def set_profiling(self, on: bool, path: str = None):
+        """starts or stops profiling every command with cProfile
+
+        parameters:
+        ----------
+        on: bool:
+            True to start profiling, False to stop
+        path: str:
+            when stopping, the file the profile is written to, for pstats or snakeviz
+
+        returns:
+        -------
+        stats:
+            when stopping, a pstats.Stats of everything profiled, otherwise None
+        """
+        if on:
+            if self._profile is None:
+                import cProfile
+                self._profile = cProfile.Profile()
+            return None
+        profile, self._profile = self._profile, None
+        if profile is None:
+            return None
+        if path:
+            profile.dump_stats(path)
+        import pstats
+        return pstats.Stats(profile)
+
+    def set_tracemalloc(self, on: bool) -> None:
+        """starts or stops tracemalloc, which adds the bytes each command leaves
+        allocated to the stats, at the cost of slowing every allocation down
+
+        parameters:
+        ----------
+        on: bool:
+            True to start tracing, False to stop
+        """
+        import tracemalloc
+        if on and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        elif not on and self._tracing:
+            self._tracing = False
+            tracemalloc.stop()
+
+    def report(self) -> str:
+        """returns a table of the stats, the commands taking the most time first
+
+        returns:
+        -------
+        str:
+            one line per command
+        """
+        with self._lock:
+            rows = sorted(self._stats.items(), key=lambda row: row[1]._wall_sum, reverse=True)
+            lines = [f'{"command":<10}{"calls":>10}{"total ms":>12}{"mean us":>10}{"p99 us":>10}'
+                     f'{"cpu us":>10}{"blocks":>10}{"bytes":>12}']
+            for command, stats in rows:
+                calls = max(stats._calls, 1)
+                lines.append(f'{command:<10}{stats._calls:>10}{stats._wall_sum * 1e3:>12.2f}'
+                             f'{stats._wall_sum / calls * 1e6:>10.1f}{stats.percentile(0.99) * 1e6:>10.0f}'
+                             f'{stats._cpu_sum / calls * 1e6:>10.1f}{stats._blocks:>10}{stats._bytes:>12}')
+        return '\n'.join(lines)
+
+    def prometheus(self) -> str:
+        """returns the stats in the Prometheus text format
+
+        returns:
+        -------
+        str:
+            the metrics, ending in a newline
+        """
+        lines = ['# HELP gvzork_command_calls_total Commands run.',
+                 '# TYPE gvzork_command_calls_total counter']
+        with self._lock:
+            rows = sorted(self._stats.items())
+            for command, stats in rows:
+                lines.append(f'gvzork_command_calls_total{{command="{command}"}} {stats._calls}')
+            for name, kind, attribute in (('wall', 'Wall clock', '_wall'), ('cpu', 'CPU', '_cpu')):
+                metric = f'gvzork_command_{name}_seconds'
+                lines.append(f'# HELP {metric} {kind} time taken by commands.')
+                lines.append(f'# TYPE {metric} histogram')
+                for command, stats in rows:
+                    seen = 0
+                    for bound, count in zip(BUCKETS + (float('inf'),), getattr(stats, attribute)):
+                        seen += count
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        lines.append(f'{metric}_bucket{{command="{command}",le="{le}"}} {seen}')
+                    lines.append(f'{metric}_sum{{command="{command}"}} {getattr(stats, attribute + "_sum")!r}')
+                    lines.append(f'{metric}_count{{command="{command}"}} {stats._calls}')
+            for name, attribute, text in (('blocks', '_blocks', 'Memory blocks left allocated by commands.'),
+                                          ('bytes', '_bytes', 'Bytes left allocated by commands while '
+                                                              'tracemalloc is on.')):
+                metric = f'gvzork_command_allocated_{name}_total'
+                lines.append(f'# HELP {metric} {text}')
+                lines.append(f'# TYPE {metric} counter')
+                for command, stats in rows:
+                    lines.append(f'{metric}{{command="{command}"}} {getattr(stats, attribute)}')
+        return '\n'.join(lines) + '\n' + ''.join(source() for source in self._sources)
+
+    def write(self, path: str) -> None:
+        """writes the stats to a file in the Prometheus text format. The file is
+        replaced only once it has been written completely, so a scraper never
+        reads half of it.
+
+        parameters:
+        ----------
+        path: str:
+            the file to write
+        """
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(self.prometheus())
+        os.replace(temp_path, path)
+
+    def start_periodic(self, path: str, interval: float) -> None:
+        """writes the stats to a file every interval seconds from a background
+        thread, until stop_periodic is called
+
+        parameters:
+        ----------
+        path: str:
+            the file to write
+        interval: float:
+            seconds between writes
+        """
+        self.stop_periodic()
+        self._stopped = threading.Event()
+        stopped = self._stopped
+
+        def run():
+            while not stopped.wait(interval):
+                self.write(path)
+
+        self._timer = threading.Thread(target=run, name='gvzork-metrics', daemon=True)
+        self._timer.start()
+
+    def stop_periodic(self) -> None:
+        """stops the writes started by start_periodic"""
+        if self._timer is not None:
+            self._stopped.set()
+            self._timer.join()
+            self._timer = None
@@ -1,9 +1,86 @@
 #from Organizecode import Game
-from GVZork import Game
+import sys
+from GVZork import Game, MAX_SEED
+
+def replay(paths, world=None, seed=None, echo=False) -> None:
+    """runs every game in the given transcript files and prints a one line
+    summary of each, followed by a count of each ending. A path of - reads
+    the transcripts from stdin.
+
+    parameters:
+    ----------
+    paths:
+        the transcript files
+    world:
+        the WorldTemplate to play in, the Lands Between if not given
+    seed:
+        seeds the random start locations so replays repeat exactly
+    echo:
+        also print each games output, without color codes
+    """
+    import random
+    from transcripts import read_transcripts, run_transcript
+    if seed is not None:
+        random.seed(seed)
+    lines = []
+    endings = {}
+    for path in paths:
+        if path == '-':
+            games = read_transcripts(sys.stdin)
+        else:
+            with open(path, encoding='utf-8') as file:
+                games = read_transcripts(file)
+        for number, commands in enumerate(games, 1):
+            result = run_transcript(commands, f'{path}:{number}', world,
+                                    lines.append if echo else None)
+            lines.append(str(result))
+            endings[result.get_ending()] = endings.get(result.get_ending(), 0) + 1
+    lines.append(f'games={sum(endings.values())}\t' +
+                 '\t'.join(f'{ending}={count}' for ending, count in sorted(endings.items())))
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 def main():
-    game = Game()
-    game.play()
+    #the usual way to start a game takes no options, so skip loading argparse
+    if len(sys.argv) == 1:
+        Game().play()
+        return
+    import argparse
+    parser = argparse.ArgumentParser(description='Play GVZork.')
+    parser.add_argument('--world', help='a JSON or TOML world file, or a .gvw world store, to play '
+                                        'instead of the Lands Between')
+    parser.add_argument('--replay', nargs='+', metavar='TRANSCRIPT',
+                        help='run command transcripts without prompts or pauses, - reads stdin')
+    parser.add_argument('--seed', type=int, help='seed for the random choices of a game or replay')
+    parser.add_argument('--log', metavar='FILE',
+                        help='log every command to FILE, and pick the game back up from FILE if it exists')
+    parser.add_argument('--echo', action='store_true', help='print the game output of a replay')
+    parser.add_argument('--plain', action='store_true', help='print without colors, never loading colorama')
+    args = parser.parse_args()
+    if args.seed is not None and not 0 <= args.seed <= MAX_SEED:
+        parser.error(f'--seed must be from 0 to {MAX_SEED}')
+    world = None
+    if args.world:
+        from worldfile import load_world
+        world = load_world(args.world)
+    if args.replay:
+        replay(args.replay, world, args.seed, args.echo)
+        return
+    if args.log:
+        import os
+        from commandlog import CommandLog, recover
+        if os.path.exists(args.log):
+            game = recover(args.log, world)
+        else:
+            game = Game(world, seed=args.seed)
+            CommandLog(args.log, game)
+    else:
+        game = Game(world, seed=args.seed)
+    if args.plain:
+        from pacing import BlockingPacer
+        from render import PlainRenderer
+        game.play(BlockingPacer(renderer=PlainRenderer()))
+    else:
+        game.play()
 
 if __name__ == "__main__":
     main()
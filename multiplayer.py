@@ -0,0 +1,645 @@
+"""
+Lets many players share one world. Items lying in a location and the npcs in it
+are the same for every player, so an item one player takes is gone for the
+others, and every player feeds the same elf. Each player keeps their own
+inventory, position, discovered locations and teleport paths.
+
+    shared = SharedWorld()
+    alice = Player(shared)
+    bob = Player(shared)
+    alice.step('take Boiled Crab')
+
+Players may be stepped from many threads at once. Rather than one lock around
+the whole world, every location has its own lock, so players in different
+locations never wait for each other. Huge worlds share MAX_LOCKS locks between
+their locations by id, which keeps the memory bounded while two players only
+wait for each other in the rare case their locations share a lock. take, give,
+fight and talk hold the lock of the players location while they run, so two
+players cannot take the same Boiled Crab or slay the same npc. The calories
+the elf still needs have a lock of their own. A player who quits or goes
+away leaves everything they carry where they stand, so no item is lost to the
+others.
+
+Every change to a location also moves its version on, and a player keeps what
+look showed of a location only until its version moves, so a player never sees
+a location as it was before another player changed it.
+"""
+#used to let players change the world from many threads
+import threading
+#used to count the changes to every location
+from array import array
+from GVZork import Game, WorldState, Location, Item, NPC, Color, HELD, default_world
+
+#the most locks a world has, locations beyond this share them by id
+MAX_LOCKS = 4096
+ELF_LOCATION = 'Mountaintops of the Giants'
+#what every other player is told when someone ends the game
+ENDED_BY_OTHERS = {'fed': 'Another Tarnished fed the elf 500 calories. '
+                          'The Lands Between have finally been saved.',
+                   'sword': 'Another Tarnished has slain the Elf with the Dark Elf Sword. '
+                            'The Lands Between are finally saved.'}
+
+
+# noinspection PyProtectedMember
+class SharedWorld:
+    """Represents the items and npcs of a world, shared by every player.
+
+    Attributes
+    ----------
+    _world: WorldTemplate
+        the world being played.
+    _state: WorldState
+        where the items and npcs are, and what the npcs will say next.
+    _locks: list
+        the threading.RLocks guarding the locations, a location uses the one at
+        its id modulo the number of locks.
+    _versions: array
+        one counter per location id, moved on whenever its items or npcs change.
+    _owners: array
+        item id to the id of the location the item lies in, or HELD once a
+        player has taken it, to tell whether an item is still there at once.
+    _cals_needed: int
+        the calories the elf still needs.
+    _cals_lock: threading.Lock
+        held while _cals_needed or _ending changes.
+    _ending: str
+        'fed' or 'sword' once a player has saved the land, otherwise None.
+    """
+
+    def __init__(self, world=None, state_class=WorldState):
+        """
+        parameters:
+        ----------
+        world:
+            the WorldTemplate to play in, the Lands Between if not given
+        state_class:
+            WorldState or BitsetWorldState, for keeping track of the items
+        """
+        if world is None:
+            world = default_world()
+        count = len(world._Location_list)
+        self._world = world
+        self._state = state_class(world)
+        self._locks = [threading.RLock() for _ in range(min(count, MAX_LOCKS))]
+        self._versions = array('I', bytes(4 * count))
+        self._owners = array('i', world.get_item_owners())
+        self._cals_needed = int(500)
+        self._cals_lock = threading.Lock()
+        self._ending = None
+
+    def get_world(self):
+        """gets and returns the world being played
+
+        returns:
+        -------
+        self._world:
+            an instance of _world
+        """
+        return self._world
+
+    def get_lock(self, location: Location):
+        """returns the lock guarding a location. It is reentrant, so a thread
+        holding it can still call the methods that take it.
+
+        parameters:
+        ----------
+        location: Location:
+            the location
+
+        returns:
+        -------
+        lock:
+            a threading.RLock
+        """
+        return self._locks[location._id % len(self._locks)]
+
+    def get_version(self, location: Location) -> int:
+        """returns how many times a locations items or npcs have changed
+
+        parameters:
+        ----------
+        location: Location:
+            the location
+
+        returns:
+        -------
+        int:
+            the version
+        """
+        return self._versions[location._id]
+
+    def get_items(self, location: Location) -> tuple[Item, ...]:
+        """returns the items in a location as they are at this moment
+
+        parameters:
+        ----------
+        location: Location:
+            the location to look in
+
+        returns:
+        -------
+        items:
+            a copy of the items in the location
+        """
+        with self.get_lock(location):
+            return tuple(self._state.get_items(location))
+
+    def get_npcs(self, location: Location) -> tuple[NPC, ...]:
+        """returns the npcs in a location as they are at this moment
+
+        parameters:
+        ----------
+        location: Location:
+            the location to look in
+
+        returns:
+        -------
+        npcs:
+            a copy of the npcs in the location
+        """
+        with self.get_lock(location):
+            return tuple(self._state.get_npcs(location))
+
+    def add_item(self, location: Location, item: Item) -> None:
+        """puts an item in a location
+
+        parameters:
+        ----------
+        location: Location:
+            the location the item is put in
+        item: Item:
+            the item
+        """
+        with self.get_lock(location):
+            self._state.add_item(location, item)
+            self._owners[item._id] = location._id
+            self._versions[location._id] += 1
+
+    def remove_item(self, location: Location, item: Item) -> None:
+        """takes an item out of a location, raises a ValueError if another
+        player took it first. Hold the locations lock from finding the item to
+        removing it to be sure it is still there.
+
+        parameters:
+        ----------
+        location: Location:
+            the location the item is taken from
+        item: Item:
+            the item
+        """
+        with self.get_lock(location):
+            if self._owners[item._id] != location._id:
+                raise ValueError(f'{item._name} is no longer in {location._name}.')
+            self._state.remove_item(location, item)
+            self._owners[item._id] = HELD
+            self._versions[location._id] += 1
+
+    def remove_npc(self, location: Location, npc: NPC) -> None:
+        """removes a npc from a location, raises a ValueError if it is already gone
+
+        parameters:
+        ----------
+        location: Location:
+            the location the npc is in
+        npc: NPC:
+            the npc
+        """
+        with self.get_lock(location):
+            self._state.remove_npc(location, npc)
+            self._versions[location._id] += 1
+
+    def feed(self, calories) -> int:
+        """feeds the elf
+
+        parameters:
+        ----------
+        calories:
+            the calories of the food given to the elf
+
+        returns:
+        -------
+        int:
+            the calories the elf still needs afterwards
+        """
+        with self._cals_lock:
+            self._cals_needed -= calories
+            return self._cals_needed
+
+    def get_cals_needed(self):
+        """gets and returns the calories the elf still needs
+
+        returns:
+        -------
+        self._cals_needed:
+            an instance of _cals_needed
+        """
+        return self._cals_needed
+
+    def end(self, ending: str) -> bool:
+        """ends the game for every player, unless it has already ended
+
+        parameters:
+        ----------
+        ending: str:
+            'fed' or 'sword'
+
+        returns:
+        -------
+        bool:
+            True if this call ended the game
+        """
+        with self._cals_lock:
+            if self._ending is not None:
+                return False
+            self._ending = ending
+            return True
+
+    def get_ending(self):
+        """gets and returns how the game ended for every player
+
+        returns:
+        -------
+        self._ending:
+            'fed', 'sword' or None while the land is not yet saved
+        """
+        return self._ending
+
+    def start_over(self):
+        """returns a new SharedWorld of the same world, with every item and npc
+        back where it started, for the players who join after the game ended.
+        The players of this one keep playing in it until they leave.
+
+        returns:
+        -------
+        SharedWorld:
+            a SharedWorld nobody has played in yet
+        """
+        return SharedWorld(self._world, type(self._state))
+
+
+# noinspection PyProtectedMember
+class PlayerState(WorldState):
+    """Represents what one player knows of a shared world. Items, npcs and
+    what the npcs say next come from the SharedWorld; visited locations,
+    teleport paths and the views look made belong to the player.
+
+    Attributes
+    ----------
+    _shared: SharedWorld
+        the world shared by every player.
+    _view_versions: dict
+        location id to the version of the location its view was made from.
+    _missed_version: int
+        the version of the location get_view last found no view for, which
+        set_view keeps with the view made instead.
+    """
+
+    def __init__(self, shared: SharedWorld):
+        """
+        parameters:
+        ----------
+        shared: SharedWorld:
+            the world shared by every player
+        """
+        super().__init__(shared.get_world())
+        self._shared = shared
+        self._view_versions = {}
+        self._missed_version = 0
+
+    def get_items(self, location: Location) -> tuple[Item, ...]:
+        """returns the items in a location as they are at this moment
+
+        parameters:
+        ----------
+        location: Location:
+            the location to look in
+
+        returns:
+        -------
+        items:
+            a copy of the items in the location
+        """
+        return self._shared.get_items(location)
+
+    def get_item(self, location: Location, name: str):
+        """returns the item with the given name in a location, or None if it
+        is not there. Another player may take it unless the locations lock is held.
+
+        parameters:
+        ----------
+        location: Location:
+            the location to look in
+        name: str:
+            the name of the item
+
+        returns:
+        -------
+        item:
+            the item, or None
+        """
+        return self._shared._state.get_item(location, name)
+
+    def add_item(self, location: Location, item: Item) -> None:
+        """puts an item in a location, for every player
+
+        parameters:
+        ----------
+        location: Location:
+            the location the item is put in
+        item: Item:
+            the item
+        """
+        self._shared.add_item(location, item)
+
+    def remove_item(self, location: Location, item: Item) -> None:
+        """takes an item out of a location, for every player
+
+        parameters:
+        ----------
+        location: Location:
+            the location the item is taken from
+        item: Item:
+            the item
+        """
+        self._shared.remove_item(location, item)
+
+    def get_npcs(self, location: Location) -> tuple[NPC, ...]:
+        """returns the npcs in a location as they are at this moment
+
+        parameters:
+        ----------
+        location: Location:
+            the location to look in
+
+        returns:
+        -------
+        npcs:
+            a copy of the npcs in the location
+        """
+        return self._shared.get_npcs(location)
+
+    def get_npc(self, location: Location, name: str):
+        """returns the npc with the given name in a location, or None if it is not there
+
+        parameters:
+        ----------
+        location: Location:
+            the location to look in
+        name: str:
+            the name of the npc
+
+        returns:
+        -------
+        npc:
+            the npc, or None
+        """
+        return self._shared._state.get_npc(location, name)
+
+    def remove_npc(self, location: Location, npc: NPC) -> None:
+        """removes a npc from a location, for every player
+
+        parameters:
+        ----------
+        location: Location:
+            the location the npc is in
+        npc: NPC:
+            the npc
+        """
+        self._shared.remove_npc(location, npc)
+
+    def next_message(self, npc: NPC) -> str:
+        """returns the npcs current message and moves on to its next one. The
+        npcs are shared, so every player hears the conversation go on. Hold the
+        lock of the npcs location, as Player.talk does.
+
+        parameters:
+        ----------
+        npc: NPC:
+            the npc talking
+
+        returns:
+        -------
+        message:
+            what the npc says
+        """
+        return self._shared._state.next_message(npc)
+
+    def get_view(self, location: Location):
+        """returns what look last showed of a location, or None if something
+        it shows has changed since, by this player or any other
+
+        parameters:
+        ----------
+        location: Location:
+            the location
+
+        returns:
+        -------
+        view:
+            the list of OutputEvents, which must not be changed, or None
+        """
+        version = self._shared.get_version(location)
+        if self._view_versions.get(location._id) == version:
+            view = super().get_view(location)
+            if view is not None:
+                return view
+        self._missed_version = version
+        return None
+
+    def set_view(self, location: Location, view: list) -> None:
+        """keeps what look showed of a location until the location changes.
+        The view is kept with the version get_view found before it was made,
+        so a change made by another player while it was being made drops it.
+
+        parameters:
+        ----------
+        location: Location:
+            the location
+        view: list:
+            the OutputEvents look made
+        """
+        super().set_view(location, view)
+        self._view_versions[location._id] = self._missed_version
+        if len(self._view_versions) > 2 * len(self._views):
+            self._view_versions = {loc_id: self._view_versions[loc_id] for loc_id in self._views}
+
+
+# noinspection PyProtectedMember
+class Player(Game):
+    """Represents one players game in a SharedWorld.
+
+    Attributes
+    ----------
+    _shared: SharedWorld
+        the world shared by every player.
+    """
+
+    def __init__(self, shared: SharedWorld, seed: int = None):
+        """
+        parameters:
+        ----------
+        shared: SharedWorld:
+            the world to play in
+        seed: int = None:
+            the seed of the players random choices, as for Game
+        """
+        self._shared = shared
+        super().__init__(shared.get_world(), lambda world: PlayerState(shared), seed)
+        self._cals_needed = shared.get_cals_needed()
+
+    @classmethod
+    def restore(cls, data: bytes, shared: SharedWorld) -> 'Player':
+        """creates a player from a snapshot, raises a ValueError if the
+        snapshot is damaged or was taken in a different world. Game.snapshot
+        packs only the players own part of the game, their location, inventory,
+        discovered locations, teleport paths and random choices, never the items
+        and npcs of the shared world. The items the player was carrying are
+        still missing from the shared world, so a player should only be
+        restored into the SharedWorld they were taken from; restoring into a
+        new one would let their items exist twice.
+
+        parameters:
+        ----------
+        data: bytes:
+            the return value of Game.snapshot on the player
+        shared: SharedWorld:
+            the world the player was playing in
+
+        returns:
+        -------
+        player:
+            the restored player
+
+        error:
+        -----
+        ValueError:
+            the snapshot is damaged or does not belong to this world
+        """
+        header = cls._unpack_header(data)
+        player = cls(shared, header[-2])
+        player._load_snapshot(data, header)
+        player._cals_needed = shared.get_cals_needed()
+        return player
+
+    def take(self, target) -> None:
+        """takes an item from the current location, holding its lock so no
+        other player can take the same item at the same time
+
+        parameters:
+        ----------
+        target:
+            the item we are trying to take
+        """
+        with self._shared.get_lock(self._current_location):
+            super().take(target)
+
+    def fight(self, target) -> None:
+        """fights a npc in the current location, holding its lock so two
+        players cannot slay the same npc
+
+        parameters:
+        ----------
+        target:
+            the target npc
+        """
+        with self._shared.get_lock(self._current_location):
+            super().fight(target)
+
+    def talk(self, target) -> None:
+        """talks to a npc in the current location, holding its lock so every
+        player hears the npcs next message exactly once
+
+        parameters:
+        ----------
+        target:
+            the npc we are trying to talk to
+        """
+        with self._shared.get_lock(self._current_location):
+            super().talk(target)
+
+    def give(self, target) -> None:
+        """drops an item in the current location, where every player can take
+        it. Food given to the elf feeds the one elf every player is feeding.
+
+        parameters:
+        ----------
+        target:
+            the item we are trying to give
+        """
+        item = self._inventory.get(target)
+        if not item:
+            self._say(Color.YELLOW + target, Color.RED + 'is not in your inventory.')
+            return
+        self._say(Color.GREEN + 'You have dropped ' + Color.YELLOW + target)
+        self._state.add_item(self._current_location, item)
+        self._inventory.remove(item)
+
+        if self._current_location._name == ELF_LOCATION:
+            if item._calories > 0:
+                self._cals_needed = self._shared.feed(item._calories)
+                self._say(Color.GREEN + 'Elf calories needed: '
+                          + Color.YELLOW + str(self._cals_needed))
+            else:
+                self._say()
+                self._say(Color.RED + 'The air grows thin and the sky turns dark...'
+                          'everything goes black.' + '\n'
+                          'You wake up in a pile of ash...where are you?')
+                self._current_location = self.random_location()
+
+    def quit(self, args: str = None) -> None:
+        """prints a failure message, quits the game and leaves the items being
+        carried in the current location
+
+        parameters:
+        ----------
+        args: str = None:
+            used to make it callable with the same syntax as other commands
+        """
+        super().quit(args)
+        self.leave()
+
+    def leave(self) -> None:
+        """puts every item being carried in the current location, where the
+        other players can take it. Called when the player quits or disconnects;
+        calling it again does nothing.
+        """
+        location = self._current_location
+        with self._shared.get_lock(location):
+            for item in list(self._inventory):
+                self._shared.add_item(location, item)
+                self._inventory.remove(item)
+
+    def check_ending(self) -> None:
+        """ends the game for this player if they saved the land, telling the
+        story as Game does, or if another player saved it since their last command
+        """
+        shared = self._shared
+        if shared.get_ending() is None:
+            if self._cals_needed <= 0:
+                ending = 'fed'
+            elif (self._inventory.has('Dark Elf Sword')
+                  and self._current_location._name == ELF_LOCATION):
+                ending = 'sword'
+            else:
+                return
+            if shared.end(ending):
+                super().check_ending()
+                return
+        if self._game_progress:
+            self._say()
+            self._say(Color.GREEN + ENDED_BY_OTHERS[shared.get_ending()])
+            self._game_progress = False
+
+    def get_ending(self):
+        """returns how the game ended for this player: 'fed' or 'sword' once
+        any player saved the land, 'quit' if they quit first, or None while the
+        game is still going.
+
+        returns:
+        -------
+        ending:
+            the ending, or None
+        """
+        if self._game_progress:
+            return None
+        return self._shared.get_ending() or 'quit'
@@ -0,0 +1,201 @@
+"""
+Pacing for the games narrative beats. Game.step never waits; a pause in a
+fight or in the Dark Elf Sword ending comes back as a 'pause' OutputEvent.
+schedule groups a commands output into beats, each shown a number of seconds
+after the one before it, and a pacer decides how that time is spent:
+
+- ImmediatePacer shows every beat at once, for bots, replays and tests.
+- BlockingPacer sleeps between beats, for the terminal game.
+- AsyncPacer awaits between beats, so other sessions keep running.
+
+Every pacer hands each beat to a renderer (see render.py) and writes the
+result in one go.
+"""
+#used to wait between beats on the terminal
+from time import sleep
+from render import AnsiRenderer
+
+
+class Beat:
+    """Represents lines of output shown together after a delay.
+
+    Attributes
+    ----------
+    _delay: float
+        how many seconds after the previous beat this one is shown.
+    _events: list
+        the text events shown in this beat.
+    """
+
+    def __init__(self, delay, events):
+        """
+        parameters:
+        ----------
+        delay:
+            seconds to wait after the previous beat
+        events:
+            the text events in the beat
+        """
+        self._delay = delay
+        self._events = events
+
+    def get_delay(self):
+        """gets and returns the beats delay
+
+        returns:
+        -------
+        self._delay:
+            an instance of _delay
+        """
+        return self._delay
+
+    def get_events(self):
+        """gets and returns the beats events
+
+        returns:
+        -------
+        self._events:
+            an instance of _events
+        """
+        return self._events
+
+
+def schedule(events) -> list[Beat]:
+    """splits output events into beats at every pause. Back to back pauses
+    add together, and a pause at the end of the output is kept as an empty beat
+    so the next command still waits for it.
+
+    parameters:
+    ----------
+    events:
+        the events returned by Game.start or Game.step
+
+    returns:
+    -------
+    beats:
+        the beats in the order they should be shown
+    """
+    beats = []
+    delay = 0
+    lines = []
+    for event in events:
+        if event.get_kind() == 'pause':
+            if lines:
+                beats.append(Beat(delay, lines))
+                delay = 0
+                lines = []
+            delay += event.get_delay()
+        else:
+            lines.append(event)
+    if lines or delay:
+        beats.append(Beat(delay, lines))
+    return beats
+
+
+class ImmediatePacer:
+    """Shows every beat straight away.
+
+    Attributes
+    ----------
+    _scale: float
+        multiplies every delay, 0 skips them and 1 keeps them as written.
+    _renderer:
+        turns each beat into the text that is written.
+    """
+
+    def __init__(self, scale=0.0, renderer=None):
+        """
+        parameters:
+        ----------
+        scale:
+            multiplies every delay
+        renderer:
+            turns each beat into text, colored with an AnsiRenderer if not given
+        """
+        self._scale = scale
+        self._renderer = AnsiRenderer() if renderer is None else renderer
+
+    def get_renderer(self):
+        """gets and returns the pacers renderer
+
+        returns:
+        -------
+        self._renderer:
+            an instance of _renderer
+        """
+        return self._renderer
+
+    def deliver(self, events, write) -> None:
+        """shows a commands output, one write per beat.
+
+        parameters:
+        ----------
+        events:
+            the events returned by Game.start or Game.step
+        write:
+            called with the text of each beat
+        """
+        for beat in schedule(events):
+            self.wait(beat.get_delay() * self._scale)
+            if beat.get_events():
+                write(self._renderer.render(beat.get_events()))
+
+    def wait(self, seconds) -> None:
+        """does nothing, the immediate pacer never waits
+
+        parameters:
+        ----------
+        seconds:
+            how long the beat asked to wait
+        """
+
+
+class BlockingPacer(ImmediatePacer):
+    """Sleeps between beats, the way the terminal game always has.
+    """
+
+    def __init__(self, scale=1.0, renderer=None):
+        super().__init__(scale, renderer)
+
+    def wait(self, seconds) -> None:
+        """sleeps for the given time
+
+        parameters:
+        ----------
+        seconds:
+            how long to sleep
+        """
+        if seconds > 0:
+            sleep(seconds)
+
+
+class AsyncPacer(ImmediatePacer):
+    """Awaits between beats so that one sessions pauses
+    never hold back any other session on the event loop.
+    """
+
+    def __init__(self, scale=1.0, renderer=None):
+        super().__init__(scale, renderer)
+
+    async def deliver(self, events, write, drain=None) -> None:
+        """shows a commands output, one write per beat.
+
+        parameters:
+        ----------
+        events:
+            the events returned by Game.start or Game.step
+        write:
+            called with the text of each beat
+        drain:
+            optional coroutine function awaited after each write
+        """
+        #imported here so the terminal game does not pay for loading asyncio
+        import asyncio
+        for beat in schedule(events):
+            seconds = beat.get_delay() * self._scale
+            if seconds > 0:
+                await asyncio.sleep(seconds)
+            if beat.get_events():
+                write(self._renderer.render(beat.get_events()))
+                if drain is not None:
+                    await drain()
@@ -0,0 +1,199 @@
+"""
+Turns a line of player input into a command and its target.
+
+The command words, their aliases (n for go north, i for items and so on) and
+every unambiguous prefix of them (tel for teleport) are compiled once into a
+trie, and the trie is flattened into a single table from every word the player
+may type to the command it means. Targets are then matched against the names
+the command works on, so take boiled crab finds the Boiled Crab and go n goes
+north. The words in WHOLE_WORDS, such as quit, have no prefixes or aliases and
+only work typed in full.
+
+Bots send the same lines over and over, so parsed lines are kept in a cache
+shared by every game in the world.
+"""
+#used to keep the most recently parsed lines
+from collections import OrderedDict
+#used to guard the cache when games of a shared world parse from many threads
+import threading
+
+#words that stand for a whole command
+ALIASES = {'n': ('go', 'north'), 'north': ('go', 'north'),
+           's': ('go', 'south'), 'south': ('go', 'south'),
+           'e': ('go', 'east'), 'east': ('go', 'east'),
+           'w': ('go', 'west'), 'west': ('go', 'west'),
+           'i': ('items', ''), 'inv': ('items', ''), 'inventory': ('items', ''),
+           'l': ('look', '')}
+#short directions accepted after go
+DIRECTION_ALIASES = {'n': 'north', 's': 'south', 'e': 'east', 'w': 'west'}
+#commands that have to be typed in full, so one stray key cannot end the game
+WHOLE_WORDS = ('quit',)
+#how many parsed lines are kept
+CACHE_SIZE = 4096
+
+
+def build_trie(words: dict) -> dict:
+    """builds a trie of words, one nested dictionary per letter. The word a
+    path spells is stored under the None key of the node it ends at.
+
+    parameters:
+    ----------
+    words: dict:
+        word to what it means
+
+    returns:
+    -------
+    trie:
+        the root node
+    """
+    root = {}
+    for word, meaning in words.items():
+        node = root
+        for letter in word:
+            node = node.setdefault(letter, {})
+        node[None] = meaning
+    return root
+
+
+def flatten(node: dict, prefix: str, table: dict) -> set:
+    """adds every word and unambiguous prefix below a trie node to a table
+
+    parameters:
+    ----------
+    node: dict:
+        the trie node reached by prefix
+    prefix: str:
+        the letters leading to the node
+    table: dict:
+        word or prefix to what it means, added to
+
+    returns:
+    -------
+    meanings:
+        every meaning below the node
+    """
+    meanings = set()
+    for letter, child in node.items():
+        if letter is None:
+            table[prefix] = child
+            meanings.add(child)
+        else:
+            meanings |= flatten(child, prefix + letter, table)
+    if len(meanings) == 1 and prefix not in table:
+        table[prefix] = next(iter(meanings))
+    return meanings
+
+
+# noinspection PyProtectedMember
+class CommandParser:
+    """Parses lines of input for every game played in one world.
+
+    Attributes
+    ----------
+    _table: dict
+        every word or unambiguous prefix the player may start a line with, to
+        the (command, target) it means; the target is '' unless it is an alias.
+    _names: dict
+        command to a dictionary of casefolded name to the name it stands for,
+        for the commands whose targets are names.
+    _cache: OrderedDict
+        line to its parsed (command, target), most recently used last.
+    _cache_lock: Lock
+        held while the cache and its counters are read or changed, as players
+        of a SharedWorld may parse lines from many threads at once.
+    _hits: int
+        how many lines were found in the cache.
+    _misses: int
+        how many lines had to be parsed.
+    """
+
+    def __init__(self, world, commands):
+        """
+        parameters:
+        ----------
+        world:
+            the WorldTemplate or StoredWorld the games are played in
+        commands:
+            the names of the commands, such as the keys of Game.setup_commands
+        """
+        words = {command: (command, '') for command in commands if command not in WHOLE_WORDS}
+        for alias, meaning in ALIASES.items():
+            if meaning[0] in words and alias not in words:
+                words[alias] = meaning
+        self._table = {}
+        flatten(build_trie(words), '', self._table)
+        self._table.pop('', None)
+        for command in WHOLE_WORDS:
+            if command in commands:
+                self._table[command] = (command, '')
+
+        maps = world.get_name_maps()
+        items = maps['items']
+        npcs = maps['npcs']
+        locations = maps['locations']
+        directions = {'teleport': 'teleport'}
+        directions.update(maps['directions'])
+        for alias, direction in DIRECTION_ALIASES.items():
+            directions.setdefault(alias, direction)
+        self._names = {'take': items, 'give': items, 'inspect': items,
+                       'talk': npcs, 'meet': npcs, 'fight': npcs,
+                       'teleport': locations, 'route': locations,
+                       'go': directions}
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def parse(self, line: str) -> tuple:
+        """returns the command a line of input stands for and its target
+
+        parameters:
+        ----------
+        line: str:
+            one line of player input, such as 'go north' or 'take boiled crab'
+
+        returns:
+        -------
+        command, target:
+            the command, '' for a blank line and None if no command matches, and
+            the rest of the line with names spelled the way the world spells them
+        """
+        cache = self._cache
+        with self._cache_lock:
+            parsed = cache.get(line)
+            if parsed is not None:
+                self._hits += 1
+                cache.move_to_end(line)
+                return parsed
+            self._misses += 1
+        words = line.split(None, 1)
+        if not words:
+            parsed = ('', '')
+        else:
+            meaning = self._table.get(words[0].casefold())
+            target = ' '.join(words[1].split()) if len(words) > 1 else ''
+            if meaning is None:
+                parsed = (None, target)
+            else:
+                command, alias_target = meaning
+                target = target or alias_target
+                names = self._names.get(command)
+                if names is not None:
+                    target = names.get(target.casefold(), target)
+                parsed = (command, target)
+        with self._cache_lock:
+            cache[line] = parsed
+            if len(cache) > CACHE_SIZE:
+                cache.popitem(last=False)
+        return parsed
+
+    def get_hit_rate(self) -> float:
+        """returns the share of lines that were found in the cache
+
+        returns:
+        -------
+        float:
+            hits divided by all lines parsed, 0 before any line is parsed
+        """
+        total = self._hits + self._misses
+        return self._hits / total if total else 0.0
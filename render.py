@@ -0,0 +1,117 @@
+"""
+Turns the output events of a command into the text that is written out.
+Each renderer builds a whole command's output (or a whole beat, when the
+output has pauses) as one string, so it can be written with a single write.
+
+- AnsiRenderer colors the text with terminal codes from colorama.
+- PlainRenderer writes the text only, without ever loading colorama.
+- EventRenderer writes one JSON object per text event, for clients that
+  draw the output themselves. Each beat arrives once its pause is over.
+"""
+
+
+class PlainRenderer:
+    """Renders output as plain text.
+    """
+
+    def render(self, events) -> str:
+        """returns the text of every text event, one per line
+
+        parameters:
+        ----------
+        events:
+            output events
+
+        returns:
+        -------
+        str:
+            the text, ending in a newline if there was any
+        """
+        render_spans = self.render_spans
+        return ''.join([render_spans(event.get_spans()) + '\n'
+                        for event in events if event.get_kind() == 'text'])
+
+    def render_spans(self, spans) -> str:
+        """returns a single line of output
+
+        parameters:
+        ----------
+        spans:
+            the lines (color, text) pairs
+
+        returns:
+        -------
+        str:
+            the line, without a newline
+        """
+        return ''.join([text for color, text in spans])
+
+
+class AnsiRenderer(PlainRenderer):
+    """Renders output with terminal color codes.
+
+    Attributes
+    ----------
+    _codes: dict
+        color name to terminal code, loaded from colorama the first time it is needed.
+    """
+
+    def __init__(self):
+        self._codes = None
+
+    def render_spans(self, spans) -> str:
+        """returns a single line of output, each span starting with the code
+        for its color
+
+        parameters:
+        ----------
+        spans:
+            the lines (color, text) pairs
+
+        returns:
+        -------
+        str:
+            the line, without a newline
+        """
+        codes = self._codes
+        if codes is None:
+            codes = self._codes = self.load_codes()
+        return ''.join([text if color is None else codes[color] + text
+                        for color, text in spans])
+
+    @staticmethod
+    def load_codes() -> dict[str, str]:
+        """returns the terminal code of every color
+
+        returns:
+        -------
+        codes:
+            color name to code
+        """
+        from colorama import Fore
+        return {'green': Fore.GREEN, 'red': Fore.RED, 'yellow': Fore.YELLOW,
+                'cyan': Fore.CYAN, 'blue': Fore.BLUE, 'magenta': Fore.MAGENTA}
+
+
+class EventRenderer(PlainRenderer):
+    """Renders output as JSON lines, one per text event, such as
+    {"kind": "text", "spans": [["cyan", "Location items:"]]}. Pauses are never
+    written: the pacer has already waited them out before a beat is rendered.
+    """
+
+    def render(self, events) -> str:
+        """returns one JSON object per text event, one per line
+
+        parameters:
+        ----------
+        events:
+            output events
+
+        returns:
+        -------
+        str:
+            the JSON lines
+        """
+        import json
+        return ''.join([json.dumps({'kind': 'text', 'spans': event.get_spans()}) + '\n'
+                        for event in events if event.get_kind() == 'text'])
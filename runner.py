@@ -0,0 +1,256 @@
+"""
+Runs large numbers of games across every core with a process pool: either
+recorded transcripts (see transcripts.py) or random walks, where each command
+is picked at random from the ones that make sense in the current location.
+
+Each worker builds its world once when it starts and reuses it for every game
+it is sent. A .gvw world store (see worldstore.py) is mapped instead of built,
+and shared by every worker. Games are sent in batches, and results are reported
+as batches finish, in whatever order that happens.
+
+Usage:
+    python runner.py transcripts FILE... [--workers N] [--batch N] [--world FILE]
+    python runner.py walk [--games N] [--steps N] [--seed N] [--workers N] [--batch N]
+"""
+#used to read the command line options
+import argparse
+#used to run games on every core
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from GVZork import Game, default_world
+from transcripts import read_transcripts, run_transcript, GameResult
+
+#the world of the worker process, set once by start_worker
+_world = None
+
+
+def start_worker(world_path=None) -> None:
+    """builds the world a worker plays every game in
+
+    parameters:
+    ----------
+    world_path:
+        a world file, or None for the Lands Between
+    """
+    global _world
+    if world_path:
+        from worldfile import load_world
+        _world = load_world(world_path)
+    else:
+        _world = default_world()
+
+
+def transcript_batch(batch, seed=None) -> list[GameResult]:
+    """runs a batch of transcripts in a worker
+
+    parameters:
+    ----------
+    batch:
+        (name, commands) pairs
+    seed:
+        seeds the start location of each game, so a rerun gives the same results
+
+    returns:
+    -------
+    results:
+        one result per transcript
+    """
+    results = []
+    for name, commands in batch:
+        if seed is not None:
+            random.seed(f'{seed}:{name}')
+        results.append(run_transcript(commands, name, _world))
+    return results
+
+
+# noinspection PyProtectedMember
+def random_command(game: Game, rng: random.Random) -> str:
+    """picks a command that makes sense in the games current location
+
+    parameters:
+    ----------
+    game: Game:
+        the game being played
+    rng: random.Random:
+        where the choice comes from
+
+    returns:
+    -------
+    command:
+        the command to run
+    """
+    location = game._current_location
+    state = game._state
+    choices = [f'go {direction}' for direction in state.get_neighbors(location)]
+    choices.extend(f'take {item._name}' for item in state.get_items(location))
+    choices.extend(f'give {item._name}' for item in game._inventory)
+    for npc in state.get_npcs(location):
+        choices.append(f'talk {npc._name}')
+        choices.append(f'meet {npc._name}')
+    choices.append('look')
+    choices.append('items')
+    return rng.choice(choices)
+
+
+# noinspection PyProtectedMember
+def walk_batch(first, count, steps, seed) -> list[GameResult]:
+    """plays a batch of random walks in a worker. Game number i always makes
+    the same moves for the same seed, whichever worker plays it.
+
+    parameters:
+    ----------
+    first:
+        the number of the first game in the batch
+    count:
+        how many games to play
+    steps:
+        the most commands a game may run
+    seed:
+        the seed for the whole run
+
+    returns:
+    -------
+    results:
+        one result per game
+    """
+    results = []
+    for number in range(first, first + count):
+        rng = random.Random(f'{seed}:{number}')
+        game = Game(_world, seed=rng.getrandbits(64))
+        game.start()
+        commands = 0
+        while game._game_progress and commands < steps:
+            game.step(random_command(game, rng))
+            commands += 1
+        results.append(GameResult(f'walk:{number}', commands, game.get_ending() or 'unfinished',
+                                  game._cals_needed, game._current_location._name))
+    return results
+
+
+class RunReport:
+    """Adds up the results of a run as batches come back.
+
+    Attributes
+    ----------
+    _games: int
+        how many games have finished.
+    _commands: int
+        how many commands those games ran.
+    _endings: dict
+        ending to the number of games that ended that way.
+    _started: float
+        when the run started, from time.perf_counter.
+    """
+
+    def __init__(self):
+        self._games = 0
+        self._commands = 0
+        self._endings = {}
+        self._started = time.perf_counter()
+
+    def add(self, results) -> None:
+        """adds a finished batch
+
+        parameters:
+        ----------
+        results:
+            the GameResults of the batch
+        """
+        for result in results:
+            self._games += 1
+            self._commands += result.get_commands()
+            self._endings[result.get_ending()] = self._endings.get(result.get_ending(), 0) + 1
+
+    def __str__(self):
+        """returns the totals along with games and commands per second
+
+        returns:
+        -------
+        str:
+            the report
+        """
+        seconds = max(time.perf_counter() - self._started, 1e-9)
+        endings = '\t'.join(f'{ending}={count}' for ending, count in sorted(self._endings.items()))
+        return (f'games={self._games}\tcommands={self._commands}\tseconds={seconds:.3f}\t'
+                f'games/s={self._games / seconds:.0f}\tcommands/s={self._commands / seconds:.0f}\t'
+                f'{endings}')
+
+
+def run(jobs, workers=None, world_path=None, report=None, on_batch=None) -> RunReport:
+    """runs batches on a process pool, adding each one to the report as soon
+    as it finishes
+
+    parameters:
+    ----------
+    jobs:
+        (function, arguments) pairs, one per batch
+    workers:
+        how many processes to use, one per core if not given
+    world_path:
+        the world file every worker loads, the Lands Between if not given
+    report:
+        the RunReport to add to, a new one if not given
+    on_batch:
+        if given, called with the results of each batch as it finishes
+
+    returns:
+    -------
+    report:
+        the totals for the run
+    """
+    if report is None:
+        report = RunReport()
+    with ProcessPoolExecutor(max_workers=workers, initializer=start_worker,
+                             initargs=(world_path,)) as pool:
+        futures = [pool.submit(function, *arguments) for function, arguments in jobs]
+        for future in as_completed(futures):
+            results = future.result()
+            report.add(results)
+            if on_batch is not None:
+                on_batch(results)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run many GVZork games in parallel.')
+    parser.add_argument('mode', choices=['transcripts', 'walk'])
+    parser.add_argument('files', nargs='*', help='transcript files, - reads stdin')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--batch', type=int, default=256, help='games sent to a worker at a time')
+    parser.add_argument('--world', help='a JSON or TOML world file or .gvw world store')
+    parser.add_argument('--games', type=int, default=10000, help='random walks to play')
+    parser.add_argument('--steps', type=int, default=500, help='most commands per random walk')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--results', action='store_true', help='print a line for every game')
+    args = parser.parse_args()
+
+    jobs = []
+    if args.mode == 'transcripts':
+        games = []
+        for path in args.files:
+            if path == '-':
+                transcripts = read_transcripts(sys.stdin)
+            else:
+                with open(path, encoding='utf-8') as file:
+                    transcripts = read_transcripts(file)
+            games.extend((f'{path}:{number}', commands)
+                         for number, commands in enumerate(transcripts, 1))
+        for start in range(0, len(games), args.batch):
+            jobs.append((transcript_batch, (games[start:start + args.batch], args.seed)))
+    else:
+        for start in range(0, args.games, args.batch):
+            jobs.append((walk_batch, (start, min(args.batch, args.games - start),
+                                      args.steps, args.seed)))
+
+    def show(results):
+        sys.stdout.write(''.join(f'{result}\n' for result in results))
+
+    report = run(jobs, args.workers, args.world, on_batch=show if args.results else None)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
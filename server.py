@@ -0,0 +1,378 @@
+"""
+Serves GVZork to many players at once over TCP, in the style of a telnet MUD.
+Every connection gets its own Game, and a single asyncio event loop drives all
+of them through Game.step, so an idle player costs one Game and one socket
+rather than a whole python process.
+
+Usage: python server.py [--host HOST] [--port PORT] [--max-connections N] [--world FILE]
+                        [--output ansi|plain|events] [--metrics FILE] [--metrics-interval SECONDS]
+                        [--sessions DIR [--max-resident N] [--max-resident-mb MB] | --shared]
+
+With --sessions, players give a name when they connect and their game outlives
+the connection: they pick it up where they left off by connecting again under
+the same name. Games are run by a SessionManager (see sessions.py), which keeps
+only the most recently played in memory and the rest in DIR.
+
+With --shared, every player plays in the same world instead of a copy of their
+own (see multiplayer.py): items and npcs are shared, and any player can feed
+the elf. Once the land is saved, players who connect afterwards start over in
+a fresh world.
+
+With --metrics, the time every command takes is written to FILE in the
+Prometheus text format (see instrument.py). Sending the server SIGUSR1 starts
+profiling commands with cProfile, and sending it again writes the profile to
+FILE.prof; SIGUSR2 starts and stops tracemalloc.
+"""
+#used to serve many connections from one thread
+import asyncio
+#used to read the command line options
+import argparse
+#used to switch profiling on and off while serving
+import signal
+from GVZork import Game, Color, set_instruments
+from pacing import AsyncPacer
+from render import AnsiRenderer, PlainRenderer, EventRenderer
+
+#longest line a player may send, keeps each connection's read buffer bounded
+MAX_LINE = 1024
+PROMPT = Color.RED + 'Input command here: '
+NAME_PROMPT = Color.RED + 'What is your name, Tarnished? '
+#longest name a player may give with --sessions
+MAX_NAME = 32
+RENDERERS = {'ansi': AnsiRenderer, 'plain': PlainRenderer, 'events': EventRenderer}
+
+
+class GameServer:
+    """Accepts connections and runs one Game per connection.
+
+    Attributes
+    ----------
+    _world: WorldTemplate
+        the world every game is played in.
+    _host: str
+        the address the server listens on.
+    _port: int
+        the port the server listens on.
+    _max_connections: int
+        how many players may be connected at the same time.
+    _connections: int
+        how many connections are open, counted from the moment they are
+        accepted, whether or not the player has given a name yet.
+    _sessions: set
+        the games of the players currently connected, or their names when games
+        are run by a SessionManager.
+    _manager: SessionManager
+        runs the games by player name, None to give every connection a new game.
+    _shared: SharedWorld
+        the world every player shares, None to give every game its own. Once a
+        player saves the land it is replaced by a fresh one for the next players.
+    _pacer: AsyncPacer
+        waits out the pauses in the games output and renders each beat.
+    _prompt: bytes
+        the rendered prompt sent before every command.
+    _name_prompt: bytes
+        the rendered prompt asking a player for their name.
+    """
+
+    def __init__(self, host='127.0.0.1', port=4000, max_connections=10000, world=None,
+                 renderer=None, manager=None, shared=None):
+        """
+        parameters:
+        ----------
+        host:
+            the address to listen on
+        port:
+            the port to listen on
+        max_connections:
+            how many players may be connected at the same time
+        world:
+            the WorldTemplate every game is played in, the Lands Between if not given
+        renderer:
+            turns output into text, colored with an AnsiRenderer if not given
+        manager:
+            a SessionManager playing in the same world, to keep every players game
+            between connections
+        shared:
+            a SharedWorld of the same world, to let every player play in it together
+        """
+        self._world = world
+        self._host = host
+        self._port = port
+        self._max_connections = max_connections
+        self._connections = 0
+        self._sessions = set()
+        self._manager = manager
+        self._shared = shared
+        self._pacer = AsyncPacer(renderer=renderer)
+        self._prompt = ('\r\n' + self._pacer.get_renderer().render_spans(PROMPT)).encode()
+        self._name_prompt = self._pacer.get_renderer().render_spans(NAME_PROMPT).encode()
+
+    def get_session_count(self) -> int:
+        """gets and returns how many players are connected
+
+        returns:
+        -------
+        len(self._sessions):
+            the number of running games
+        """
+        return len(self._sessions)
+
+    def get_connection_count(self) -> int:
+        """gets and returns how many connections are open, including players
+        who have not given their name yet
+
+        returns:
+        -------
+        self._connections:
+            an instance of _connections
+        """
+        return self._connections
+
+    async def serve(self) -> None:
+        """listens for players until the task is cancelled.
+        """
+        server = await asyncio.start_server(self.handle, self._host, self._port,
+                                            limit=MAX_LINE)
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        """runs one players game from the first message until they quit,
+        finish the game or disconnect. The connection counts towards
+        max_connections from the moment it is accepted, so players who never
+        give their name cannot hold more than their share of the server.
+
+        parameters:
+        ----------
+        reader: asyncio.StreamReader:
+            reads the players commands
+        writer: asyncio.StreamWriter:
+            sends the games output to the player
+        """
+        if self._connections >= self._max_connections:
+            writer.write(b'The Lands Between are full, try again later.\r\n')
+            await self._close(writer)
+            return
+
+        self._connections += 1
+        try:
+            if self._manager is not None:
+                await self.handle_session(reader, writer)
+            else:
+                await self.handle_game(reader, writer)
+        finally:
+            self._connections -= 1
+
+    async def handle_game(self, reader: asyncio.StreamReader,
+                          writer: asyncio.StreamWriter) -> None:
+        """starts a new game, in the shared world if there is one, and runs it
+        until the player quits, finishes the game or disconnects
+
+        parameters:
+        ----------
+        reader: asyncio.StreamReader:
+            reads the players commands
+        writer: asyncio.StreamWriter:
+            sends the games output to the player
+        """
+        if self._shared is None:
+            game = Game(self._world)
+        else:
+            from multiplayer import Player
+            if self._shared.get_ending() is not None:
+                self._shared = self._shared.start_over()
+            game = Player(self._shared)
+        self._sessions.add(game)
+        try:
+            await self.send_events(writer, game.start())
+            while game._game_progress:
+                command = await self._read_command(reader, writer, self._prompt)
+                if command is None:
+                    break
+                await self.send_events(writer, game.step(command))
+        except ConnectionError:
+            pass
+        finally:
+            self._sessions.discard(game)
+            if self._shared is not None:
+                game.leave()
+            await self._close(writer)
+
+    async def handle_session(self, reader: asyncio.StreamReader,
+                             writer: asyncio.StreamWriter) -> None:
+        """asks a player for their name and runs the game the SessionManager
+        keeps under it, starting one if they have none, until they quit,
+        finish the game or disconnect. Their game is kept when they disconnect.
+
+        parameters:
+        ----------
+        reader: asyncio.StreamReader:
+            reads the players name and commands
+        writer: asyncio.StreamWriter:
+            sends the games output to the player
+        """
+        manager = self._manager
+        name = None
+        try:
+            name = await self._read_command(reader, writer, self._name_prompt)
+            if not name:
+                return
+            if len(name) > MAX_NAME:
+                writer.write(b'That name is too long.\r\n')
+                return
+            if name in self._sessions:
+                writer.write(b'That Tarnished is already playing.\r\n')
+                name = None
+                return
+            self._sessions.add(name)
+            if name in manager:
+                events = manager.step(name, 'look')
+            else:
+                events = manager.start(name)
+            await self.send_events(writer, events)
+            while name in manager:
+                command = await self._read_command(reader, writer, self._prompt)
+                if command is None:
+                    break
+                await self.send_events(writer, manager.step(name, command))
+        except ConnectionError:
+            pass
+        finally:
+            self._sessions.discard(name)
+            await self._close(writer)
+
+    async def _read_command(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                            prompt: bytes):
+        """sends a prompt and reads one line from a player
+
+        parameters:
+        ----------
+        reader: asyncio.StreamReader:
+            reads the players line
+        writer: asyncio.StreamWriter:
+            sends the prompt
+        prompt: bytes:
+            the rendered prompt
+
+        returns:
+        -------
+        str:
+            the line without surrounding whitespace, or None if the player
+            disconnected or sent a line that is too long
+        """
+        writer.write(prompt)
+        await writer.drain()
+        try:
+            line = await reader.readline()
+        except (asyncio.LimitOverrunError, ValueError):
+            writer.write(b'\r\nThat command is too long.\r\n')
+            return None
+        if not line:
+            return None
+        writer.write(b'\r\n')
+        return line.decode('utf-8', errors='replace').strip()
+
+    async def send_events(self, writer: asyncio.StreamWriter, events) -> None:
+        """sends output events to a player, one write per beat. Pauses
+        wait on the event loop, so they do not hold up the other players.
+
+        parameters:
+        ----------
+        writer: asyncio.StreamWriter:
+            the players connection
+        events:
+            the events returned by Game.start or Game.step
+        """
+        await self._pacer.deliver(events,
+                                  lambda text: writer.write(text.replace('\n', '\r\n').encode()),
+                                  writer.drain)
+        await writer.drain()
+
+    @staticmethod
+    async def _close(writer: asyncio.StreamWriter) -> None:
+        """closes a players connection, ignoring errors from clients
+        that have already gone away.
+
+        parameters:
+        ----------
+        writer: asyncio.StreamWriter:
+            the players connection
+        """
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve GVZork over TCP.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=4000)
+    parser.add_argument('--max-connections', type=int, default=10000)
+    parser.add_argument('--world', help='a JSON or TOML world file, or a .gvw world store, to serve '
+                                        'instead of the Lands Between')
+    parser.add_argument('--output', choices=sorted(RENDERERS), default='ansi',
+                        help='colored text, plain text or JSON lines')
+    parser.add_argument('--metrics', help='file to write command metrics to, in the Prometheus text format')
+    parser.add_argument('--metrics-interval', type=float, default=15, help='seconds between metrics writes')
+    parser.add_argument('--sessions', help='directory to keep the games of players who are not in memory, '
+                                           'so games outlive their connections')
+    parser.add_argument('--max-resident', type=int, help='how many games to keep in memory with --sessions')
+    parser.add_argument('--max-resident-mb', type=float,
+                        help='how many megabytes of games to keep in memory with --sessions')
+    parser.add_argument('--shared', action='store_true', help='let every player play in the same world')
+    args = parser.parse_args()
+    if args.shared and args.sessions:
+        parser.error('--shared games cannot be kept with --sessions')
+    world = None
+    if args.world:
+        from worldfile import load_world
+        world = load_world(args.world)
+    manager = None
+    if args.sessions:
+        from sessions import SessionManager
+        max_bytes = None if args.max_resident_mb is None else int(args.max_resident_mb * 1e6)
+        manager = SessionManager(args.sessions, world, max_sessions=args.max_resident, max_bytes=max_bytes)
+    shared = None
+    if args.shared:
+        from multiplayer import SharedWorld
+        shared = SharedWorld(world)
+    server = GameServer(args.host, args.port, args.max_connections, world,
+                        RENDERERS[args.output](), manager, shared)
+    if args.metrics:
+        from instrument import Instruments
+        instruments = Instruments()
+        set_instruments(instruments)
+        if manager is not None:
+            instruments.add_source(manager.prometheus)
+        instruments.start_periodic(args.metrics, args.metrics_interval)
+        profiling = [False]
+        tracing = [False]
+
+        def toggle_profiling(signum, frame):
+            profiling[0] = not profiling[0]
+            instruments.set_profiling(profiling[0], args.metrics + '.prof')
+
+        def toggle_tracemalloc(signum, frame):
+            tracing[0] = not tracing[0]
+            instruments.set_tracemalloc(tracing[0])
+
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, toggle_profiling)
+            signal.signal(signal.SIGUSR2, toggle_tracemalloc)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.metrics:
+            instruments.stop_periodic()
+            instruments.write(args.metrics)
+        if manager is not None:
+            manager.close()
+
+
+if __name__ == "__main__":
+    main()
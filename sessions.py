@@ -0,0 +1,546 @@
+"""
+Holds more games than fit in memory, for hosting many players who are mostly
+idle. A SessionManager keeps the games that were played most recently in
+memory, under a budget of games, of bytes, or both. When the budget is
+exceeded, the game that has gone longest without a command is packed with
+Game.snapshot, appended to a store file and dropped from memory. Its next
+command restores it from the store, so a caller never has to know whether a
+game was in memory:
+
+    sessions = SessionManager('sessions', max_sessions=1000)
+    events = sessions.start('alice')
+    events = sessions.step('alice', 'go north')
+    print(sessions.report())
+
+The store is one file of records in the layout of snapshots.py, each a header,
+the utf-8 session id and the snapshot. Appending a record is a single
+unbuffered write, far cheaper than writing a file per game. Only the last
+record of a session counts, and a record with an empty snapshot marks a
+session that has ended. Once the records no longer counted outweigh the rest,
+the store is rewritten with only the last record of each session. Opening a
+store reads every record back into the index, dropping a record cut short by
+a crash in the middle of an append.
+
+Bytes are estimated by walking the objects a game owns, without the world it
+shares with every other game. The walk costs about as much as ten commands,
+so a games size is measured again only every SIZE_INTERVAL commands.
+
+The manager counts hits (commands whose game was in memory), misses (commands
+whose game had to be read back) and how long each rehydration took, which
+report and prometheus return together with the number of games and bytes in
+memory.
+"""
+#used to estimate the memory a game owns
+import sys
+import gc
+from types import ModuleType, FunctionType, BuiltinFunctionType
+#used to time rehydrations
+import time
+#used to append to and read from the store without buffering
+import os
+from collections import OrderedDict
+from GVZork import Game, WorldState, default_world, Location, Item, NPC, Color
+from instrument import BUCKETS, CommandStats
+from snapshots import RECORD_HEADER
+
+#the store file in the session directory
+STORE_NAME = 'sessions.dat'
+#the longest session id a record header can hold, in utf-8 bytes
+MAX_ID_BYTES = 0xffff
+#bytes of records no longer counted before the store is rewritten
+COMPACT_MIN = 1 << 20
+#how many commands a game runs before its size is measured again
+SIZE_INTERVAL = 32
+#objects shared by every game, which are not counted in a games size
+SHARED_TYPES = (Location, Item, NPC, Color, type, ModuleType, FunctionType, BuiltinFunctionType)
+
+
+# noinspection PyProtectedMember
+def session_size(game: Game) -> int:
+    """returns an estimate of the bytes a game holds in memory: the sizes of
+    every object reachable from it, leaving out the world and its locations,
+    items and npcs, which every game shares
+
+    parameters:
+    ----------
+    game: Game:
+        the game to measure
+
+    returns:
+    -------
+    int:
+        bytes
+    """
+    world = game._world
+    seen = {id(world)}
+    if hasattr(world, '__dict__'):
+        seen.update(id(value) for value in vars(world).values())
+    total = 0
+    stack = [game]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return total
+
+
+# noinspection PyProtectedMember
+class SessionManager:
+    """Runs games by session id, keeping the most recently played in memory
+    and the rest in a store file.
+
+    Attributes
+    ----------
+    _path: str
+        the store file.
+    _file: int
+        the file descriptor of the store, opened for appending.
+    _index: dict
+        session id to the offset and length of its last snapshot in the store,
+        and the size of its game when it was written, None if not known.
+    _size: int
+        the length of the store file.
+    _garbage: int
+        bytes of records in the store that no longer count.
+    _world: WorldTemplate
+        the world every game is played in.
+    _state_class: type
+        WorldState or BitsetWorldState, as for Game.
+    _max_sessions: int
+        how many games may be in memory, None for no limit.
+    _max_bytes: int
+        how many bytes the games in memory may hold, None for no limit.
+    _sessions: OrderedDict
+        session id to its game, for the games in memory, the least recently played first.
+    _sizes: dict
+        session id to the last measured size of its game, in bytes.
+    _resident_bytes: int
+        the sum of _sizes.
+    _unmeasured: dict
+        session id to how many commands its game has run since it was measured.
+    _hits: int
+        commands whose game was in memory.
+    _misses: int
+        commands whose game had to be read back from the store.
+    _evictions: int
+        games written out to stay under the budget.
+    _rehydrations: CommandStats
+        how long reading each game back from the store took.
+    """
+
+    def __init__(self, directory: str, world=None, state_class=WorldState,
+                 max_sessions: int = None, max_bytes: int = None):
+        """opens the store in directory, creating both if missing, and reads
+        which sessions it holds
+
+        parameters:
+        ----------
+        directory: str:
+            where the store of the games that are not in memory is kept
+        world:
+            the WorldTemplate every game is played in, the Lands Between if not given
+        state_class:
+            WorldState or BitsetWorldState, as for Game
+        max_sessions: int = None:
+            how many games may be in memory, at least 1, no limit if not given
+        max_bytes: int = None:
+            how many bytes the games in memory may hold, no limit if not given
+        """
+        if max_sessions is not None and max_sessions < 1:
+            raise ValueError('At least one session has to fit in memory.')
+        if world is None:
+            world = default_world()
+        os.makedirs(directory, exist_ok=True)
+        self._path = os.path.join(directory, STORE_NAME)
+        self._file = None
+        self._index = {}
+        self._size = 0
+        self._garbage = 0
+        self._world = world
+        self._state_class = state_class
+        self._max_sessions = max_sessions
+        self._max_bytes = max_bytes
+        self._sessions = OrderedDict()
+        self._sizes = {}
+        self._resident_bytes = 0
+        self._unmeasured = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._rehydrations = CommandStats()
+        self._open()
+
+    def __contains__(self, session_id: str) -> bool:
+        """returns whether a session has a game, in memory or in the store
+
+        parameters:
+        ----------
+        session_id: str:
+            the session
+
+        returns:
+        -------
+        bool:
+            True if the session was started and has not ended
+        """
+        return session_id in self._sessions or session_id in self._index
+
+    def get_resident_count(self) -> int:
+        """gets and returns how many games are in memory
+
+        returns:
+        -------
+        len(self._sessions):
+            the number of games in memory
+        """
+        return len(self._sessions)
+
+    def get_resident_bytes(self) -> int:
+        """gets and returns the estimated bytes the games in memory hold
+
+        returns:
+        -------
+        self._resident_bytes:
+            an instance of _resident_bytes
+        """
+        return self._resident_bytes
+
+    def get_hit_rate(self) -> float:
+        """returns the share of commands whose game was already in memory
+
+        returns:
+        -------
+        float:
+            from 0 to 1, or 1 before any command has run
+        """
+        total = self._hits + self._misses
+        return self._hits / total if total else 1.0
+
+    def start(self, session_id: str, seed: int = None) -> list:
+        """starts a new game for a session, replacing any game it had
+
+        parameters:
+        ----------
+        session_id: str:
+            the session
+        seed: int = None:
+            the seed of the games random choices, as for Game
+
+        returns:
+        -------
+        events:
+            the output events for the start of the game
+
+        error:
+        -----
+        ValueError:
+            the session id is too long for the store
+        """
+        if len(session_id.encode('utf-8')) > MAX_ID_BYTES:
+            raise ValueError(f'Session ids are at most {MAX_ID_BYTES} bytes long.')
+        self.end(session_id)
+        game = Game(self._world, self._state_class, seed)
+        self._add(session_id, game)
+        events = game.start()
+        self._enforce()
+        return events
+
+    def step(self, session_id: str, command: str) -> list:
+        """runs one command in a sessions game, reading the game back from the
+        store first if it is not in memory. A game that ends is removed.
+
+        parameters:
+        ----------
+        session_id: str:
+            the session
+        command: str:
+            one line of input
+
+        returns:
+        -------
+        events:
+            the output events for the command
+
+        error:
+        -----
+        KeyError:
+            the session has no game
+        """
+        resident = session_id in self._sessions
+        game = self.get_game(session_id)
+        if resident:
+            self._hits += 1
+        else:
+            self._misses += 1
+        events = game.step(command)
+        if not game._game_progress:
+            self.end(session_id)
+            return events
+        self._unmeasured[session_id] += 1
+        if self._unmeasured[session_id] >= SIZE_INTERVAL:
+            self._measure(session_id, game)
+        self._enforce()
+        return events
+
+    def get_game(self, session_id: str) -> Game:
+        """returns a sessions game, reading it back from the store if it is not
+        in memory, and marks it as the most recently played. The game may be
+        written out again by the next start or step of another session.
+
+        parameters:
+        ----------
+        session_id: str:
+            the session
+
+        returns:
+        -------
+        game:
+            the sessions game
+
+        error:
+        -----
+        KeyError:
+            the session has no game
+        """
+        game = self._sessions.get(session_id)
+        if game is not None:
+            self._sessions.move_to_end(session_id)
+            return game
+        offset, length, size = self._index[session_id]
+        cpu_before = time.process_time()
+        wall_before = time.perf_counter()
+        game = Game.restore(os.pread(self._file, length, offset), self._world, self._state_class)
+        self._add(session_id, game, size)
+        self._rehydrations.add(time.perf_counter() - wall_before,
+                               time.process_time() - cpu_before, 0, 0)
+        return game
+
+    def evict(self, session_id: str) -> None:
+        """writes a sessions game to the store and drops it from memory
+
+        parameters:
+        ----------
+        session_id: str:
+            the session, which has to be in memory
+        """
+        game = self._sessions.pop(session_id)
+        size = self._sizes.pop(session_id)
+        self._resident_bytes -= size
+        del self._unmeasured[session_id]
+        self._append(session_id, game.snapshot(), size)
+
+    def end(self, session_id: str) -> None:
+        """removes a sessions game from memory and from the store, if it has one
+
+        parameters:
+        ----------
+        session_id: str:
+            the session
+        """
+        if self._sessions.pop(session_id, None) is not None:
+            self._resident_bytes -= self._sizes.pop(session_id)
+            del self._unmeasured[session_id]
+        if session_id in self._index:
+            self._append(session_id, b'')
+
+    def close(self) -> None:
+        """writes every game in memory to the store and closes it, for shutting
+        down without losing any session
+        """
+        while self._sessions:
+            self.evict(next(iter(self._sessions)))
+        if self._file is not None:
+            os.close(self._file)
+            self._file = None
+
+    def report(self) -> str:
+        """returns the hit rate, rehydration latency and what is in memory
+
+        returns:
+        -------
+        str:
+            one line per number
+        """
+        rehydrations = self._rehydrations
+        calls = max(rehydrations.get_calls(), 1)
+        return '\n'.join([f'{"resident sessions":<24}{len(self._sessions):>12}',
+                          f'{"resident bytes":<24}{self._resident_bytes:>12}',
+                          f'{"stored sessions":<24}{len(self._index):>12}',
+                          f'{"store bytes":<24}{self._size:>12}',
+                          f'{"hits":<24}{self._hits:>12}',
+                          f'{"misses":<24}{self._misses:>12}',
+                          f'{"hit rate":<24}{self.get_hit_rate():>12.4f}',
+                          f'{"evictions":<24}{self._evictions:>12}',
+                          f'{"rehydration mean us":<24}{rehydrations._wall_sum / calls * 1e6:>12.1f}',
+                          f'{"rehydration p99 us":<24}{rehydrations.percentile(0.99) * 1e6:>12.0f}'])
+
+    def prometheus(self) -> str:
+        """returns the numbers of report in the Prometheus text format, which
+        can be added to the command metrics with Instruments.add_source
+
+        returns:
+        -------
+        str:
+            the metrics, ending in a newline
+        """
+        rehydrations = self._rehydrations
+        lines = []
+        for metric, kind, text, value in (
+                ('gvzork_sessions_resident', 'gauge', 'Games in memory.', len(self._sessions)),
+                ('gvzork_sessions_resident_bytes', 'gauge', 'Estimated bytes held by the games in memory.',
+                 self._resident_bytes),
+                ('gvzork_sessions_stored', 'gauge', 'Games in the store.', len(self._index)),
+                ('gvzork_sessions_store_bytes', 'gauge', 'Length of the store file.', self._size),
+                ('gvzork_session_hits_total', 'counter', 'Commands whose game was in memory.', self._hits),
+                ('gvzork_session_misses_total', 'counter', 'Commands whose game was read back from the store.',
+                 self._misses),
+                ('gvzork_session_evictions_total', 'counter', 'Games written out to stay under the budget.',
+                 self._evictions)):
+            lines.append(f'# HELP {metric} {text}')
+            lines.append(f'# TYPE {metric} {kind}')
+            lines.append(f'{metric} {value}')
+        metric = 'gvzork_session_rehydration_seconds'
+        lines.append(f'# HELP {metric} Wall clock time taken to read a game back from the store.')
+        lines.append(f'# TYPE {metric} histogram')
+        seen = 0
+        for bound, count in zip(BUCKETS + (float('inf'),), rehydrations._wall):
+            seen += count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'{metric}_bucket{{le="{le}"}} {seen}')
+        lines.append(f'{metric}_sum {rehydrations._wall_sum!r}')
+        lines.append(f'{metric}_count {rehydrations.get_calls()}')
+        return '\n'.join(lines) + '\n'
+
+    def _open(self) -> None:
+        """opens the store and reads the last record of every session into the
+        index. A record cut short at the end of the file is cut off, so the next
+        append starts on a whole record.
+        """
+        self._file = os.open(self._path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        with open(self._path, 'rb') as file:
+            blob = file.read()
+        view = memoryview(blob)
+        index = {}
+        position = 0
+        while position + RECORD_HEADER.size <= len(blob):
+            key_length, data_length = RECORD_HEADER.unpack_from(blob, position)
+            start = position + RECORD_HEADER.size + key_length
+            if start + data_length > len(blob):
+                break
+            session_id = bytes(view[position + RECORD_HEADER.size:start]).decode('utf-8')
+            if data_length:
+                index[session_id] = (start, data_length, None)
+            else:
+                index.pop(session_id, None)
+            position = start + data_length
+        if position != len(blob):
+            os.ftruncate(self._file, position)
+        self._index = index
+        self._size = position
+        self._garbage = position - sum(RECORD_HEADER.size + len(session_id.encode('utf-8')) + length
+                                       for session_id, (_, length, _) in index.items())
+
+    def _append(self, session_id: str, data: bytes, size: int = None) -> None:
+        """appends a record to the store, then rewrites the store if most of it
+        no longer counts
+
+        parameters:
+        ----------
+        session_id: str:
+            the session
+        data: bytes:
+            its snapshot, empty if the session has ended
+        size: int = None:
+            the measured size of its game, kept for when it is read back
+        """
+        key = session_id.encode('utf-8')
+        os.write(self._file, RECORD_HEADER.pack(len(key), len(data)) + key + data)
+        start = self._size + RECORD_HEADER.size + len(key)
+        previous = self._index.pop(session_id, None)
+        if previous is not None:
+            self._garbage += RECORD_HEADER.size + len(key) + previous[1]
+        if data:
+            self._index[session_id] = (start, len(data), size)
+        else:
+            self._garbage += RECORD_HEADER.size + len(key)
+        self._size = start + len(data)
+        if self._garbage > COMPACT_MIN and self._garbage * 2 > self._size:
+            self._compact()
+
+    def _compact(self) -> None:
+        """rewrites the store with only the last record of every session. The
+        file is replaced only once it has been written completely.
+        """
+        parts = []
+        index = {}
+        size = 0
+        for session_id, (offset, length, measured) in self._index.items():
+            key = session_id.encode('utf-8')
+            parts.append(RECORD_HEADER.pack(len(key), length) + key)
+            parts.append(os.pread(self._file, length, offset))
+            size += RECORD_HEADER.size + len(key)
+            index[session_id] = (size, length, measured)
+            size += length
+        temp_path = f'{self._path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(b''.join(parts))
+        os.replace(temp_path, self._path)
+        os.close(self._file)
+        self._file = os.open(self._path, os.O_RDWR | os.O_APPEND)
+        self._index = index
+        self._size = size
+        self._garbage = 0
+
+    def _add(self, session_id: str, game: Game, size: int = None) -> None:
+        """puts a game in memory as the most recently played
+
+        parameters:
+        ----------
+        session_id: str:
+            the session
+        game: Game:
+            its game
+        size: int = None:
+            its size when it was written to the store, measured now if not given.
+            A restored game has no cached views yet, so that size is an upper bound.
+        """
+        self._sessions[session_id] = game
+        if size is None:
+            self._sizes[session_id] = 0
+            self._measure(session_id, game)
+        else:
+            self._sizes[session_id] = size
+            self._resident_bytes += size
+            self._unmeasured[session_id] = 0
+
+    def _measure(self, session_id: str, game: Game) -> None:
+        """measures a game in memory again, if there is a budget of bytes
+
+        parameters:
+        ----------
+        session_id: str:
+            the session
+        game: Game:
+            its game
+        """
+        self._unmeasured[session_id] = 0
+        if self._max_bytes is None:
+            return
+        size = session_size(game)
+        self._resident_bytes += size - self._sizes[session_id]
+        self._sizes[session_id] = size
+
+    def _enforce(self) -> None:
+        """writes out the least recently played games until the games in
+        memory fit the budget. The most recently played game always stays.
+        """
+        max_sessions = self._max_sessions
+        max_bytes = self._max_bytes
+        while len(self._sessions) > 1 and (
+                (max_sessions is not None and len(self._sessions) > max_sessions)
+                or (max_bytes is not None and self._resident_bytes > max_bytes)):
+            self.evict(next(iter(self._sessions)))
+            self._evictions += 1
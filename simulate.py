@@ -0,0 +1,566 @@
+"""
+Plays very large numbers of games of a world at once to see how its calorie
+and weight economy works out, without creating Game objects. Every game is a
+row of NumPy arrays (location, weight carried, calories still needed, where
+each item and npc is) and all of them take one command per step together.
+
+The rules are the ones Game plays by:
+- go fails while carrying more than the carry limit;
+- food given in the elfs location is eaten;
+- anything else given there sends the player to a random location;
+- fighting an npc without the Dark Elf Sword sends the player to a random
+  location, and fighting one with it slays the npc;
+- the game is won when the elf needs no more calories, or when the player
+  brings the Dark Elf Sword to the elf.
+
+Two policies choose the commands. 'random' picks uniformly among going along
+each edge out of the current location, taking each item there, giving each
+item held and fighting each npc there. Unlike runner.py walk it never talks,
+meets, looks or lists items, which change nothing here, and it does fight,
+which walk never does, so its games are not comparable step for step.
+'greedy' takes the nearest food that still fits and walks it to the elf by the
+shortest route once it carries enough, or once nothing else fits. --epsilon
+mixes the two, taking a random command instead of the greedy one with that
+probability.
+
+Every game keeps where each item and npc is, so a batch holds games x (items +
+npcs) numbers; batches are made smaller than --batch where that would pass
+MAX_BATCH_CELLS. The greedy policy also needs the shortest routes to the elf and
+to every location food starts in, one row of locations per target, built the
+first time a greedy command is chosen. A world needing more than
+MAX_ROUTE_CELLS of them raises a ValueError and can only be played randomly.
+
+Needs numpy.
+
+Usage:
+    python simulate.py [--games N] [--policy random|greedy] [--epsilon E] [--steps N]
+                       [--seed N] [--world FILE] [--batch N] [--calories C]
+                       [--carry-limit W] [--bins N]
+"""
+#used to read the command line options
+import argparse
+#used to play every game in lockstep
+import numpy as np
+from GVZork import default_world
+
+ELF_LOCATION = 'Mountaintops of the Giants'
+SWORD = 'Dark Elf Sword'
+CALORIES_NEEDED = 500
+CARRY_LIMIT = 30
+#where an item is when it is not in a location
+HELD = -1
+GONE = -2
+ENDINGS = ('unfinished', 'fed', 'sword')
+#the most entries each route table may hold, 256 MB at four bytes apiece
+MAX_ROUTE_CELLS = 1 << 26
+#the most entries a batches item and npc arrays may hold together
+MAX_BATCH_CELLS = 1 << 24
+
+
+# noinspection PyProtectedMember
+class Economy:
+    """Represents a world as arrays indexed by location, item and npc id.
+
+    Attributes
+    ----------
+    _location_count: int
+        how many locations the world has.
+    _offsets: ndarray
+        where the edges of each location start in _targets, from the WorldGraph.
+    _targets: ndarray
+        the location each edge leads to.
+    _degrees: ndarray
+        how many edges leave each location.
+    _item_start: ndarray
+        the location each item starts in.
+    _item_weights: ndarray
+        the weight of each item.
+    _item_calories: ndarray
+        the calories of each item.
+    _npc_start: ndarray
+        the location each npc starts in.
+    _elf: int
+        the id of the elfs location.
+    _sword: int
+        the id of the Dark Elf Sword, -1 if the world has none.
+    _graph: WorldGraph
+        the graph the routes are read from.
+    _route_rows: ndarray
+        location id to its row in _next_edges and _distances, -1 for locations
+        no food starts in. None until get_routes is first called.
+    _next_edges: ndarray
+        for each row, the edge every location takes next towards it.
+    _distances: ndarray
+        for each row, how many moves every location is from it.
+    """
+
+    def __init__(self, world=None):
+        """
+        parameters:
+        ----------
+        world:
+            the WorldTemplate to play, the Lands Between if not given
+        """
+        if world is None:
+            world = default_world()
+        graph = world.get_graph()
+        elf = world.get_location(ELF_LOCATION)
+        if elf is None:
+            raise ValueError(f'The world has no location named {ELF_LOCATION}.')
+        self._location_count = graph.get_location_count()
+        self._offsets = np.array(graph._offsets, dtype=np.int64)
+        self._targets = np.array(graph._targets, dtype=np.int64)
+        self._degrees = np.diff(self._offsets)
+        items = world._Item_list
+        self._item_start = np.zeros(len(items), dtype=np.int32)
+        for location in world._Location_list:
+            for item in location._item_list:
+                self._item_start[item._id] = location._id
+        self._item_weights = np.array([item._weight for item in items], dtype=np.float64)
+        self._item_calories = np.array([item._calories for item in items], dtype=np.float64)
+        self._npc_start = np.zeros(len(world._NPC_list), dtype=np.int32)
+        for location in world._Location_list:
+            for npc in location._npc_list:
+                self._npc_start[npc._id] = location._id
+        self._elf = elf._id
+        self._sword = next((item._id for item in items if item._name == SWORD), -1)
+
+        self._graph = graph
+        self._route_rows = None
+        self._next_edges = None
+        self._distances = None
+
+    def get_routes(self) -> tuple:
+        """returns the route tables, building them the first time. Routes are only
+        ever needed to the elf and to where food starts. Raises a ValueError if
+        the tables would hold more than MAX_ROUTE_CELLS entries each.
+
+        returns:
+        -------
+        routes:
+            (_route_rows, _next_edges, _distances)
+
+        error:
+        -----
+        ValueError:
+            the world has too many locations food starts in for its size
+        """
+        if self._route_rows is None:
+            route_targets = sorted({self._elf, *(int(self._item_start[item_id])
+                                                 for item_id in np.nonzero(self._item_calories > 0)[0])})
+            if len(route_targets) * self._location_count > MAX_ROUTE_CELLS:
+                raise ValueError(f'Routes to {len(route_targets)} locations in a world of '
+                                 f'{self._location_count} would take more than {MAX_ROUTE_CELLS} '
+                                 'entries, play it with the random policy.')
+            next_edges = np.empty((len(route_targets), self._location_count), dtype=np.int32)
+            distances = np.empty((len(route_targets), self._location_count), dtype=np.int32)
+            for row, target in enumerate(route_targets):
+                tree_edges, tree_distances = self._graph.get_tree(target)
+                next_edges[row] = np.frombuffer(tree_edges, dtype=np.int32)
+                distances[row] = np.frombuffer(tree_distances, dtype=np.int32)
+            route_rows = np.full(self._location_count, -1, dtype=np.int64)
+            route_rows[route_targets] = np.arange(len(route_targets))
+            self._next_edges = next_edges
+            self._distances = distances
+            self._route_rows = route_rows
+        return self._route_rows, self._next_edges, self._distances
+
+    def get_location_count(self) -> int:
+        """gets and returns how many locations the world has
+
+        returns:
+        -------
+        self._location_count:
+            an instance of _location_count
+        """
+        return self._location_count
+
+
+# noinspection PyProtectedMember
+class Batch:
+    """Represents a batch of games being played in lockstep. Row i of every
+    array belongs to game _ids[i], and rows are dropped as games end.
+
+    Attributes
+    ----------
+    _economy: Economy
+        the world being played.
+    _rng: numpy.random.Generator
+        where every random choice comes from.
+    _ids: ndarray
+        the number of the game in each row.
+    _locations: ndarray
+        the location of each game.
+    _weights: ndarray
+        the weight each game is carrying.
+    _needed: ndarray
+        the calories the elf still needs in each game.
+    _items: ndarray
+        games by items, where each item is: a location id, HELD or GONE.
+    _npcs: ndarray
+        games by npcs, where each npc is: a location id, or GONE once slain.
+    _commands: ndarray
+        how many commands each game has run.
+    _carry_limit: float
+        the most weight a player can carry and still go somewhere.
+    """
+
+    def __init__(self, economy: Economy, ids, rng, calories=CALORIES_NEEDED, carry_limit=CARRY_LIMIT):
+        """
+        parameters:
+        ----------
+        economy: Economy:
+            the world to play
+        ids:
+            the numbers of the games in the batch
+        rng:
+            a numpy.random.Generator
+        calories:
+            how many calories the elf needs
+        carry_limit:
+            the most weight a player can carry and still go somewhere
+        """
+        count = len(ids)
+        self._economy = economy
+        self._rng = rng
+        self._ids = np.asarray(ids)
+        self._locations = rng.integers(0, economy._location_count, count)
+        self._weights = np.zeros(count)
+        self._needed = np.full(count, float(calories))
+        self._items = np.tile(economy._item_start, (count, 1))
+        self._npcs = np.tile(economy._npc_start, (count, 1))
+        self._commands = np.zeros(count, dtype=np.int64)
+        self._carry_limit = carry_limit
+
+    def __len__(self):
+        return len(self._ids)
+
+    def step(self, policy: str, epsilon: float = 0.0) -> None:
+        """runs one command in every game of the batch
+
+        parameters:
+        ----------
+        policy: str:
+            'random' or 'greedy'
+        epsilon: float:
+            the chance a greedy game runs a random command instead
+        """
+        rows = np.arange(len(self._ids))
+        if policy == 'greedy':
+            wander = self._rng.random(len(rows)) < epsilon
+            self.greedy_step(rows[~wander])
+            rows = rows[wander]
+        self.random_step(rows)
+        self._commands += 1
+
+    def random_step(self, rows) -> None:
+        """runs a uniformly chosen command in each of the given rows: going along
+        an edge, or taking, giving or fighting something
+
+        parameters:
+        ----------
+        rows:
+            the rows that take a random command
+        """
+        if not len(rows):
+            return
+        economy = self._economy
+        locations = self._locations[rows]
+        degrees = economy._degrees[locations]
+        here = self._items[rows] == locations[:, None]
+        held = self._items[rows] == HELD
+        npcs = self._npcs[rows] == locations[:, None]
+        n_here = here.sum(1)
+        n_held = held.sum(1)
+        n_npcs = npcs.sum(1)
+        choice = (self._rng.random(len(rows)) * (degrees + n_here + n_held + n_npcs)).astype(np.int64)
+
+        moving = choice < degrees
+        self.go(rows[moving], economy._offsets[locations[moving]] + choice[moving])
+        choice -= degrees
+        taking = ~moving & (choice < n_here)
+        self.take(rows[taking], nth(here[taking], choice[taking]))
+        choice -= n_here
+        giving = ~moving & ~taking & (choice < n_held)
+        self.give(rows[giving], nth(held[giving], choice[giving]))
+        choice -= n_held
+        fighting = ~moving & ~taking & ~giving & (choice < n_npcs)
+        self.fight(rows[fighting], nth(npcs[fighting], choice[fighting]))
+
+    def greedy_step(self, rows) -> None:
+        """runs the greedy command in each of the given rows: drop something if
+        carrying too much to move, give food to the elf, take food that fits, or
+        take one step towards the nearest food or the elf
+
+        parameters:
+        ----------
+        rows:
+            the rows that take the greedy command
+        """
+        if not len(rows):
+            return
+        economy = self._economy
+        route_rows, next_edges, route_distances = economy.get_routes()
+        locations = self._locations[rows]
+        items = self._items[rows]
+        food = economy._item_calories > 0
+        held = items == HELD
+        held_food = held & food
+        at_elf = locations == economy._elf
+        overloaded = self._weights[rows] > self._carry_limit
+        self.give(rows[overloaded], nth(held[overloaded], 0))
+        giving = ~overloaded & at_elf & held_food.any(1)
+        self.give(rows[giving], nth(held_food[giving], 0))
+        giving |= overloaded
+
+        fits = (self._weights[rows, None] + economy._item_weights) <= self._carry_limit
+        wanted = (items >= 0) & food & fits & (items != economy._elf)
+        here = wanted & (items == locations[:, None])
+        taking = ~giving & here.any(1)
+        self.take(rows[taking], nth(here[taking], 0))
+
+        moving = ~giving & ~taking
+        if not moving.any():
+            return
+        rows, locations, items, wanted = rows[moving], locations[moving], items[moving], wanted[moving]
+        #how far each wanted item is, from the route table row of the location it is in
+        item_rows = route_rows[np.where(wanted, items, 0)]
+        distances = route_distances[item_rows, locations[:, None]].astype(np.int64)
+        distances = np.where(wanted & (item_rows >= 0) & (distances >= 0), distances, np.iinfo(np.int64).max)
+        nearest = distances.argmin(1)
+        found = wanted.any(1) & (distances[np.arange(len(rows)), nearest] < np.iinfo(np.int64).max)
+        carried = (items == HELD) @ economy._item_calories
+        to_elf = (carried >= self._needed[rows]) | (~found & (carried > 0))
+        targets = np.where(to_elf, economy._elf, items[np.arange(len(rows)), nearest])
+        #games with nothing to fetch and nothing to deliver stay where they are
+        walking = (to_elf | found) & (targets != locations)
+        self.go(rows[walking], next_edges[route_rows[targets[walking]], locations[walking]])
+
+    def go(self, rows, edges) -> None:
+        """moves the given rows along the given edges, unless they carry too much
+
+        parameters:
+        ----------
+        rows:
+            the rows that go somewhere
+        edges:
+            the edge each row goes along
+        """
+        free = self._weights[rows] <= self._carry_limit
+        self._locations[rows[free]] = self._economy._targets[edges[free]]
+
+    def take(self, rows, item_ids) -> None:
+        """moves an item from each rows location into its inventory
+
+        parameters:
+        ----------
+        rows:
+            the rows that take something
+        item_ids:
+            the item each row takes
+        """
+        self._items[rows, item_ids] = HELD
+        self._weights[rows] += self._economy._item_weights[item_ids]
+
+    def give(self, rows, item_ids) -> None:
+        """drops an item from each rows inventory, feeding the elf if it is food
+        and the row is in the elfs location, and sending the row to a random
+        location if it is anything else
+
+        parameters:
+        ----------
+        rows:
+            the rows that give something
+        item_ids:
+            the item each row gives
+        """
+        economy = self._economy
+        locations = self._locations[rows]
+        self._weights[rows] -= economy._item_weights[item_ids]
+        calories = economy._item_calories[item_ids]
+        at_elf = locations == economy._elf
+        eaten = at_elf & (calories > 0)
+        self._needed[rows[eaten]] -= calories[eaten]
+        self._items[rows, item_ids] = np.where(eaten, GONE, locations)
+        lost = rows[at_elf & ~eaten]
+        self._locations[lost] = self._rng.integers(0, economy._location_count, len(lost))
+
+    def fight(self, rows, npc_ids) -> None:
+        """fights an npc in each rows location, slaying it with the Dark Elf
+        Sword or being sent to a random location without it
+
+        parameters:
+        ----------
+        rows:
+            the rows that fight
+        npc_ids:
+            the npc each row fights
+        """
+        sword = self._economy._sword
+        armed = self._items[rows, sword] == HELD if sword >= 0 else np.zeros(len(rows), dtype=bool)
+        self._npcs[rows[armed], npc_ids[armed]] = GONE
+        lost = rows[~armed]
+        self._locations[lost] = self._rng.integers(0, self._economy._location_count, len(lost))
+
+    def endings(self):
+        """returns how each game in the batch has ended
+
+        returns:
+        -------
+        endings:
+            an index into ENDINGS for each row
+        """
+        endings = np.zeros(len(self._ids), dtype=np.int8)
+        sword = self._economy._sword
+        if sword >= 0:
+            armed = (self._items[:, sword] == HELD) & (self._locations == self._economy._elf)
+            endings[armed] = 2
+        endings[self._needed <= 0] = 1
+        return endings
+
+    def keep(self, rows) -> None:
+        """drops every row except the given ones
+
+        parameters:
+        ----------
+        rows:
+            the rows to keep
+        """
+        for name in ('_ids', '_locations', '_weights', '_needed', '_items', '_npcs', '_commands'):
+            setattr(self, name, getattr(self, name)[rows])
+
+
+def nth(mask, n):
+    """returns the column of the nth true value in each row of mask
+
+    parameters:
+    ----------
+    mask:
+        a boolean array, games by items
+    n:
+        which true value to find in each row, counting from 0, or one number for every row
+
+    returns:
+    -------
+    columns:
+        the column of that value in each row
+    """
+    if not mask.size:
+        return np.zeros(len(mask), dtype=np.int64)
+    return (mask.cumsum(1) > np.reshape(n, (-1, 1))).argmax(1)
+
+
+def simulate(games, policy='random', epsilon=0.0, steps=500, seed=0, world=None,
+             batch_size=100000, calories=CALORIES_NEEDED, carry_limit=CARRY_LIMIT):
+    """plays games in batches and returns how each one ended
+
+    parameters:
+    ----------
+    games:
+        how many games to play
+    policy:
+        'random' or 'greedy'
+    epsilon:
+        the chance a greedy game runs a random command instead
+    steps:
+        the most commands a game may run
+    seed:
+        the seed for the whole run
+    world:
+        the WorldTemplate to play, the Lands Between if not given
+    batch_size:
+        how many games are played at a time, fewer if that many would hold more
+        than MAX_BATCH_CELLS items and npcs
+    calories:
+        how many calories the elf needs
+    carry_limit:
+        the most weight a player can carry and still go somewhere
+
+    returns:
+    -------
+    results:
+        (endings, commands), with the index into ENDINGS and the number of commands run for each game
+    """
+    economy = Economy(world)
+    columns = len(economy._item_start) + len(economy._npc_start)
+    batch_size = max(1, min(batch_size, MAX_BATCH_CELLS // max(columns, 1)))
+    rng = np.random.default_rng(seed)
+    endings = np.zeros(games, dtype=np.int8)
+    commands = np.zeros(games, dtype=np.int64)
+    for first in range(0, games, batch_size):
+        batch = Batch(economy, np.arange(first, min(first + batch_size, games)), rng,
+                      calories, carry_limit)
+        for _ in range(steps):
+            batch.step(policy, epsilon)
+            ended = batch.endings()
+            done = ended > 0
+            if done.any():
+                endings[batch._ids[done]] = ended[done]
+                commands[batch._ids[done]] = batch._commands[done]
+                batch.keep(np.nonzero(~done)[0])
+                if not len(batch):
+                    break
+        commands[batch._ids] = batch._commands
+    return endings, commands
+
+
+def report(endings, commands, bins=10) -> str:
+    """describes how the games ended and how many commands the won games took
+
+    parameters:
+    ----------
+    endings:
+        the index into ENDINGS of each game
+    commands:
+        the number of commands each game ran
+    bins:
+        how many bars the histogram of commands to win has
+
+    returns:
+    -------
+    str:
+        the report
+    """
+    lines = ['games=' + str(len(endings)) + '\t' +
+             '\t'.join(f'{name}={int((endings == number).sum())}' for number, name in enumerate(ENDINGS))]
+    for number, name in enumerate(ENDINGS[1:], 1):
+        won = commands[endings == number]
+        if not len(won):
+            continue
+        p5, p25, p50, p75, p95 = np.percentile(won, [5, 25, 50, 75, 95])
+        lines.append(f'commands to win ({name}): mean={won.mean():.1f}\tmin={won.min()}\tp5={p5:.0f}\t'
+                     f'p25={p25:.0f}\tmedian={p50:.0f}\tp75={p75:.0f}\tp95={p95:.0f}\tmax={won.max()}')
+    won = commands[endings > 0]
+    if len(won):
+        counts, edges = np.histogram(won, bins=bins)
+        widest = counts.max()
+        for count, low, high in zip(counts, edges, edges[1:]):
+            lines.append(f'{low:>8.0f} - {high:<8.0f}{count:>10}  ' + '#' * int(40 * count / widest))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate many GVZork games at once.')
+    parser.add_argument('--games', type=int, default=1000000)
+    parser.add_argument('--policy', choices=['random', 'greedy'], default='greedy')
+    parser.add_argument('--epsilon', type=float, default=0.0,
+                        help='chance a greedy game runs a random command instead')
+    parser.add_argument('--steps', type=int, default=500, help='most commands per game')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--world', help='a JSON or TOML world file')
+    parser.add_argument('--batch', type=int, default=100000, help='games played at a time')
+    parser.add_argument('--calories', type=float, default=CALORIES_NEEDED, help='calories the elf needs')
+    parser.add_argument('--carry-limit', type=float, default=CARRY_LIMIT)
+    parser.add_argument('--bins', type=int, default=10, help='bars in the histogram')
+    args = parser.parse_args()
+    world = None
+    if args.world:
+        from worldfile import load_world
+        world = load_world(args.world)
+    endings, commands = simulate(args.games, args.policy, args.epsilon, args.steps, args.seed, world,
+                                 args.batch, args.calories, args.carry_limit)
+    print(report(endings, commands, args.bins))
+
+
+if __name__ == "__main__":
+    main()
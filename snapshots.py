@@ -0,0 +1,85 @@
+"""
+Saves and loads many game snapshots at once, so a worker can write out every
+session before it restarts and pick them all back up afterwards.
+
+A snapshot file is a sequence of records. Each record is a little-endian
+header holding the lengths of the session id and the snapshot, followed by the
+utf-8 session id and the bytes from Game.snapshot.
+"""
+#used to pack record headers
+import struct
+import os
+from GVZork import Game
+
+RECORD_HEADER = struct.Struct('<HI')
+
+
+def save_snapshots(games: dict, path: str) -> int:
+    """writes the snapshot of every game to a file in one write. The file is
+    replaced only once it has been written completely.
+
+    parameters:
+    ----------
+    games: dict:
+        session id to game
+    path: str:
+        the file to write
+
+    returns:
+    -------
+    int:
+        the number of bytes written
+    """
+    parts = []
+    for session_id, game in games.items():
+        key = session_id.encode('utf-8')
+        data = game.snapshot()
+        parts.append(RECORD_HEADER.pack(len(key), len(data)))
+        parts.append(key)
+        parts.append(data)
+    blob = b''.join(parts)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(blob)
+    os.replace(temp_path, path)
+    return len(blob)
+
+
+def load_snapshots(path: str, world=None) -> dict:
+    """reads a file written by save_snapshots, raises a ValueError if the file
+    is damaged or a snapshot belongs to a different world
+
+    parameters:
+    ----------
+    path: str:
+        the file to read
+    world:
+        the WorldTemplate the games were played in, the Lands Between if not given
+
+    returns:
+    -------
+    games:
+        session id to restored game
+
+    error:
+    -----
+    ValueError:
+        the file or one of its snapshots is damaged
+    """
+    with open(path, 'rb') as file:
+        blob = file.read()
+    view = memoryview(blob)
+    games = {}
+    position = 0
+    while position < len(blob):
+        if position + RECORD_HEADER.size > len(blob):
+            raise ValueError('Snapshot file is damaged.')
+        key_length, data_length = RECORD_HEADER.unpack_from(blob, position)
+        position += RECORD_HEADER.size
+        end = position + key_length + data_length
+        if end > len(blob):
+            raise ValueError('Snapshot file is damaged.')
+        session_id = bytes(view[position:position + key_length]).decode('utf-8')
+        games[session_id] = Game.restore(bytes(view[position + key_length:end]), world)
+        position = end
+    return games
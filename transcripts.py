@@ -0,0 +1,172 @@
+"""
+Runs recorded command transcripts through Game.step at full speed: no
+prompt, no pauses and no color codes.
+
+A transcript file holds one command per line. A line of three dashes (---)
+ends one game and starts the next, and lines starting with # are comments.
+Blank lines are commands too, the same as pressing enter at the prompt.
+"""
+from GVZork import Game
+
+GAME_SEPARATOR = '---'
+
+
+class GameResult:
+    """Represents how one transcript played out.
+
+    Attributes
+    ----------
+    _name: str
+        where the transcript came from, such as 'route.txt:3'.
+    _commands: int
+        how many commands were run before the game ended or the transcript ran out.
+    _ending: str
+        'fed', 'sword' or 'quit' from Game.get_ending, or 'unfinished'.
+    _cals_needed: float
+        how many calories the elf still needed.
+    _location: str
+        the name of the location the player finished in.
+    """
+
+    def __init__(self, name, commands, ending, cals_needed, location):
+        """
+        parameters:
+        ----------
+        name:
+            where the transcript came from
+        commands:
+            how many commands were run
+        ending:
+            how the game ended
+        cals_needed:
+            calories the elf still needed
+        location:
+            where the player finished
+        """
+        self._name = name
+        self._commands = commands
+        self._ending = ending
+        self._cals_needed = cals_needed
+        self._location = location
+
+    def get_name(self):
+        """gets and returns where the transcript came from
+
+        returns:
+        -------
+        self._name:
+            an instance of _name
+        """
+        return self._name
+
+    def get_commands(self):
+        """gets and returns how many commands were run
+
+        returns:
+        -------
+        self._commands:
+            an instance of _commands
+        """
+        return self._commands
+
+    def get_ending(self):
+        """gets and returns how the game ended
+
+        returns:
+        -------
+        self._ending:
+            an instance of _ending
+        """
+        return self._ending
+
+    def __str__(self):
+        """returns a one line summary of the game
+
+        returns:
+        -------
+        str:
+            the name, ending, commands, calories needed and final location
+        """
+        return (f'{self._name}\t{self._ending}\tcommands={self._commands}\t'
+                f'cals_needed={self._cals_needed}\tlocation={self._location}')
+
+
+def read_transcripts(lines) -> list[list[str]]:
+    """splits the lines of a transcript file into games
+
+    parameters:
+    ----------
+    lines:
+        the lines of the file, with or without their line endings
+
+    returns:
+    -------
+    games:
+        one list of commands per game, games without commands are left out
+    """
+    games = []
+    commands = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line.strip() == GAME_SEPARATOR:
+            if commands:
+                games.append(commands)
+            commands = []
+        elif not line.startswith('#'):
+            commands.append(line)
+    if commands:
+        games.append(commands)
+    return games
+
+
+def echo_events(events, echo) -> None:
+    """passes the text of output events to echo, one line at a time
+
+    parameters:
+    ----------
+    events:
+        the events returned by Game.start or Game.step
+    echo:
+        called with every line of output
+    """
+    for event in events:
+        if event.get_kind() == 'text':
+            echo(event.get_text())
+
+
+# noinspection PyProtectedMember
+def run_transcript(commands, name='', world=None, echo=None) -> GameResult:
+    """plays one game from start to finish using the given commands. Commands
+    after the game ends are not run.
+
+    parameters:
+    ----------
+    commands:
+        the commands to run, in order
+    name:
+        where the transcript came from, used in the result
+    world:
+        the WorldTemplate to play in, the Lands Between if not given
+    echo:
+        if given, called with every line of output, without color codes
+
+    returns:
+    -------
+    result:
+        how the game played out
+    """
+    game = Game(world)
+    events = game.start()
+    count = 0
+    for command in commands:
+        if not game._game_progress:
+            break
+        if echo is not None:
+            echo_events(events, echo)
+            echo(f'> {command}')
+        events = game.step(command)
+        count += 1
+    if echo is not None:
+        echo_events(events, echo)
+    return GameResult(name, count, game.get_ending() or 'unfinished',
+                      game._cals_needed, game._current_location._name)
@@ -0,0 +1,261 @@
+"""
+Loads worlds from JSON or TOML files instead of Python statements. Files
+ending in .gvw are world stores, which are mapped instead (see worldstore.py).
+
+A world file lists its locations in order. Each location has a name, a
+description, the directions leading out of it (by location name), and the
+items and npcs that start there:
+
+    {"locations": [
+        {"name": "Limgrave", "description": "...",
+         "neighbors": {"north": "Liurnia"},
+         "items": [{"name": "Boiled Crab", "description": "...",
+                    "calories": 62.5, "weight": 4}],
+         "npcs": [{"name": "Merchant Kale", "description": "...",
+                   "messages": ["..."]}]},
+        ...]}
+
+Every npc needs at least one message, since talking to it says the next one.
+
+Parsing a large file is slow, so load_world also writes a compiled copy of
+it, a marshal blob named after the sha256 of the files contents. Later loads
+of the same contents read the blob and skip parsing entirely.
+"""
+#used to name compiled worlds after their contents
+import hashlib
+#used to read and write world files
+import json
+#used to store compiled worlds
+import marshal
+import os
+from GVZork import Item, NPC, Location, WorldTemplate
+
+#changes whenever the layout of a compiled world changes
+COMPILED_VERSION = 1
+COMPILED_SUFFIX = '.world'
+
+
+def parse_world(data: dict) -> tuple:
+    """turns the contents of a world file into a compiled world, a tuple of plain
+    lists that marshal can store. Every reference between locations is replaced by
+    the locations position in the file.
+
+    parameters:
+    ----------
+    data: dict:
+        the parsed JSON or TOML document
+
+    returns:
+    -------
+    compiled:
+        (locations, edges, items, npcs), where locations holds (name, description),
+        edges holds (location, direction, neighbor), items holds
+        (location, name, description, calories, weight) and npcs holds
+        (location, name, description, messages)
+
+    error:
+    -----
+    ValueError:
+        the world has no locations, a name is blank or used twice, or a npc
+        has nothing to say
+    KeyError:
+        a neighbor names a location that does not exist
+    """
+    entries = data.get('locations')
+    if not entries:
+        raise ValueError('A world must have at least one location.')
+    ids = {}
+    for entry in entries:
+        name = entry.get('name', '')
+        if name == '':
+            raise ValueError('Name cannot be blank.')
+        if name in ids:
+            raise ValueError(f'Location {name} is defined more than once.')
+        ids[name] = len(ids)
+
+    locations = []
+    edges = []
+    items = []
+    npcs = []
+    for loc_id, entry in enumerate(entries):
+        locations.append((entry['name'], entry.get('description', '')))
+        for direction, neighbor in entry.get('neighbors', {}).items():
+            if neighbor not in ids:
+                raise KeyError(f'{entry["name"]} leads {direction} to unknown location {neighbor}.')
+            edges.append((loc_id, direction, ids[neighbor]))
+        for item in entry.get('items', []):
+            items.append((loc_id, item['name'], item.get('description', ''),
+                          item.get('calories', 0), item.get('weight', 0)))
+        for npc in entry.get('npcs', []):
+            messages = list(npc.get('messages', []))
+            if not messages:
+                raise ValueError(f'Npc {npc["name"]} must have at least one message.')
+            npcs.append((loc_id, npc['name'], npc.get('description', ''), messages))
+    return locations, edges, items, npcs
+
+
+def build_world(compiled: tuple) -> WorldTemplate:
+    """creates the Locations, Items and NPCs of a compiled world, raises a
+    ValueError if some location cannot be reached from every other location
+
+    parameters:
+    ----------
+    compiled: tuple:
+        the return value of parse_world
+
+    returns:
+    -------
+    world:
+        the world template
+
+    error:
+    -----
+    ValueError:
+        some locations cannot be reached from every other location
+    """
+    locations, edges, items, npcs = compiled
+    world = WorldTemplate()
+    for name, description in locations:
+        world.add_location(Location(name, description))
+    location_list = world.get_locations()
+    for loc_id, direction, neighbor_id in edges:
+        location_list[loc_id].add_location(direction, location_list[neighbor_id])
+    for loc_id, name, description, calories, weight in items:
+        world.add_item(location_list[loc_id], Item(name, description, calories, weight))
+    for loc_id, name, description, messages in npcs:
+        npc = NPC(name, description)
+        npc.npc_message_list(messages)
+        world.add_npc(location_list[loc_id], npc)
+    world.get_graph().validate()
+    return world
+
+
+def read_document(path: str, raw: bytes) -> dict:
+    """parses the contents of a world file, as TOML if the file name ends
+    in .toml and as JSON otherwise
+
+    parameters:
+    ----------
+    path: str:
+        the name of the file
+    raw: bytes:
+        the contents of the file
+
+    returns:
+    -------
+    data:
+        the parsed document
+    """
+    if path.endswith('.toml'):
+        #tomllib is part of the standard library from python 3.11
+        import tomllib
+        return tomllib.loads(raw.decode('utf-8'))
+    return json.loads(raw)
+
+
+def load_world(path: str, cache_dir: str = None) -> WorldTemplate:
+    """loads a world file, using its compiled copy when there is one and
+    writing one when there is not
+
+    parameters:
+    ----------
+    path: str:
+        the world file
+    cache_dir: str = None:
+        where compiled worlds are kept, a __worldcache__ folder next to the
+        world file if not given
+
+    returns:
+    -------
+    world:
+        the world template, or a StoredWorld for a store file (see worldstore.py)
+    """
+    if path.endswith('.gvw'):
+        from worldstore import StoredWorld
+        return StoredWorld(path)
+    with open(path, 'rb') as file:
+        raw = file.read()
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), '__worldcache__')
+    cache_path = os.path.join(cache_dir, hashlib.sha256(raw).hexdigest() + COMPILED_SUFFIX)
+
+    compiled = read_compiled(cache_path)
+    if compiled is None:
+        compiled = parse_world(read_document(path, raw))
+        write_compiled(cache_path, compiled)
+    return build_world(compiled)
+
+
+def read_compiled(cache_path: str):
+    """reads a compiled world, returning None if it is missing, unreadable
+    or was written by a different version
+
+    parameters:
+    ----------
+    cache_path: str:
+        the compiled world file
+
+    returns:
+    -------
+    compiled:
+        the compiled world, or None
+    """
+    try:
+        with open(cache_path, 'rb') as file:
+            version, compiled = marshal.load(file)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != COMPILED_VERSION:
+        return None
+    return compiled
+
+
+def write_compiled(cache_path: str, compiled: tuple) -> None:
+    """writes a compiled world. Failing to write it only means the next load
+    parses the world file again, so errors are ignored.
+
+    parameters:
+    ----------
+    cache_path: str:
+        the compiled world file
+    compiled: tuple:
+        the return value of parse_world
+    """
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temp_path, 'wb') as file:
+            marshal.dump((COMPILED_VERSION, compiled), file)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass
+
+
+# noinspection PyProtectedMember
+def dump_world(world: WorldTemplate, path: str) -> None:
+    """writes a world template as a JSON world file, for example to turn the
+    built-in Lands Between into a file that can be edited
+
+    parameters:
+    ----------
+    world: WorldTemplate:
+        the world to write
+    path: str:
+        the file to write to
+    """
+    entries = [{'name': location._name,
+                'description': location._description,
+                'neighbors': {direction: neighbor._name
+                              for direction, neighbor in location._neighbors.items()},
+                'items': [{'name': item._name,
+                           'description': item._description,
+                           'calories': item._calories,
+                           'weight': item._weight}
+                          for item in location._item_list],
+                'npcs': [{'name': npc._name,
+                          'description': npc._description,
+                          'messages': npc._message_list}
+                         for npc in location._npc_list]}
+               for location in world.get_locations()]
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'locations': entries}, file, indent=2, ensure_ascii=False)
@@ -0,0 +1,265 @@
+"""
+Generates worlds of any size from a seed, in the same Location, Item and NPC
+model as create_world, for finding out how the game behaves as worlds grow.
+
+Every path in a generated world can be walked both ways. The locations are
+first joined by a random spanning tree, so every location can be reached from
+every other, and more paths are then added between random pairs of locations
+until the average number of directions out of a location reaches the branching
+factor. One location is the Mountaintops of the Giants, where the Elf waits,
+and there is always enough food somewhere to feed him. The same seed and knobs
+always give the same world.
+
+Usage:
+    python worldgen.py --locations N [--branching B] [--items-per-location D]
+                       [--npcs-per-location D] [--dialogue N] [--seed N] -o FILE
+"""
+#used to make every choice from the seed
+import random
+#used to read the command line options
+import argparse
+#used to share the generated descriptions and messages between objects
+import sys
+from GVZork import Item, NPC, Location, WorldTemplate
+
+ELF_LOCATION = 'Mountaintops of the Giants'
+CALORIES_NEEDED = 500
+#every direction and the one leading back
+OPPOSITES = {'north': 'south', 'south': 'north', 'east': 'west', 'west': 'east',
+             'northeast': 'southwest', 'southwest': 'northeast',
+             'northwest': 'southeast', 'southeast': 'northwest',
+             'up': 'down', 'down': 'up'}
+DIRECTIONS = tuple(OPPOSITES)
+
+PLACES = ('Vale', 'Marsh', 'Keep', 'Ruins', 'Hollow', 'Crossing', 'Plateau', 'Grotto',
+          'Woods', 'Shore', 'Bluff', 'Catacombs', 'Fort', 'Village', 'Cliffs', 'Basin')
+ADJECTIVES = ('Ashen', 'Gilded', 'Sunken', 'Weeping', 'Frozen', 'Scarlet', 'Silent',
+              'Forlorn', 'Misty', 'Hidden', 'Ancient', 'Shattered', 'Verdant', 'Grim')
+FOODS = ('Boiled Prawn', 'Boiled Crab', 'Cured Meat', 'Cooked Meat', 'Boiled Fish',
+         'Pickled Foot', 'Roast Boar', 'Honeyed Bread', 'Smoked Eel', 'Berry Tart')
+THINGS = ('Broken Sword', 'Damaged Armor', 'Oil Pot', 'Cracked Shield', 'Rusty Key',
+          'Torn Banner', 'Old Lantern', 'Bone Shard')
+NPCS = ('Merchant', 'Witch Hunter', 'Knight', 'Pilgrim', 'Hermit', 'Scholar', 'Warrior Jar')
+WORDS = ('tarnished', 'grace', 'rune', 'the', 'erdtree', 'you', 'land', 'seek', 'lost',
+         'festival', 'a', 'old', 'friend', 'is', 'and', 'of', 'sword', 'storm', 'journey')
+DESCRIPTIONS = tuple(sys.intern(f'A {adjective.lower()} {place.lower()}, '
+                                'far from any road.' + '\n')
+                     for adjective in ADJECTIVES for place in PLACES[:4])
+
+
+def generate_world(locations: int, branching: float = 2.5, items_per_location: float = 1.0,
+                   npcs_per_location: float = 0.2, dialogue: int = 3, seed=0) -> WorldTemplate:
+    """generates a world, raises a ValueError if the knobs cannot be met
+
+    parameters:
+    ----------
+    locations: int:
+        how many locations the world has, at least 2
+    branching: float:
+        the average number of directions out of a location, above 0 and up to
+        the number of directions there are. The spanning tree alone gives close
+        to 2, so anything below that adds no more paths
+    items_per_location: float:
+        the average number of items in a location
+    npcs_per_location: float:
+        the average number of npcs in a location, not counting the Elf
+    dialogue: int:
+        how many messages each npc has
+    seed:
+        where every random choice comes from
+
+    returns:
+    -------
+    world:
+        the world template
+
+    error:
+    -----
+    ValueError:
+        a knob is out of range
+    """
+    if locations < 2:
+        raise ValueError('A generated world needs at least 2 locations.')
+    if not 0 < branching <= len(DIRECTIONS):
+        raise ValueError(f'Branching must be above 0 and at most {len(DIRECTIONS)}.')
+    if dialogue < 1:
+        raise ValueError('Every npc needs at least one message.')
+    rng = random.Random(seed)
+    places = [Location(f'{rng.choice(ADJECTIVES)} {rng.choice(PLACES)} {number}', rng.choice(DESCRIPTIONS))
+              for number in range(locations - 1)]
+    elf_index = rng.randrange(locations)
+    places.insert(elf_index, Location(ELF_LOCATION, 'The fabled domain of the Giants, now in ruins.' + '\n'))
+    world = WorldTemplate()
+    for location in places:
+        world.add_location(location)
+
+    connect(places, branching, rng)
+    add_items(world, places, elf_index, items_per_location, rng)
+    add_npcs(world, places, elf_index, npcs_per_location, dialogue, rng)
+    world.get_graph().validate()
+    return world
+
+
+def connect(places: list, branching: float, rng: random.Random) -> None:
+    """joins the locations by a random spanning tree and then adds paths between
+    random pairs until the average number of directions reaches branching. Every
+    path leads both ways.
+
+    parameters:
+    ----------
+    places: list:
+        the locations
+    branching: float:
+        the average number of directions out of a location
+    rng: random.Random:
+        where the choices come from
+    """
+    count = len(places)
+    #the locations that still have a direction free, to hang the next location from
+    open_places = [0]
+    for number in range(1, count):
+        slot = rng.randrange(len(open_places))
+        parent = places[open_places[slot]]
+        link(parent, places[number], rng)
+        if len(parent._neighbors) == len(DIRECTIONS):
+            open_places[slot] = open_places[-1]
+            open_places.pop()
+        open_places.append(number)
+
+    extra = int(branching * count / 2) - (count - 1)
+    attempts = 0
+    while extra > 0 and attempts < 20 * extra + 100:
+        attempts += 1
+        first = places[rng.randrange(count)]
+        second = places[rng.randrange(count)]
+        if first is second or second in first._neighbors.values():
+            continue
+        if link(first, second, rng):
+            extra -= 1
+
+
+def link(first: Location, second: Location, rng: random.Random) -> bool:
+    """adds a path both ways between two locations, along a random direction
+    that is free in the first location and whose opposite is free in the second
+
+    parameters:
+    ----------
+    first: Location:
+        one end of the path
+    second: Location:
+        the other end
+    rng: random.Random:
+        where the choice comes from
+
+    returns:
+    -------
+    bool:
+        False if there was no such direction
+    """
+    free = [direction for direction in DIRECTIONS
+            if direction not in first._neighbors and OPPOSITES[direction] not in second._neighbors]
+    if not free:
+        return False
+    direction = rng.choice(free)
+    first.add_location(direction, second)
+    second.add_location(OPPOSITES[direction], first)
+    return True
+
+
+def add_items(world: WorldTemplate, places: list, elf_index: int,
+              items_per_location: float, rng: random.Random) -> None:
+    """scatters food and other things across every location but the elfs,
+    adding food until there is enough to feed the elf. The Dark Elf Sword is
+    always one of the things.
+
+    parameters:
+    ----------
+    world: WorldTemplate:
+        the world the items are added to
+    places: list:
+        the locations
+    elf_index: int:
+        the position of the elfs location in places
+    items_per_location: float:
+        the average number of items in a location
+    rng: random.Random:
+        where the choices come from
+    """
+    def anywhere():
+        number = rng.randrange(len(places) - 1)
+        return places[number + 1 if number >= elf_index else number]
+
+    world.add_item(anywhere(), Item('Dark Elf Sword', 'I wonder if there is another way to '
+                                                      'save the land...', calories=0, weight=30))
+    food = 0
+    for number in range(int(items_per_location * len(places))):
+        if rng.random() < 0.7:
+            calories = rng.choice((12.5, 25, 37.5, 50, 62.5, 75))
+            name = rng.choice(FOODS)
+            food += calories
+        else:
+            calories = 0
+            name = rng.choice(THINGS)
+        world.add_item(anywhere(), Item(f'{name} {number}', sys.intern(f'Just a {name.lower()}.'),
+                                        calories=calories, weight=rng.randint(1, 8)))
+    number = len(world.get_items())
+    while food < CALORIES_NEEDED:
+        world.add_item(anywhere(), Item(f'Boiled Prawn {number}', 'It looks a little green...',
+                                        calories=62.5, weight=4))
+        food += 62.5
+        number += 1
+
+
+def add_npcs(world: WorldTemplate, places: list, elf_index: int, npcs_per_location: float,
+             dialogue: int, rng: random.Random) -> None:
+    """puts the Elf in his location and scatters other npcs everywhere else.
+    The Elf always says his own three lines.
+
+    parameters:
+    ----------
+    world: WorldTemplate:
+        the world the npcs are added to
+    places: list:
+        the locations
+    elf_index: int:
+        the position of the elfs location in places
+    npcs_per_location: float:
+        the average number of npcs in a location
+    dialogue: int:
+        how many messages each npc has
+    rng: random.Random:
+        where the choices come from
+    """
+    elf = NPC('Elf', 'The proclaimed Elf Lord of the Mountains.')
+    elf.npc_message_list(['Mmmmmm...hungry...', 'Hmph....*stomach gurgles*', 'Feed...me...'])
+    world.add_npc(places[elf_index], elf)
+    #a small pool of messages shared by every npc keeps huge worlds small
+    pool = [sys.intern(' '.join([rng.choice(WORDS) for _ in range(rng.randint(4, 12))]).capitalize() + '.')
+            for _ in range(64)]
+    for number in range(int(npcs_per_location * len(places))):
+        location = rng.randrange(len(places) - 1)
+        location += location >= elf_index
+        npc = NPC(f'{rng.choice(NPCS)} {number}', sys.intern(f'A {rng.choice(ADJECTIVES).lower()} stranger.'))
+        npc.npc_message_list([rng.choice(pool) for _ in range(dialogue)])
+        world.add_npc(places[location], npc)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a GVZork world file.')
+    parser.add_argument('--locations', type=int, required=True)
+    parser.add_argument('--branching', type=float, default=2.5,
+                        help='average number of directions out of a location')
+    parser.add_argument('--items-per-location', type=float, default=1.0)
+    parser.add_argument('--npcs-per-location', type=float, default=0.2)
+    parser.add_argument('--dialogue', type=int, default=3, help='messages per npc')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', required=True, help='the JSON world file to write')
+    args = parser.parse_args()
+    world = generate_world(args.locations, args.branching, args.items_per_location,
+                           args.npcs_per_location, args.dialogue, args.seed)
+    from worldfile import dump_world
+    dump_world(world, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Compiles the neighbors of every location in a world into integer adjacency
+arrays and answers shortest path questions from precomputed tables.
+
+Locations are numbered by their _id. The edges leaving location i are
+_targets[_offsets[i]:_offsets[i + 1]], walked in the direction named by the
+same positions of _directions. For every target location the graph keeps a
+shortest path tree found by one breadth first search over the reversed edges:
+for each location, the edge to take next and how many moves are left. A route
+is then read off the tree one edge at a time, without searching.
+
+Small worlds build every tree up front. Larger worlds build a tree the first
+time a route to its target is asked for and keep the most recently used ones.
+"""
+#used to store the adjacency arrays and search trees compactly
+from array import array
+#used to keep the most recently used search trees
+from collections import OrderedDict, deque
+#used to guard the kept trees when routes are asked for from many threads
+import threading
+
+#worlds with up to this many locations build every tree when the graph is made
+ALL_PAIRS_LIMIT = 512
+#how many trees a larger world keeps
+TREE_CACHE_SIZE = 256
+#marks a location that cannot reach the target
+UNREACHABLE = -1
+
+
+# noinspection PyProtectedMember
+def compile_arrays(world) -> tuple:
+    """compiles the neighbors of every location in a world into adjacency arrays
+
+    parameters:
+    ----------
+    world:
+        the WorldTemplate to compile
+
+    returns:
+    -------
+    arrays:
+        (offsets, sources, targets, directions, reverse_offsets, reverse_edges),
+        as described for the attributes of WorldGraph
+    """
+    locations = world._Location_list
+    count = len(locations)
+    offsets = array('I', [0])
+    sources = array('I')
+    targets = array('I')
+    directions = []
+    for location in locations:
+        for direction, neighbor in location._neighbors.items():
+            sources.append(location._id)
+            targets.append(neighbor._id)
+            directions.append(direction)
+        offsets.append(len(targets))
+
+    #the edges entering each location, grouped by a counting sort on their target
+    reverse_offsets = array('I', bytes(4 * (count + 1)))
+    for target in targets:
+        reverse_offsets[target + 1] += 1
+    for loc_id in range(count):
+        reverse_offsets[loc_id + 1] += reverse_offsets[loc_id]
+    fill = array('I', reverse_offsets)
+    reverse_edges = array('I', bytes(4 * len(targets)))
+    for edge, target in enumerate(targets):
+        reverse_edges[fill[target]] = edge
+        fill[target] += 1
+    return offsets, sources, targets, directions, reverse_offsets, reverse_edges
+
+
+# noinspection PyProtectedMember
+class WorldGraph:
+    """Represents the directed graph of a worlds locations.
+
+    Attributes
+    ----------
+    _world: WorldTemplate
+        the world the graph was compiled from.
+    _offsets: array
+        where the edges of each location start in _targets, one more entry than locations.
+    _sources: array
+        the location id each edge leaves from.
+    _targets: array
+        the location id each edge leads to.
+    _directions: list
+        the direction each edge is walked in, such as 'north'.
+    _reverse_offsets: array
+        where the edges entering each location start in _reverse_edges.
+    _reverse_edges: array
+        the edge numbers entering each location.
+    _trees: OrderedDict
+        target location id to its (next edge, distance) arrays, most recently used last.
+    _tree_limit: int
+        how many trees are kept, every tree for small worlds.
+    _trees_lock: Lock
+        held while _trees is read or changed, as players of a SharedWorld may
+        ask for routes from many threads at once.
+    """
+
+    def __init__(self, world, arrays=None):
+        """
+        parameters:
+        ----------
+        world:
+            the WorldTemplate to compile
+        arrays:
+            the adjacency arrays of a graph compiled before, as (_offsets, _sources,
+            _targets, _directions, _reverse_offsets, _reverse_edges), which are used
+            instead of compiling the world. Any sequences that can be indexed and
+            sliced will do, such as the memoryviews of a StoredWorld.
+        """
+        self._world = world
+        if arrays is None:
+            arrays = compile_arrays(world)
+        (self._offsets, self._sources, self._targets, self._directions,
+         self._reverse_offsets, self._reverse_edges) = arrays
+        count = len(self._offsets) - 1
+
+        self._trees = OrderedDict()
+        self._trees_lock = threading.Lock()
+        if count <= ALL_PAIRS_LIMIT:
+            self._tree_limit = count
+            for loc_id in range(count):
+                self._trees[loc_id] = self._search(loc_id)
+        else:
+            self._tree_limit = TREE_CACHE_SIZE
+
+    def get_location_count(self) -> int:
+        """returns how many locations the graph has
+
+        returns:
+        -------
+        int:
+            the number of locations
+        """
+        return len(self._offsets) - 1
+
+    def get_edges(self, loc_id: int) -> list[tuple[str, int]]:
+        """returns the edges leaving a location
+
+        parameters:
+        ----------
+        loc_id: int:
+            the id of the location
+
+        returns:
+        -------
+        edges:
+            (direction, location id) pairs
+        """
+        start, end = self._offsets[loc_id], self._offsets[loc_id + 1]
+        return list(zip(self._directions[start:end], self._targets[start:end]))
+
+    def get_sources(self, loc_id: int) -> list[int]:
+        """returns the locations with an edge leading to a location
+
+        parameters:
+        ----------
+        loc_id: int:
+            the id of the location
+
+        returns:
+        -------
+        ids:
+            the ids of the locations, once for every edge
+        """
+        start, end = self._reverse_offsets[loc_id], self._reverse_offsets[loc_id + 1]
+        sources = self._sources
+        return [sources[edge] for edge in self._reverse_edges[start:end]]
+
+    def _search(self, target: int) -> tuple[array, array]:
+        """finds the shortest path from every location to a target with a breadth
+        first search over the reversed edges
+
+        parameters:
+        ----------
+        target: int:
+            the id of the location every path ends at
+
+        returns:
+        -------
+        tree:
+            the edge each location takes next and how many moves it is from the
+            target, UNREACHABLE for both where there is no path
+        """
+        count = len(self._offsets) - 1
+        next_edges = array('i', [UNREACHABLE]) * count
+        distances = array('i', [UNREACHABLE]) * count
+        distances[target] = 0
+        reverse_offsets = self._reverse_offsets
+        reverse_edges = self._reverse_edges
+        sources = self._sources
+        queue = deque([target])
+        while queue:
+            loc_id = queue.popleft()
+            distance = distances[loc_id] + 1
+            for edge in reverse_edges[reverse_offsets[loc_id]:reverse_offsets[loc_id + 1]]:
+                source = sources[edge]
+                if distances[source] == UNREACHABLE:
+                    distances[source] = distance
+                    next_edges[source] = edge
+                    queue.append(source)
+        return next_edges, distances
+
+    def get_tree(self, target: int) -> tuple[array, array]:
+        """returns the shortest path tree of a target, searching for it if it
+        is not kept already
+
+        parameters:
+        ----------
+        target: int:
+            the id of the location every path ends at
+
+        returns:
+        -------
+        tree:
+            the next edge and distance arrays from _search
+        """
+        trees = self._trees
+        with self._trees_lock:
+            tree = trees.get(target)
+            if tree is not None:
+                trees.move_to_end(target)
+                return tree
+        tree = self._search(target)
+        with self._trees_lock:
+            tree = trees.setdefault(target, tree)
+            if len(trees) > self._tree_limit:
+                trees.popitem(last=False)
+        return tree
+
+    def distance(self, source: int, target: int) -> int:
+        """returns the fewest moves from one location to another
+
+        parameters:
+        ----------
+        source: int:
+            the id of the starting location
+        target: int:
+            the id of the location to reach
+
+        returns:
+        -------
+        int:
+            the number of moves, UNREACHABLE if there is no path
+        """
+        return self.get_tree(target)[1][source]
+
+    def route(self, source: int, target: int):
+        """returns the directions to walk to get from one location to another
+
+        parameters:
+        ----------
+        source: int:
+            the id of the starting location
+        target: int:
+            the id of the location to reach
+
+        returns:
+        -------
+        directions:
+            the directions in order, empty if source is target, None if there is no path
+        """
+        next_edges, distances = self.get_tree(target)
+        if distances[source] == UNREACHABLE:
+            return None
+        targets = self._targets
+        directions = self._directions
+        route = []
+        while source != target:
+            edge = next_edges[source]
+            route.append(directions[edge])
+            source = targets[edge]
+        return route
+
+    def get_unreachable(self) -> list[int]:
+        """returns the locations that cannot be reached from every other
+        location, found by searching forwards and backwards from the first one
+
+        returns:
+        -------
+        ids:
+            the ids of those locations, in order
+        """
+        count = len(self._offsets) - 1
+        if count == 0:
+            return []
+        distances = self.get_tree(0)[1]
+        reached = bytearray(count)
+        reached[0] = 1
+        queue = deque([0])
+        targets = self._targets
+        offsets = self._offsets
+        while queue:
+            loc_id = queue.popleft()
+            for neighbor in targets[offsets[loc_id]:offsets[loc_id + 1]]:
+                if not reached[neighbor]:
+                    reached[neighbor] = 1
+                    queue.append(neighbor)
+        return [loc_id for loc_id in range(count)
+                if not reached[loc_id] or distances[loc_id] == UNREACHABLE]
+
+    def validate(self) -> None:
+        """raises a ValueError unless every location can be reached from every
+        other location. The game starts in a random location, so a location that
+        cannot be reached, or cannot be left, could leave the player stuck.
+
+        error:
+        -----
+        ValueError:
+            some locations cannot be reached from every other location
+        """
+        unreachable = self.get_unreachable()
+        if unreachable:
+            names = ', '.join(self._world._Location_list[loc_id]._name
+                              for loc_id in unreachable[:5])
+            more = f' and {len(unreachable) - 5} more' if len(unreachable) > 5 else ''
+            raise ValueError(f'Not every location can be reached from every other: {names}{more}.')
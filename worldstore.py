@@ -0,0 +1,1193 @@
+"""
+Packs a world into one flat, read-only binary file that every process on a
+host can mmap and share, instead of each building its own copy.
+
+Every string of the world is stored once, in a string table. Locations, items
+and npcs are columns of fixed size numbers indexed by id, such as the string
+number of every locations name, and what belongs to each location (its edges,
+items and npcs) is stored the way WorldGraph stores edges, as one array of
+offsets into one array of ids. The edges are stored already compiled, so the
+WorldGraph of a stored world reads them straight from the file. Looking things
+up by name goes through open addressing hash tables in the file as well.
+
+A StoredWorld reads the file through memoryviews, without copying it, and hands
+out small view objects (LocationView, ItemView and NPCView) that read their
+fields from the file when asked. They have the same attributes and getters as
+Location, Item and NPC, so a Game plays in a StoredWorld the same way as in the
+WorldTemplate it was packed from, and snapshots of one restore in the other.
+The pages of the file are shared by every process that maps it, so a world
+costs its size in RAM once per host, whatever the number of workers.
+
+Usage:
+    python worldstore.py --world FILE -o STORE
+    python worldstore.py --locations N [--seed N] -o STORE
+"""
+#used to pack the header and columns
+import struct
+#used to hash names the same way in every process
+import zlib
+#used to map the file into memory
+import mmap
+import os
+import sys
+#used to read the command line options
+import argparse
+from array import array
+#used to keep the most recently read strings decoded
+from functools import lru_cache
+
+STORE_MAGIC = b'GVZw'
+STORE_VERSION = 1
+STORE_SUFFIX = '.gvw'
+#header: magic, version and the number of sections, followed by each sections
+#offset and number of values
+STORE_HEADER = struct.Struct('<4sII')
+SECTION = struct.Struct('<QQ')
+#the sections of a store in order, with the typecode of their values
+SECTIONS = (('string_offsets', 'Q'), ('strings', 'B'),
+            ('location_names', 'I'), ('location_descriptions', 'I'),
+            ('edge_offsets', 'I'), ('edge_sources', 'I'), ('edge_targets', 'I'),
+            ('edge_directions', 'I'), ('reverse_offsets', 'I'), ('reverse_edges', 'I'),
+            ('item_offsets', 'I'), ('location_items', 'I'),
+            ('npc_offsets', 'I'), ('location_npcs', 'I'),
+            ('item_names', 'I'), ('item_descriptions', 'I'), ('item_calories', 'd'),
+            ('item_weights', 'd'), ('item_flags', 'B'), ('item_owners', 'i'),
+            ('npc_names', 'I'), ('npc_descriptions', 'I'), ('npc_message_numbers', 'I'),
+            ('message_offsets', 'I'), ('messages', 'I'),
+            ('location_table', 'I'), ('item_group_table', 'I'),
+            ('item_group_offsets', 'I'), ('item_groups', 'I'),
+            ('folded_items', 'I'), ('folded_npcs', 'I'), ('folded_locations', 'I'),
+            ('folded_directions', 'I'))
+#item_flags bits, set when a number was an int rather than a float
+INT_CALORIES = 1
+INT_WEIGHT = 2
+#how many decoded strings each process keeps
+STRING_CACHE_SIZE = 4096
+
+
+class StringTable:
+    """Collects the strings of a world being packed, storing each one once.
+
+    Attributes
+    ----------
+    _numbers: dict
+        string to its number.
+    _offsets: array
+        where each string starts in _blob, one more entry than strings.
+    _blob: bytearray
+        the utf-8 bytes of every string, one after another.
+    """
+
+    def __init__(self):
+        self._numbers = {}
+        self._offsets = array('Q', [0])
+        self._blob = bytearray()
+
+    def add(self, text: str) -> int:
+        """adds a string, if it is not there already
+
+        parameters:
+        ----------
+        text: str:
+            the string
+
+        returns:
+        -------
+        int:
+            the number of the string
+        """
+        number = self._numbers.get(text)
+        if number is None:
+            number = self._numbers[text] = len(self._numbers)
+            self._blob += text.encode('utf-8')
+            self._offsets.append(len(self._blob))
+        return number
+
+
+def build_table(entries, strings: StringTable) -> array:
+    """builds an open addressing hash table from string keys to numbers, with
+    at least twice as many slots as keys. Each slot is the number of its key plus
+    one, 0 for an empty slot, followed by the value.
+
+    parameters:
+    ----------
+    entries:
+        (key, value) pairs, every key different
+    strings: StringTable:
+        where the keys are stored
+
+    returns:
+    -------
+    table:
+        the slots
+    """
+    entries = list(entries)
+    size = 8
+    while size < 2 * len(entries):
+        size *= 2
+    table = array('I', bytes(8 * size))
+    for key, value in entries:
+        slot = zlib.crc32(key.encode('utf-8')) & (size - 1)
+        while table[2 * slot]:
+            slot = (slot + 1) & (size - 1)
+        table[2 * slot] = strings.add(key) + 1
+        table[2 * slot + 1] = value
+    return table
+
+
+def number_flag(value, flag: int) -> int:
+    """returns flag if a number is an int, so it can be given back as one
+
+    parameters:
+    ----------
+    value:
+        the number
+    flag: int:
+        the bit to return
+
+    returns:
+    -------
+    int:
+        flag or 0
+    """
+    return flag if isinstance(value, int) else 0
+
+
+# noinspection PyProtectedMember
+def pack_world(world, path: str) -> int:
+    """writes a world to a store file. The file is replaced only once it has
+    been written completely.
+
+    parameters:
+    ----------
+    world:
+        the WorldTemplate to pack
+    path: str:
+        the file to write
+
+    returns:
+    -------
+    int:
+        the size of the file in bytes
+    """
+    strings = StringTable()
+    locations = world._Location_list
+    items = world._Item_list
+    npcs = world._NPC_list
+    columns = {'location_names': array('I', [strings.add(location._name) for location in locations]),
+               'location_descriptions': array('I', [strings.add(location._description)
+                                                    for location in locations]),
+               'item_names': array('I', [strings.add(item._name) for item in items]),
+               'item_descriptions': array('I', [strings.add(item._description) for item in items]),
+               'item_calories': array('d', [item._calories for item in items]),
+               'item_weights': array('d', [item._weight for item in items]),
+               'item_flags': array('B', [number_flag(item._calories, INT_CALORIES)
+                                         | number_flag(item._weight, INT_WEIGHT) for item in items]),
+               'item_owners': array('i', world.get_item_owners()),
+               'npc_names': array('I', [strings.add(npc._name) for npc in npcs]),
+               'npc_descriptions': array('I', [strings.add(npc._description) for npc in npcs]),
+               'npc_message_numbers': array('I', [npc._message_number for npc in npcs])}
+
+    from worldgraph import compile_arrays
+    offsets, sources, targets, directions, reverse_offsets, reverse_edges = compile_arrays(world)
+    columns.update(edge_offsets=offsets, edge_sources=sources, edge_targets=targets,
+                   edge_directions=array('I', [strings.add(direction) for direction in directions]),
+                   reverse_offsets=reverse_offsets, reverse_edges=reverse_edges)
+
+    for name, member in (('item', '_item_list'), ('npc', '_npc_list')):
+        member_offsets = array('I', [0])
+        ids = array('I')
+        for location in locations:
+            ids.extend([obj._id for obj in getattr(location, member)])
+            member_offsets.append(len(ids))
+        columns[f'{name}_offsets'] = member_offsets
+        columns[f'location_{name}s'] = ids
+    message_offsets = array('I', [0])
+    messages = array('I')
+    for npc in npcs:
+        messages.extend([strings.add(message) for message in npc._message_list])
+        message_offsets.append(len(messages))
+    columns['message_offsets'] = message_offsets
+    columns['messages'] = messages
+
+    first_locations = {}
+    for location in locations:
+        first_locations.setdefault(location._name, location._id)
+    columns['location_table'] = build_table(first_locations.items(), strings)
+    groups = {}
+    for item in items:
+        groups.setdefault(item._name, []).append(item._id)
+    columns['item_group_table'] = build_table(((name, number) for number, name in enumerate(groups)),
+                                              strings)
+    group_offsets = array('I', [0])
+    grouped = array('I')
+    for ids in groups.values():
+        grouped.extend(ids)
+        group_offsets.append(len(grouped))
+    columns['item_group_offsets'] = group_offsets
+    columns['item_groups'] = grouped
+    for kind, folded in world.get_name_maps().items():
+        columns[f'folded_{kind}'] = build_table(((key, strings.add(name)) for key, name in folded.items()),
+                                                strings)
+
+    columns['string_offsets'] = strings._offsets
+    columns['strings'] = array('B', strings._blob)
+    if sys.byteorder == 'big':
+        for column in columns.values():
+            column.byteswap()
+
+    position = STORE_HEADER.size + SECTION.size * len(SECTIONS)
+    table = []
+    for name, typecode in SECTIONS:
+        position = (position + 7) & ~7
+        table.append(SECTION.pack(position, len(columns[name])))
+        position += len(columns[name]) * columns[name].itemsize
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(STORE_HEADER.pack(STORE_MAGIC, STORE_VERSION, len(SECTIONS)))
+        file.write(b''.join(table))
+        for name, typecode in SECTIONS:
+            file.write(bytes(-file.tell() & 7))
+            file.write(columns[name].tobytes())
+        size = file.tell()
+    os.replace(temp_path, path)
+    return size
+
+
+class View:
+    """Represents one location, item or npc of a StoredWorld. Two views are
+    equal when they stand for the same thing, so views made at different times
+    can be compared and used as dictionary keys. A view holds only its store and
+    id; everything else is read from the store when it is asked for.
+
+    Attributes
+    ----------
+    _store: StoredWorld
+        the world the view reads from.
+    _id: int
+        the position of what the view stands for in its world.
+    """
+
+    __slots__ = ('_store', '_id')
+
+    def __init__(self, store, number: int):
+        """
+        parameters:
+        ----------
+        store:
+            the StoredWorld to read from
+        number: int:
+            the id of the location, item or npc
+        """
+        self._store = store
+        self._id = number
+
+    def __eq__(self, other):
+        """checks if another view stands for the same thing in the same world
+
+        parameters:
+        ----------
+        other:
+            the object to compare with
+
+        returns:
+        -------
+        bool:
+            True if other is a view of the same class, store and id
+        """
+        return type(other) is type(self) and other._id == self._id and other._store is self._store
+
+    def __hash__(self):
+        """returns the hash of the view, the same for every view of the same thing
+
+        returns:
+        -------
+        int:
+            the hash of _id
+        """
+        return hash(self._id)
+
+
+# noinspection PyProtectedMember
+class ItemView(View):
+    """Represents an item of a StoredWorld, with the attributes and getters of
+    Item. The attributes are properties reading the store, so the same view
+    always gives the same values.
+
+    Attributes
+    ----------
+    _name: str
+        the items name.
+    _description: str
+        the items description.
+    _calories: int
+        the items calories, a float if it was packed as one.
+    _weight: int
+        the items weight, a float if it was packed as one.
+    """
+
+    __slots__ = ()
+
+    @property
+    def _name(self):
+        """reads and returns the items name
+
+        returns:
+        -------
+        str:
+            the name, from the stores string table
+        """
+        return self._store._string(self._store._item_names[self._id])
+
+    @property
+    def _description(self):
+        """reads and returns the items description
+
+        returns:
+        -------
+        str:
+            the description, from the stores string table
+        """
+        return self._store._string(self._store._item_descriptions[self._id])
+
+    @property
+    def _calories(self):
+        """reads and returns the items calories
+
+        returns:
+        -------
+        calories:
+            an int if the item was made with an int, otherwise a float
+        """
+        calories = self._store._item_calories[self._id]
+        return int(calories) if self._store._item_flags[self._id] & INT_CALORIES else calories
+
+    @property
+    def _weight(self):
+        """reads and returns the items weight
+
+        returns:
+        -------
+        weight:
+            an int if the item was made with an int, otherwise a float
+        """
+        weight = self._store._item_weights[self._id]
+        return int(weight) if self._store._item_flags[self._id] & INT_WEIGHT else weight
+
+    def get_name(self):
+        """gets and returns the items name
+
+        returns:
+        -------
+        self._name:
+            an instance of _name
+        """
+        return self._name
+
+    def get_description(self):
+        """gets and returns the items description
+
+        returns:
+        -------
+        self._description:
+            an instance of _description
+        """
+        return self._description
+
+    def get_calories(self):
+        """gets and returns the items calories
+
+        returns:
+        -------
+        self._calories:
+            an instance of _calories
+        """
+        return self._calories
+
+    def get_weight(self):
+        """gets and returns the items weight
+
+        returns:
+        -------
+        self._weight:
+            an instance of _weight
+        """
+        return self._weight
+
+    def __str__(self):
+        """returns a string defining the item
+
+        returns:
+        -------
+        str:
+            the items name, weight, calories and description
+        """
+        return f"{self._name} - {self._weight} lb - {self._calories} - {self._description}"
+
+
+# noinspection PyProtectedMember
+class NPCView(View):
+    """Represents a npc of a StoredWorld, with the attributes and getters of NPC.
+    What a npc says next is kept by each games WorldState, never in the npc.
+
+    Attributes
+    ----------
+    _name: str
+        the npcs name.
+    _description: str
+        the npcs description.
+    _message_number: int
+        the message the npc starts on.
+    _message_list: tuple
+        everything the npc says, in order.
+    """
+
+    __slots__ = ()
+
+    @property
+    def _name(self):
+        """reads and returns the npcs name
+
+        returns:
+        -------
+        str:
+            the name, from the stores string table
+        """
+        return self._store._string(self._store._npc_names[self._id])
+
+    @property
+    def _description(self):
+        """reads and returns the npcs description
+
+        returns:
+        -------
+        str:
+            the description, from the stores string table
+        """
+        return self._store._string(self._store._npc_descriptions[self._id])
+
+    @property
+    def _message_number(self):
+        """reads and returns the message the npc starts on
+
+        returns:
+        -------
+        int:
+            the position in _message_list
+        """
+        return self._store._npc_message_numbers[self._id]
+
+    @property
+    def _message_list(self):
+        """reads and returns everything the npc says
+
+        returns:
+        -------
+        tuple:
+            the messages, in order
+        """
+        store = self._store
+        start, end = store._message_offsets[self._id], store._message_offsets[self._id + 1]
+        return tuple(store._string(number) for number in store._messages[start:end])
+
+    def get_name(self):
+        """gets and returns the npcs name
+
+        returns:
+        -------
+        self._name:
+            an instance of _name
+        """
+        return self._name
+
+    def get_description(self):
+        """gets and returns the npcs description
+
+        returns:
+        -------
+        self._description:
+            an instance of _description
+        """
+        return self._description
+
+    def get_message_list(self):
+        """gets and returns the npcs message list
+
+        returns:
+        -------
+        self._message_list:
+            an instance of _message_list
+        """
+        return self._message_list
+
+    def __str__(self):
+        """returns a str stating the npcs name
+
+        returns:
+        -------
+        self._name
+            an instance of _name
+        """
+        return self._name
+
+
+# noinspection PyProtectedMember
+class LocationView(View):
+    """Represents a location of a StoredWorld, with the attributes and getters of
+    Location. Its neighbors, items and npcs are read from the file every time.
+
+    Attributes
+    ----------
+    _name: str
+        the locations name.
+    _description: str
+        the locations description.
+    _neighbors: dict
+        direction to the LocationView it leads to.
+    _item_list: tuple
+        the ItemViews the location starts with.
+    _item_index: dict
+        item name to the first ItemView with that name in _item_list.
+    _npc_list: tuple
+        the NPCViews the location starts with.
+    _npc_index: dict
+        npc name to the first NPCView with that name in _npc_list.
+    """
+
+    __slots__ = ()
+
+    @property
+    def _name(self):
+        """reads and returns the locations name
+
+        returns:
+        -------
+        str:
+            the name, from the stores string table
+        """
+        return self._store._string(self._store._location_names[self._id])
+
+    @property
+    def _description(self):
+        """reads and returns the locations description
+
+        returns:
+        -------
+        str:
+            the description, from the stores string table
+        """
+        return self._store._string(self._store._location_descriptions[self._id])
+
+    @property
+    def _neighbors(self):
+        """reads and returns where the location leads
+
+        returns:
+        -------
+        neighbors:
+            a new dictionary of direction to LocationView
+        """
+        store = self._store
+        start, end = store._edge_offsets[self._id], store._edge_offsets[self._id + 1]
+        return {store._string(direction): LocationView(store, target)
+                for direction, target in zip(store._edge_directions[start:end],
+                                             store._edge_targets[start:end])}
+
+    @property
+    def _item_list(self):
+        """reads and returns the items the location starts with
+
+        returns:
+        -------
+        items:
+            a tuple of ItemViews, in the order they were added
+        """
+        store = self._store
+        start, end = store._item_offsets[self._id], store._item_offsets[self._id + 1]
+        return tuple([ItemView(store, number) for number in store._location_items[start:end]])
+
+    @property
+    def _item_index(self):
+        """builds and returns the name index of the locations items
+
+        returns:
+        -------
+        index:
+            a new dictionary of item name to the first ItemView with that name
+        """
+        index = {}
+        for item in self._item_list:
+            index.setdefault(item._name, item)
+        return index
+
+    @property
+    def _npc_list(self):
+        """reads and returns the npcs the location starts with
+
+        returns:
+        -------
+        npcs:
+            a tuple of NPCViews, in the order they were added
+        """
+        store = self._store
+        start, end = store._npc_offsets[self._id], store._npc_offsets[self._id + 1]
+        return tuple([NPCView(store, number) for number in store._location_npcs[start:end]])
+
+    @property
+    def _npc_index(self):
+        """builds and returns the name index of the locations npcs
+
+        returns:
+        -------
+        index:
+            a new dictionary of npc name to the first NPCView with that name
+        """
+        index = {}
+        for npc in self._npc_list:
+            index.setdefault(npc._name, npc)
+        return index
+
+    def get_name(self):
+        """gets and returns the locations name
+
+        returns:
+        -------
+        self._name:
+            an instance of _name
+        """
+        return self._name
+
+    def get_description(self):
+        """gets and returns the locations description
+
+        returns:
+        -------
+        self._description:
+            an instance of _description
+        """
+        return self._description
+
+    def get_locations(self):
+        """gets and returns the locations neighbors
+
+        returns:
+        -------
+        self._neighbors:
+            direction to location
+        """
+        return self._neighbors
+
+    def get_items(self):
+        """returns the items the location starts with
+
+        returns:
+        -------
+        self._item_list:
+            the locations items
+        """
+        return self._item_list
+
+    def get_item(self, name: str):
+        """returns the item with the given name, or None if there is no such item here
+
+        parameters:
+        ----------
+        name: str:
+            the name of the item
+
+        returns:
+        -------
+        item:
+            the ItemView, or None
+        """
+        return self._item_index.get(name)
+
+    def get_npcs(self):
+        """returns the npcs the location starts with
+
+        returns:
+        -------
+        self._npc_list:
+            the locations npcs
+        """
+        return self._npc_list
+
+    def get_npc(self, name: str):
+        """returns the npc with the given name, or None if there is no such npc here
+
+        parameters:
+        ----------
+        name: str:
+            the name of the npc
+
+        returns:
+        -------
+        npc:
+            the NPCView, or None
+        """
+        return self._npc_index.get(name)
+
+    def __str__(self):
+        """returns a str describing a location
+
+        returns:
+        -------
+        str:
+            a locations name, and description
+        """
+        return f"{self._name} - {self._description}"
+
+
+class ViewList:
+    """Represents every location, item or npc of a StoredWorld as a read-only
+    list of views, made as they are asked for.
+
+    Attributes
+    ----------
+    _store: StoredWorld
+        the world the views read from.
+    _view: type
+        LocationView, ItemView or NPCView.
+    _count: int
+        how many there are.
+    """
+
+    def __init__(self, store, view: type, count: int):
+        """
+        parameters:
+        ----------
+        store:
+            the StoredWorld the views read from
+        view: type:
+            the class of the views
+        count: int:
+            how many there are
+        """
+        self._store = store
+        self._view = view
+        self._count = count
+
+    def __len__(self):
+        """returns how many views the list holds
+
+        returns:
+        -------
+        self._count:
+            an instance of _count
+        """
+        return self._count
+
+    def __getitem__(self, number):
+        """makes the view at a position, or a list of views for a slice. Negative
+        positions count from the end, as for a list.
+
+        parameters:
+        ----------
+        number:
+            the position, or a slice of positions
+
+        returns:
+        -------
+        view:
+            a new view, or a list of new views for a slice
+
+        error:
+        -----
+        IndexError:
+            the position is out of range
+        """
+        if isinstance(number, slice):
+            return [self._view(self._store, position) for position in range(*number.indices(self._count))]
+        if number < 0:
+            number += self._count
+        if not 0 <= number < self._count:
+            raise IndexError('View list index out of range.')
+        return self._view(self._store, number)
+
+    def __iter__(self):
+        """iterates over a new view of every location, item or npc, in id order
+
+        returns:
+        -------
+        iterator:
+            the views
+        """
+        store = self._store
+        view = self._view
+        return (view(store, number) for number in range(self._count))
+
+
+class StringColumn:
+    """Represents a column of string numbers as a read-only list of the strings,
+    such as the direction of every edge.
+
+    Attributes
+    ----------
+    _store: StoredWorld
+        the world the strings are stored in.
+    _numbers: memoryview
+        the string numbers.
+    """
+
+    def __init__(self, store, numbers):
+        """
+        parameters:
+        ----------
+        store:
+            the StoredWorld the strings are stored in
+        numbers:
+            the string numbers
+        """
+        self._store = store
+        self._numbers = numbers
+
+    def __len__(self):
+        """returns how many strings the column holds
+
+        returns:
+        -------
+        int:
+            the number of string numbers
+        """
+        return len(self._numbers)
+
+    def __getitem__(self, number):
+        """returns the string at a position, or a list of them for a slice
+
+        parameters:
+        ----------
+        number:
+            the position, or a slice of positions
+
+        returns:
+        -------
+        string:
+            the string, or a list of strings for a slice
+        """
+        if isinstance(number, slice):
+            return [self._store._string(string) for string in self._numbers[number]]
+        return self._store._string(self._numbers[number])
+
+
+class NameTable:
+    """Represents one of the hash tables of a StoredWorld as a read-only mapping
+    from names to numbers, or to names when translate is set.
+
+    Attributes
+    ----------
+    _store: StoredWorld
+        the world the table is stored in.
+    _slots: memoryview
+        the slots, as written by build_table.
+    _translate: bool
+        whether the values are string numbers, given back as their strings.
+    """
+
+    def __init__(self, store, slots, translate: bool = False):
+        """
+        parameters:
+        ----------
+        store:
+            the StoredWorld the table is stored in
+        slots:
+            the slots of the table
+        translate: bool = False:
+            give back the values as the strings they are the numbers of
+        """
+        self._store = store
+        self._slots = slots
+        self._translate = translate
+
+    def get(self, key: str, default=None):
+        """returns the value of a key, or default if the key is not in the table
+
+        parameters:
+        ----------
+        key: str:
+            the key
+        default:
+            returned when the key is missing
+
+        returns:
+        -------
+        value:
+            the value or default
+        """
+        store = self._store
+        slots = self._slots
+        raw = key.encode('utf-8')
+        mask = len(slots) // 2 - 1
+        slot = zlib.crc32(raw) & mask
+        while True:
+            number = slots[2 * slot]
+            if not number:
+                return default
+            if store._string_bytes(number - 1) == raw:
+                value = slots[2 * slot + 1]
+                return store._string(value) if self._translate else value
+            slot = (slot + 1) & mask
+
+    def items(self) -> list[tuple]:
+        """returns every key and value in the table, in no particular order
+
+        returns:
+        -------
+        items:
+            (key, value) pairs
+        """
+        store = self._store
+        slots = self._slots
+        return [(store._string(slots[slot] - 1),
+                 store._string(slots[slot + 1]) if self._translate else slots[slot + 1])
+                for slot in range(0, len(slots), 2) if slots[slot]]
+
+
+# noinspection PyProtectedMember
+class StoredWorld:
+    """Represents a world read from a store file, with the getters of
+    WorldTemplate. It cannot be changed.
+
+    Attributes
+    ----------
+    _path: str
+        the store file.
+    _map: mmap.mmap
+        the file mapped into memory, read only.
+    _Location_list: ViewList
+        every location in the world.
+    _Item_list: ViewList
+        every item in the world.
+    _NPC_list: ViewList
+        every npc in the world.
+    _graph: WorldGraph
+        the graph of the locations, made from the stored edges by get_graph.
+    _parser: CommandParser
+        parses the input of every game in the world, built by get_parser.
+    _string: functools._lru_cache_wrapper
+        _read_string, keeping the STRING_CACHE_SIZE most recently used strings.
+
+    Every section of the file is also an attribute, named after the section
+    with a _ in front, holding a memoryview of its values.
+    """
+
+    def __init__(self, path: str):
+        """maps a store file, raises a ValueError if it is not one
+
+        parameters:
+        ----------
+        path: str:
+            the file written by pack_world
+
+        error:
+        -----
+        ValueError:
+            the file is not a store, was written by another version or is damaged
+        """
+        if sys.byteorder == 'big':
+            raise ValueError('World stores can only be read on little-endian machines.')
+        self._path = path
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        try:
+            magic, version, count = STORE_HEADER.unpack_from(view)
+        except struct.error:
+            raise ValueError('World store is too short.')
+        if magic != STORE_MAGIC or version != STORE_VERSION or count != len(SECTIONS):
+            raise ValueError('Not a world store, or a world store from another version.')
+        for number, (name, typecode) in enumerate(SECTIONS):
+            offset, length = SECTION.unpack_from(view, STORE_HEADER.size + SECTION.size * number)
+            end = offset + length * struct.calcsize(typecode)
+            if end > len(view):
+                raise ValueError('World store is damaged.')
+            setattr(self, '_' + name, view[offset:end].cast(typecode))
+        self._Location_list = ViewList(self, LocationView, len(self._location_names))
+        self._Item_list = ViewList(self, ItemView, len(self._item_names))
+        self._NPC_list = ViewList(self, NPCView, len(self._npc_names))
+        self._graph = None
+        self._parser = None
+        self._string = lru_cache(maxsize=STRING_CACHE_SIZE)(self._read_string)
+
+    def _read_string(self, number: int) -> str:
+        """returns a string of the string table. Use _string, which keeps the
+        most recently used strings decoded.
+
+        parameters:
+        ----------
+        number: int:
+            the number of the string
+
+        returns:
+        -------
+        str:
+            the string
+        """
+        offsets = self._string_offsets
+        return str(self._strings[offsets[number]:offsets[number + 1]], 'utf-8')
+
+    def _string_bytes(self, number: int) -> memoryview:
+        """returns the utf-8 bytes of a string of the string table, without copying them
+
+        parameters:
+        ----------
+        number: int:
+            the number of the string
+
+        returns:
+        -------
+        memoryview:
+            the bytes
+        """
+        offsets = self._string_offsets
+        return self._strings[offsets[number]:offsets[number + 1]]
+
+    def get_locations(self) -> ViewList:
+        """returns every location in the world
+
+        returns:
+        -------
+        self._Location_list:
+            an instance of _Location_list
+        """
+        return self._Location_list
+
+    def get_location(self, name: str):
+        """returns the location with the given name, or None if there is no such location
+
+        parameters:
+        ----------
+        name: str:
+            the name of the location
+
+        returns:
+        -------
+        location:
+            the LocationView, or None
+        """
+        number = NameTable(self, self._location_table).get(name)
+        return None if number is None else LocationView(self, number)
+
+    def get_graph(self):
+        """returns the graph of the worlds locations, made from the stored
+        edges the first time it is needed
+
+        returns:
+        -------
+        self._graph:
+            the WorldGraph of this world
+        """
+        if self._graph is None:
+            from worldgraph import WorldGraph
+            self._graph = WorldGraph(self, (self._edge_offsets, self._edge_sources, self._edge_targets,
+                                            StringColumn(self, self._edge_directions),
+                                            self._reverse_offsets, self._reverse_edges))
+        return self._graph
+
+    def get_parser(self, commands):
+        """returns the parser shared by every game in the world, creating it
+        the first time it is needed
+
+        parameters:
+        ----------
+        commands:
+            the names of the games commands
+
+        returns:
+        -------
+        self._parser:
+            the CommandParser of this world
+        """
+        if self._parser is None:
+            from parser import CommandParser
+            self._parser = CommandParser(self, commands)
+        return self._parser
+
+    def get_name_maps(self) -> dict:
+        """returns, for the items, npcs, locations and directions of the world,
+        every name folded with str.casefold mapped to the name as the world spells
+        it. The few directions are copied into a dictionary, the rest are read
+        from the file.
+
+        returns:
+        -------
+        maps:
+            'items', 'npcs' and 'locations' to their NameTable, and 'directions' to a dictionary
+        """
+        maps = {kind: NameTable(self, getattr(self, f'_folded_{kind}'), translate=True)
+                for kind in ('items', 'npcs', 'locations')}
+        maps['directions'] = dict(NameTable(self, self._folded_directions, translate=True).items())
+        return maps
+
+    def get_item_owners(self) -> memoryview:
+        """returns the id of the location every item starts in, indexed by item id
+
+        returns:
+        -------
+        self._item_owners:
+            an instance of _item_owners
+        """
+        return self._item_owners
+
+    def get_items_named(self, name: str) -> tuple:
+        """returns every item with the given name, in the order they were added
+
+        parameters:
+        ----------
+        name: str:
+            the name of the items
+
+        returns:
+        -------
+        items:
+            the ItemViews, empty if there are none
+        """
+        group = NameTable(self, self._item_group_table).get(name)
+        if group is None:
+            return ()
+        start, end = self._item_group_offsets[group], self._item_group_offsets[group + 1]
+        return tuple([ItemView(self, number) for number in self._item_groups[start:end]])
+
+    def get_items(self) -> ViewList:
+        """returns every item in the world
+
+        returns:
+        -------
+        self._Item_list:
+            an instance of _Item_list
+        """
+        return self._Item_list
+
+    def get_npcs(self) -> ViewList:
+        """returns every npc in the world
+
+        returns:
+        -------
+        self._NPC_list:
+            an instance of _NPC_list
+        """
+        return self._NPC_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack a GVZork world into a store file.')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--world', help='a JSON or TOML world file, the Lands Between if not given')
+    source.add_argument('--locations', type=int, help='generate a world with this many locations')
+    parser.add_argument('--seed', type=int, default=0, help='the seed of a generated world')
+    parser.add_argument('-o', '--output', required=True, help='the store file to write')
+    args = parser.parse_args()
+    if args.world:
+        from worldfile import load_world
+        world = load_world(args.world)
+    elif args.locations:
+        from worldgen import generate_world
+        world = generate_world(args.locations, seed=args.seed)
+    else:
+        from GVZork import create_world
+        world = create_world()
+    size = pack_world(world, args.output)
+    print(f'{args.output}: {size} bytes')
+
+
+if __name__ == "__main__":
+    main()